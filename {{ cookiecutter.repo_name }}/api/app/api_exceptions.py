@@ -20,6 +20,8 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from typing import Dict, Optional
+
 from fastapi import status
 
 __author__ = ["Traversaal.ai"]
@@ -33,7 +35,9 @@ class ApiException(Exception):
         self,
         message: str,
         status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR,
+        headers: Optional[Dict[str, str]] = None,
     ):
         self.message = message
         self.status_code = status_code
+        self.headers = headers
         super().__init__(f"Status Code: {status_code} -> {message}")
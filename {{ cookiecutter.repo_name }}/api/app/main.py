@@ -20,13 +20,24 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import argparse
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.api_exceptions import ApiException
 from app.routers import routers
+from app.service.inference_executor import get_inference_executor
+from app.service.inference_runtime import apply_runtime_config
+from app.service.job_queue import get_job_queue
+from app.service.model_preloader import get_preload_state, preload_models
 from app.utils.logging import setup_logging
+from app.utils.metrics import MetricsMiddleware
+from app.utils.startup_profiler import get_startup_profiler
 
 __author__ = ["Traversaal.ai"]
 __copyright__ = ["Copyright 2023 Traversaal.ai"]
@@ -37,11 +48,57 @@ __all__ = []
 
 OUTPUT_PORT = 8000
 HOST = "0.0.0.0"
+# Number of worker processes started by `start`. Set `MODEL_MMAP_WEIGHTS=1`
+# as well, so that the workers share a single copy of the model weights.
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+# Seconds that in-flight requests get to finish once the worker is asked to
+# stop, e.g. when ECS drains the task.
+SHUTDOWN_GRACE_SECONDS = int(os.getenv("SHUTDOWN_GRACE_SECONDS", "90"))
 
 # -------------------------- APP DEFINITION -----------------------------------
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Lifespan of the application. The configured models are loaded and
+    warmed up in the background, and the readiness probe fails until
+    they are done. The job workers run for as long as the app does.
+    """
+    profiler = get_startup_profiler()
+    profiler.mark("lifespan")
+    # Workers started by uvicorn's reloader do not go through `start`/`dev`
+    with profiler.step("setup_logging"):
+        setup_logging()
+    # Before any inference thread gets started
+    with profiler.step("runtime_config"):
+        apply_runtime_config()
+    preload_task = asyncio.create_task(asyncio.to_thread(_preload_models))
+    get_job_queue().start()
+    yield
+    await get_job_queue().stop()
+    if not preload_task.done():
+        get_preload_state().cancel()
+        preload_task.cancel()
+    get_inference_executor().shutdown(wait=False)
+
+
+def _preload_models():
+    """
+    Function for preloading the configured models, after which the startup
+    profile, if enabled, gets logged.
+    """
+    profiler = get_startup_profiler()
+    try:
+        with profiler.step("preload_models"):
+            preload_models()
+    finally:
+        profiler.mark("ready")
+        profiler.log_report()
+
+
 # --- Defining Application
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # --- Adding routes to the application
 for router in routers:
@@ -55,6 +112,9 @@ app.add_middleware(
     allow_headers=["*"],
     allow_credentials=True,
 )
+app.add_middleware(MetricsMiddleware)
+
+get_startup_profiler().mark("app")
 
 
 # -------------------------- APP EXCEPTIONS -----------------------------------
@@ -65,6 +125,7 @@ async def api_exception_handler(request: Request, exc: ApiException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"message": exc.message},
+        headers=exc.headers,
     )
 
 
@@ -79,10 +140,35 @@ async def exception_handler(request: Request, exc: Exception):
 # --------------------------- APP SCRIPTS -------------------------------------
 
 
+def _parse_args() -> argparse.Namespace:
+    """
+    Function for parsing the command line arguments of `start`/`dev`.
+    """
+    parser = argparse.ArgumentParser(description="Runs the FastAPI app")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Log the cost of every imported module and startup step",
+    )
+
+    return parser.parse_args()
+
+
+def _enable_startup_profiling(args: argparse.Namespace):
+    """
+    Function for enabling the startup profiler, both in this process and in
+    the worker processes started by uvicorn.
+    """
+    if args.profile_startup:
+        os.environ["PROFILE_STARTUP"] = "1"
+        get_startup_profiler().enabled = True
+
+
 def start():
     """
     Main function for starting the FastAPI application.
     """
+    _enable_startup_profiling(_parse_args())
     # Setting up logging
     setup_logging()
     # Running application
@@ -91,7 +177,10 @@ def start():
         host=HOST,
         port=OUTPUT_PORT,
         log_level="info",
+        log_config=None,
         reload=False,
+        workers=SERVER_WORKERS,
+        timeout_graceful_shutdown=SHUTDOWN_GRACE_SECONDS,
     )
 
 
@@ -100,6 +189,7 @@ def dev():
     Main function for starting the FastAPI application.
     This function is used for debugging purposes.
     """
+    _enable_startup_profiling(_parse_args())
     # Setting up logging
     setup_logging()
     # Running application
@@ -108,6 +198,7 @@ def dev():
         host=HOST,
         port=OUTPUT_PORT,
         log_level="debug",
+        log_config=None,
         reload=True,
     )
 
@@ -0,0 +1,100 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+from app.models.genai.llm_prompt import LLMBatchRequest, LLMRequest
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "JobPriority",
+    "JobResult",
+    "JobStatus",
+    "LLMBatchJobRequest",
+    "LLMJobRequest",
+]
+
+# -------------------------------- MODELS -------------------------------------
+
+
+class JobPriority(BaseModel):
+    """
+    Class definition of the ``JobPriority`` model.
+    """
+
+    priority: int = Field(
+        0,
+        ge=-10,
+        le=10,
+        description="Jobs with a higher priority run first",
+    )
+
+
+class LLMJobRequest(LLMRequest, JobPriority):
+    """
+    Class definition of the ``LLMJobRequest`` model.
+    """
+
+
+class LLMBatchJobRequest(LLMBatchRequest, JobPriority):
+    """
+    Class definition of the ``LLMBatchJobRequest`` model.
+    """
+
+
+class JobStatus(BaseModel):
+    """
+    Class definition of the ``JobStatus`` model.
+    """
+
+    job_id: str = Field(..., description="ID of the job")
+    kind: str = Field(..., description="Kind of job, `llm` or `llm_batch`")
+    status: str = Field(
+        ...,
+        description="`queued`, `running`, `succeeded` or `failed`",
+    )
+    tenant: str = Field(..., description="Tenant that submitted the job")
+    priority: int = Field(..., description="Priority of the job")
+    created_at: float = Field(..., description="Submission time (epoch)")
+    started_at: Optional[float] = Field(None, description="Start time")
+    finished_at: Optional[float] = Field(None, description="End time")
+    expires_at: Optional[float] = Field(
+        None,
+        description="Time after which the result is no longer available",
+    )
+    error: Optional[str] = Field(None, description="Why the job failed")
+
+
+class JobResult(BaseModel):
+    """
+    Class definition of the ``JobResult`` model.
+    """
+
+    job_id: str = Field(..., description="ID of the job")
+    status: str = Field(..., description="`succeeded` or `failed`")
+    result: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Response of the job, shaped like the synchronous route",
+    )
+    error: Optional[str] = Field(None, description="Why the job failed")
@@ -21,7 +21,7 @@
 # SOFTWARE.
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 
 class LLMRequest(BaseModel):
@@ -29,7 +29,78 @@ class LLMRequest(BaseModel):
     model_name: str = Field(..., description="Name of the LLM model to use")
     temperature: Optional[float] = Field(0.1, description="Model temperature")
     max_length: Optional[int] = Field(100, description="Maximum token length")
+    cache_bypass: Optional[bool] = Field(
+        False,
+        description="Skip the response cache, e.g. to get a fresh sample",
+    )
+    assistant_model_name: Optional[str] = Field(
+        None,
+        description=(
+            "Smaller model that drafts tokens for the LLM to verify "
+            "(speculative decoding)"
+        ),
+    )
 
 
 class LLMResponse(BaseModel):
     response: str = Field(..., description="LLM Response")
+
+
+class LLMBatchRequest(BaseModel):
+    prompts: List[str] = Field(
+        ...,
+        min_length=1,
+        description="Prompts for the LLM, all run with the same settings",
+    )
+    model_name: str = Field(..., description="Name of the LLM model to use")
+    temperature: Optional[float] = Field(0.1, description="Model temperature")
+    max_length: Optional[int] = Field(100, description="Maximum token length")
+    chunk_size: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Number of prompts per call to the model",
+    )
+
+
+class LLMBatchResult(BaseModel):
+    index: int = Field(..., description="Position of the prompt")
+    response: Optional[str] = Field(None, description="LLM Response")
+    error: Optional[str] = Field(
+        None,
+        description="Why the prompt failed, if it did",
+    )
+
+
+class LLMBatchResponse(BaseModel):
+    model_name: str = Field(..., description="Name of the LLM model used")
+    results: List[LLMBatchResult] = Field(
+        ...,
+        description="Result of each prompt, in the order of the request",
+    )
+    succeeded: int = Field(..., description="Number of successful prompts")
+    failed: int = Field(..., description="Number of failed prompts")
+
+
+class TokenizeRequest(BaseModel):
+    prompts: List[str] = Field(
+        ...,
+        min_length=1,
+        description="Prompts to count the tokens of",
+    )
+    model_name: str = Field(..., description="Name of the LLM model to use")
+    max_length: Optional[int] = Field(
+        None,
+        description="Maximum token length to check the prompts against",
+    )
+
+
+class TokenizeResponse(BaseModel):
+    model_name: str = Field(..., description="Name of the LLM model used")
+    token_counts: List[int] = Field(
+        ...,
+        description="Number of tokens of each prompt",
+    )
+    within_max_length: Optional[List[bool]] = Field(
+        None,
+        description="Whether each prompt fits within `max_length`",
+    )
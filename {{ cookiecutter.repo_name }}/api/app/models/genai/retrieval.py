@@ -0,0 +1,138 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "Document",
+    "EmbedRequest",
+    "EmbedResponse",
+    "IndexRequest",
+    "IndexResponse",
+    "SearchRequest",
+    "SearchResponse",
+    "SearchResult",
+]
+
+# -------------------------------- MODELS -------------------------------------
+
+
+class EmbedRequest(BaseModel):
+    """
+    Class definition of the ``EmbedRequest`` model.
+    """
+
+    texts: List[str] = Field(
+        ...,
+        min_length=1,
+        description="Texts to encode",
+    )
+    model_name: Optional[str] = Field(
+        None,
+        description="Encoder model. Defaults to `EMBEDDING_MODEL`",
+    )
+
+
+class EmbedResponse(BaseModel):
+    """
+    Class definition of the ``EmbedResponse`` model.
+    """
+
+    model_name: str = Field(..., description="Encoder model")
+    dimension: int = Field(..., description="Size of each embedding")
+    embeddings: List[List[float]] = Field(
+        ...,
+        description="Unit-length embedding of each text, in order",
+    )
+
+
+class Document(BaseModel):
+    """
+    Class definition of the ``Document`` model.
+    """
+
+    text: str = Field(..., description="Text of the document")
+    metadata: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Metadata returned along with the document",
+    )
+
+
+class IndexRequest(BaseModel):
+    """
+    Class definition of the ``IndexRequest`` model.
+    """
+
+    documents: List[Document] = Field(
+        ...,
+        min_length=1,
+        description="Documents to add to the vector index",
+    )
+
+
+class IndexResponse(BaseModel):
+    """
+    Class definition of the ``IndexResponse`` model.
+    """
+
+    ids: List[int] = Field(..., description="ID of each added document")
+    total: int = Field(..., description="Number of documents in the index")
+
+
+class SearchRequest(BaseModel):
+    """
+    Class definition of the ``SearchRequest`` model.
+    """
+
+    query: str = Field(..., description="Text to search for")
+    k: int = Field(
+        5,
+        ge=1,
+        le=100,
+        description="Number of documents to return",
+    )
+
+
+class SearchResult(Document):
+    """
+    Class definition of the ``SearchResult`` model.
+    """
+
+    id: int = Field(..., description="ID of the document")
+    score: float = Field(
+        ...,
+        description="Cosine similarity between the query and the document",
+    )
+
+
+class SearchResponse(BaseModel):
+    """
+    Class definition of the ``SearchResponse`` model.
+    """
+
+    results: List[SearchResult] = Field(
+        ...,
+        description="Most similar documents, from the most similar",
+    )
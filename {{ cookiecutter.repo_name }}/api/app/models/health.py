@@ -0,0 +1,72 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+__author__ = ["Victor Calderon"]
+__all__ = ["Liveness", "Readiness"]
+
+# -------------------------------- MODELS -------------------------------------
+
+
+class Readiness(BaseModel):
+    """
+    Class definition of the ``Readiness`` model.
+    """
+
+    ready: bool = Field(..., description="Whether the worker can serve")
+    status: str = Field(..., description="Status of the model preloading")
+    models: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Seconds spent loading and warming up each model",
+    )
+    error: Optional[str] = Field(None, description="Preloading error")
+    checks: Dict[str, bool] = Field(
+        default_factory=dict,
+        description="Result of each readiness check",
+    )
+    loaded_models: List[str] = Field(
+        default_factory=list,
+        description="Models loaded in the worker, as `name:load_mode`",
+    )
+    in_flight: int = Field(0, description="Running and queued generations")
+    queue_depth: int = Field(0, description="Generations waiting for a worker")
+    max_queue_depth: int = Field(
+        0,
+        description="Queue depth above which the worker is not ready",
+    )
+    memory: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Memory limit, usage and headroom, in bytes",
+    )
+
+
+class Liveness(BaseModel):
+    """
+    Class definition of the ``Liveness`` model.
+    """
+
+    alive: bool = Field(..., description="Whether the worker is running")
+    pid: int = Field(..., description="ID of the worker process")
+    uptime_seconds: float = Field(..., description="Seconds since start")
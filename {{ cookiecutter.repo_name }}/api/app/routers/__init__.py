@@ -20,9 +20,13 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from app.routers import initial, genai
+from app.routers import initial, genai, health, jobs, metrics, retrieval
 
 routers = [
     initial.router,
     genai.router,
+    health.router,
+    jobs.router,
+    metrics.router,
+    retrieval.router,
 ]
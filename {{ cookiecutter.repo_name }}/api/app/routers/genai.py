@@ -20,10 +20,42 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import asyncio
+import json
+from typing import Any, Optional
+
 from app.utils.logging import get_logger
-from fastapi import APIRouter
-from app.models.genai.llm_prompt import LLMRequest, LLMResponse
-from app.service.llm_service import LLMService
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Header,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.models.genai.llm_prompt import (
+    LLMBatchRequest,
+    LLMBatchResponse,
+    LLMRequest,
+    LLMResponse,
+    TokenizeRequest,
+    TokenizeResponse,
+)
+from app.service.llm_service import (
+    BULK_MAX_PROMPTS,
+    STAGE_SECONDS,
+    LLMService,
+)
+from app.service.response_cache import (
+    ResponseCache,
+    get_response_cache,
+    request_cache_key,
+)
+from app.service.single_flight import SINGLE_FLIGHT_ENABLED, get_single_flight
+from app.service.tokenization import count_tokens, get_tokenizer
+from app.utils.metrics import current_model_name
 
 __author__ = ["Victor Calderon"]
 __maintainer__ = ["Victor Calderon"]
@@ -37,15 +69,189 @@ router = APIRouter(
     tags=["genai"],
 )
 
+
+class TimedJSONResponse(JSONResponse):
+    """
+    JSON response that records the time spent serializing its content.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with STAGE_SECONDS.time(
+            model_name=current_model_name.get(),
+            stage="serialization",
+        ):
+            return super().render(content)
+
+
 # -------------------------------- ROUTES -------------------------------------
 
 
-@router.post("/llm", response_model=LLMResponse)
-def make_llm_call(request: LLMRequest):
+@router.post(
+    "/llm",
+    response_model=LLMResponse,
+    response_class=TimedJSONResponse,
+)
+async def make_llm_call(
+    request: LLMRequest,
+    response: Response,
+    cache_control: Optional[str] = Header(None),
+):
     """
     Function to make an LLM call.
+
+    When the response cache is enabled, identical requests are served from
+    the cache, and identical requests that arrive while the first one is
+    still running share its generation. Setting ``cache_bypass`` in the
+    request, or sending a ``Cache-Control: no-cache`` header, always runs
+    a fresh generation.
     """
-    # Initializing service
-    llm_service = LLMService(request=request)
+    current_model_name.set(request.model_name)
+    response_cache = get_response_cache()
 
-    return llm_service.invoke()
+    if request.cache_bypass or "no-cache" in (cache_control or ""):
+        if response_cache is not None:
+            response.headers["X-Cache"] = "BYPASS"
+        return await LLMService.ainvoke(request=request)
+
+    if response_cache is not None:
+        cached_response = await asyncio.to_thread(
+            response_cache.get,
+            request,
+        )
+        if cached_response is not None:
+            response.headers["X-Cache"] = "HIT"
+            return cached_response
+        response.headers["X-Cache"] = "MISS"
+
+    if not SINGLE_FLIGHT_ENABLED:
+        return await _invoke_and_cache(request, response_cache)
+
+    return await get_single_flight().run(
+        key=request_cache_key(request),
+        fn=lambda: _invoke_and_cache(request, response_cache),
+    )
+
+
+async def _invoke_and_cache(
+    request: LLMRequest,
+    response_cache: Optional[ResponseCache],
+):
+    """
+    Function for invoking the LLM and caching its response, if the
+    response cache is enabled.
+    """
+    llm_response = await LLMService.ainvoke(request=request)
+    if response_cache is not None:
+        await asyncio.to_thread(response_cache.set, request, llm_response)
+
+    return llm_response
+
+
+@router.post(
+    "/llm/batch",
+    response_model=LLMBatchResponse,
+    response_class=TimedJSONResponse,
+)
+async def make_llm_batch_call(request: LLMBatchRequest):
+    """
+    Function to make an LLM call for many prompts at once.
+
+    The prompts are run in padded chunks of prompts of similar length, and
+    their results are returned in the order of the request. A prompt that
+    fails is reported in its own result, without failing the others.
+    """
+    if len(request.prompts) > BULK_MAX_PROMPTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=(
+                f"Got {len(request.prompts)} prompts, the maximum is "
+                f"{BULK_MAX_PROMPTS}"
+            ),
+        )
+    current_model_name.set(request.model_name)
+
+    return await LLMService.ainvoke_batch(request=request)
+
+
+@router.post("/tokenize", response_model=TokenizeResponse)
+def tokenize(request: TokenizeRequest):
+    """
+    Function to count the tokens of one or more prompts, so that clients
+    can check them against ``max_length`` without running a generation.
+    Only the tokenizer of the model gets loaded.
+    """
+    tokenizer = get_tokenizer(request.model_name)
+    token_counts = count_tokens(tokenizer, request.prompts)
+
+    within_max_length = None
+    if request.max_length is not None:
+        within_max_length = [xx <= request.max_length for xx in token_counts]
+
+    return {
+        "model_name": request.model_name,
+        "token_counts": token_counts,
+        "within_max_length": within_max_length,
+    }
+
+
+@router.post("/llm/stream")
+async def stream_llm_call(
+    request: LLMRequest,
+    http_request: Request,
+    stream_format: str = Query(
+        "sse",
+        alias="format",
+        pattern="^(sse|jsonl)$",
+        description="Server-sent events (`sse`) or JSON lines (`jsonl`)",
+    ),
+):
+    """
+    Function to make an LLM call, streaming the response token by token.
+
+    The generation takes its inference slot before the response starts,
+    so a saturated server answers with a ``429``, like the other routes.
+    """
+    tokens = LLMService.astream(
+        request=request,
+        is_disconnected=http_request.is_disconnected,
+    )
+
+    if stream_format == "jsonl":
+        return StreamingResponse(
+            _as_json_lines(tokens),
+            media_type="application/x-ndjson",
+        )
+
+    return StreamingResponse(
+        _as_server_sent_events(tokens),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+async def _as_server_sent_events(tokens):
+    """
+    Function for formatting a stream of tokens as server-sent events.
+    """
+    try:
+        async for token in tokens:
+            yield f"data: {json.dumps({'token': token})}\n\n"
+    except Exception as e:
+        logger.error(f">>> Error while streaming LLM response. e: {e}")
+        yield f"event: error\ndata: {json.dumps({'message': str(e)})}\n\n"
+        return
+    yield "event: end\ndata: {}\n\n"
+
+
+async def _as_json_lines(tokens):
+    """
+    Function for formatting a stream of tokens as JSON lines.
+    """
+    try:
+        async for token in tokens:
+            yield json.dumps({"token": token}) + "\n"
+    except Exception as e:
+        logger.error(f">>> Error while streaming LLM response. e: {e}")
+        yield json.dumps({"error": str(e)}) + "\n"
+        return
+    yield json.dumps({"done": True}) + "\n"
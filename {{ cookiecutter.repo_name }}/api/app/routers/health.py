@@ -0,0 +1,77 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from fastapi import APIRouter, Response, status
+
+from app.models.health import Liveness, Readiness
+from app.service.health_checks import check_liveness, check_readiness
+
+__author__ = ["Victor Calderon"]
+__maintainer__ = ["Victor Calderon"]
+__all__ = []
+
+# ---------------------------- ROUTER DEFINITION ------------------------------
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+)
+
+# -------------------------------- ROUTES -------------------------------------
+
+
+@router.get("/live", response_model=Liveness)
+async def liveness():
+    """
+    Liveness probe. It succeeds as long as the event loop of the worker
+    responds, whether or not its models are loaded.
+    """
+    return check_liveness()
+
+
+@router.get("/ready", response_model=Readiness)
+def readiness(response: Response):
+    """
+    Readiness probe. It fails until every configured model has been
+    loaded and warmed up, and whenever the worker is overloaded, i.e. its
+    inference queue is close to full or it is running out of memory.
+    """
+    result = check_readiness()
+    if not result["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return result
+
+
+@router.get("/models", response_model=Readiness)
+def models_readiness(response: Response):
+    """
+    Readiness probe of the load balancer. It fails until every configured
+    model has been loaded and warmed up, but not when the worker is
+    overloaded, since ECS replaces the tasks that the load balancer finds
+    unhealthy. Overloaded workers reject requests with a ``429`` instead.
+    """
+    result = check_readiness(load_aware=False)
+    if not result["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return result
@@ -0,0 +1,156 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from dataclasses import asdict
+
+from fastapi import APIRouter, Header, HTTPException, Response, status
+
+from app.models.genai.jobs import (
+    JobResult,
+    JobStatus,
+    LLMBatchJobRequest,
+    LLMJobRequest,
+)
+from app.service.job_queue import Job, get_job_queue
+from app.service.llm_service import BULK_MAX_PROMPTS
+
+__author__ = ["Victor Calderon"]
+__maintainer__ = ["Victor Calderon"]
+__all__ = []
+
+# ---------------------------- ROUTER DEFINITION ------------------------------
+
+router = APIRouter(
+    prefix="/api/genai/jobs",
+    tags=["jobs"],
+)
+
+DEFAULT_TENANT = "default"
+
+# -------------------------------- ROUTES -------------------------------------
+
+
+def _accepted(job: Job, response: Response):
+    """
+    Function for building the response to a submitted job, pointing the
+    client to the route that reports on it.
+    """
+    response.headers["Location"] = f"{router.prefix}/{job.job_id}"
+
+    return asdict(job)
+
+
+@router.post(
+    "/llm",
+    response_model=JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def submit_llm_job(
+    request: LLMJobRequest,
+    response: Response,
+    x_tenant_id: str = Header(DEFAULT_TENANT),
+):
+    """
+    Function to submit an LLM call as a job. The response only holds the
+    ID of the job, so long generations do not hold the connection open.
+
+    Submitting writes to the job store, which may wait on other workers,
+    so this runs in the threadpool instead of the event loop.
+    """
+    job = get_job_queue().submit(
+        kind="llm",
+        payload=request.model_dump(exclude={"priority"}),
+        tenant=x_tenant_id,
+        priority=request.priority,
+    )
+
+    return _accepted(job, response)
+
+
+@router.post(
+    "/llm/batch",
+    response_model=JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def submit_llm_batch_job(
+    request: LLMBatchJobRequest,
+    response: Response,
+    x_tenant_id: str = Header(DEFAULT_TENANT),
+):
+    """
+    Function to submit an LLM call for many prompts as a job.
+    """
+    if len(request.prompts) > BULK_MAX_PROMPTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=(
+                f"Got {len(request.prompts)} prompts, the maximum is "
+                f"{BULK_MAX_PROMPTS}"
+            ),
+        )
+    job = get_job_queue().submit(
+        kind="llm_batch",
+        payload=request.model_dump(exclude={"priority"}),
+        tenant=x_tenant_id,
+        priority=request.priority,
+    )
+
+    return _accepted(job, response)
+
+
+def _get_job(job_id: str) -> Job:
+    """
+    Function for retrieving a job, failing with a ``404`` for unknown and
+    expired jobs.
+    """
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job `{job_id}` not found",
+        )
+
+    return job
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+def get_job_status(job_id: str):
+    """
+    Function to poll the status of a job.
+    """
+    return asdict(_get_job(job_id))
+
+
+@router.get("/{job_id}/result", response_model=JobResult)
+def get_job_result(job_id: str):
+    """
+    Function to fetch the result of a finished job. Unfinished jobs get a
+    ``409 Conflict``.
+    """
+    job = _get_job(job_id)
+    if not job.done:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job `{job_id}` is {job.status}",
+        )
+
+    return asdict(job)
@@ -0,0 +1,105 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from fastapi import APIRouter
+
+from app.models.genai.retrieval import (
+    EmbedRequest,
+    EmbedResponse,
+    IndexRequest,
+    IndexResponse,
+    SearchRequest,
+    SearchResponse,
+)
+from app.service.embeddings import EMBEDDING_MODEL, encode_texts
+from app.service.inference_executor import get_inference_executor
+from app.service.vector_index import get_vector_index
+
+__author__ = ["Victor Calderon"]
+__maintainer__ = ["Victor Calderon"]
+__all__ = []
+
+# ---------------------------- ROUTER DEFINITION ------------------------------
+
+router = APIRouter(
+    prefix="/api/genai",
+    tags=["retrieval"],
+)
+
+# -------------------------------- ROUTES -------------------------------------
+
+
+@router.post("/embed", response_model=EmbedResponse)
+async def embed(request: EmbedRequest):
+    """
+    Function to encode texts into embeddings.
+    """
+    model_name = request.model_name or EMBEDDING_MODEL
+    embeddings = await get_inference_executor().run(
+        lambda: encode_texts(request.texts, model_name=model_name)
+    )
+
+    return {
+        "model_name": model_name,
+        "dimension": embeddings.shape[1],
+        "embeddings": embeddings.tolist(),
+    }
+
+
+@router.post("/search/documents", response_model=IndexResponse)
+async def index_documents(request: IndexRequest):
+    """
+    Function to add documents to the vector index, encoded with the
+    ``EMBEDDING_MODEL`` encoder. The index grows without being rebuilt,
+    but every call saves the whole index, so documents are best added in
+    large batches.
+    """
+    documents = [xx.model_dump() for xx in request.documents]
+
+    def run():
+        embeddings = encode_texts([xx["text"] for xx in documents])
+        vector_index = get_vector_index()
+        ids = vector_index.add(embeddings, documents)
+        return {"ids": ids, "total": vector_index.ntotal}
+
+    return await get_inference_executor().run(run)
+
+
+@router.post("/search", response_model=SearchResponse)
+async def search(request: SearchRequest):
+    """
+    Function to find the documents of the vector index that are the most
+    similar to a query.
+    """
+
+    def run():
+        embeddings = encode_texts([request.query])
+        return get_vector_index().search(embeddings, k=request.k)[0]
+
+    results = await get_inference_executor().run(run)
+
+    return {
+        "results": [
+            {"id": idx, "score": score, **document}
+            for idx, score, document in results
+        ]
+    }
@@ -0,0 +1,326 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.service.model_registry import ModelKey, get_model_registry
+from app.utils.logging import get_logger
+from app.utils.metrics import get_metrics_registry
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "BatchScheduler",
+    "PendingRequest",
+    "get_batch_scheduler",
+    "remove_batch_scheduler",
+]
+
+logger = get_logger(__name__)
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+BATCHING_ENABLED = os.getenv("BATCHING_ENABLED", "0") == "1"
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "10"))
+# Width of the `max_length` buckets used for grouping requests together
+BATCH_MAX_LENGTH_BUCKET = int(os.getenv("BATCH_MAX_LENGTH_BUCKET", "64"))
+# Maximum time a request waits for its batch to be queued and generated
+BATCH_RESULT_TIMEOUT_SECONDS = float(
+    os.getenv("BATCH_RESULT_TIMEOUT_SECONDS", "300")
+)
+
+# -------------------------------- METRICS ------------------------------------
+
+_metrics = get_metrics_registry()
+BATCH_SIZE = _metrics.histogram(
+    "llm_batch_size",
+    "Number of requests run together in a single `generate` call",
+    labelnames=("model_name",),
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+BATCH_QUEUE_WAIT = _metrics.histogram(
+    "llm_batch_queue_wait_seconds",
+    "Time spent by requests waiting to be batched",
+    labelnames=("model_name",),
+)
+_metrics.gauge(
+    "llm_batch_queue_depth",
+    "Number of requests waiting to be batched, across every model",
+).set_function(lambda: _total_queue_depth())
+
+# ---------------------------- DATA STRUCTURES --------------------------------
+
+
+@dataclass
+class PendingRequest:
+    """
+    Request waiting in the queue of a ``BatchScheduler``.
+    """
+
+    prompt: str
+    temperature: float
+    max_length: int
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+# Function that runs a group of compatible requests in a single batch and
+# returns the generated text of each one, in order.
+BatchFn = Callable[[List[PendingRequest]], List[str]]
+
+# --------------------------- CLASS DEFINITION --------------------------------
+
+
+class BatchScheduler(object):
+    """
+    Dynamic micro-batching engine for a single model.
+
+    Incoming requests are queued by group, i.e. same ``temperature`` and
+    ``max_length`` bucket. A background thread runs a group as soon as it
+    reaches ``max_batch_size`` requests, or once its oldest request has
+    waited for ``max_wait_ms``.
+    """
+
+    def __init__(
+        self,
+        batch_fn: BatchFn,
+        name: str = "",
+        max_batch_size: int = BATCH_MAX_SIZE,
+        max_wait_ms: float = BATCH_MAX_WAIT_MS,
+        max_length_bucket: int = BATCH_MAX_LENGTH_BUCKET,
+    ):
+        self.batch_fn = batch_fn
+        self.name = name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_length_bucket = max(1, max_length_bucket)
+
+        self._groups: Dict[Tuple[float, int], List[PendingRequest]] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def group_key(self, request: PendingRequest) -> Tuple[float, int]:
+        """
+        Method for computing the group a request can be batched with.
+        """
+        bucket = math.ceil(request.max_length / self.max_length_bucket)
+
+        return (request.temperature, bucket)
+
+    @property
+    def queue_depth(self) -> int:
+        with self._condition:
+            return sum(len(xx) for xx in self._groups.values())
+
+    def submit(
+        self,
+        prompt: str,
+        temperature: float,
+        max_length: int,
+    ) -> Future:
+        """
+        Method for queueing a request. The returned future resolves to the
+        generated text of the request.
+        """
+        request = PendingRequest(
+            prompt=prompt,
+            temperature=temperature,
+            max_length=max_length,
+        )
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError(f"Batch scheduler `{self.name}` is stopped")
+            self._ensure_started()
+            key = self.group_key(request)
+            self._groups.setdefault(key, []).append(request)
+            self._condition.notify()
+
+        return request.future
+
+    @property
+    def stopped(self) -> bool:
+        with self._condition:
+            return self._stopped
+
+    def stop(self, wait: bool = True):
+        """
+        Method for stopping the background thread once the queued requests
+        have been processed. With ``wait``, waits for the thread to exit.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"batch-scheduler-{self.name}",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _next_batch(self) -> Optional[List[PendingRequest]]:
+        """
+        Method for waiting until a group is ready to run, and taking its
+        requests out of the queue. Returns ``None`` once stopped.
+        """
+        with self._condition:
+            while True:
+                if not self._groups:
+                    if self._stopped:
+                        return None
+                    self._condition.wait()
+                    continue
+                # Group whose oldest request has waited the longest
+                key, group = min(
+                    self._groups.items(),
+                    key=lambda xx: xx[1][0].enqueued_at,
+                )
+                timeout = group[0].enqueued_at + self.max_wait
+                timeout -= time.monotonic()
+                full_group = any(
+                    len(xx) >= self.max_batch_size
+                    for xx in self._groups.values()
+                )
+                if full_group:
+                    key, group = max(
+                        self._groups.items(),
+                        key=lambda xx: len(xx[1]),
+                    )
+                elif timeout > 0 and not self._stopped:
+                    self._condition.wait(timeout)
+                    continue
+
+                batch = group[: self.max_batch_size]
+                remaining = group[self.max_batch_size :]
+                if remaining:
+                    self._groups[key] = remaining
+                else:
+                    del self._groups[key]
+
+                return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[PendingRequest]):
+        start_time = time.monotonic()
+        BATCH_SIZE.observe(len(batch), model_name=self.name)
+        for request in batch:
+            BATCH_QUEUE_WAIT.observe(
+                start_time - request.enqueued_at,
+                model_name=self.name,
+            )
+
+        # Requests cancelled while waiting are not run
+        batch = [
+            xx for xx in batch if xx.future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+
+        try:
+            outputs = self.batch_fn(batch)
+        except Exception as e:
+            logger.error(f">>> Error while running batch `{self.name}`: {e}")
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        if len(outputs) != len(batch):
+            error = RuntimeError(
+                f"Batch `{self.name}` returned {len(outputs)} outputs for "
+                f"{len(batch)} requests"
+            )
+            logger.error(f">>> {error}")
+            for request in batch:
+                request.future.set_exception(error)
+            return
+
+        for request, output in zip(batch, outputs):
+            request.future.set_result(output)
+
+
+# ------------------------------ SCHEDULERS -----------------------------------
+
+_schedulers: Dict[ModelKey, BatchScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_batch_scheduler(
+    key: ModelKey,
+    batch_fn: BatchFn,
+) -> BatchScheduler:
+    """
+    Function for retrieving the batch scheduler of a model, creating it
+    the first time the model is used, or after it was stopped.
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None or scheduler.stopped:
+            scheduler = BatchScheduler(batch_fn=batch_fn, name=key.model_name)
+            _schedulers[key] = scheduler
+
+    return scheduler
+
+
+def remove_batch_scheduler(key: ModelKey) -> bool:
+    """
+    Function for stopping and removing the batch scheduler of a model, e.g.
+    once the model gets evicted from the registry. Its queued requests are
+    still processed, without waiting for them.
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.pop(key, None)
+    if scheduler is None:
+        return False
+    scheduler.stop(wait=False)
+
+    return True
+
+
+# Schedulers are tied to the models of the process-wide registry
+get_model_registry().add_eviction_listener(remove_batch_scheduler)
+
+
+def _total_queue_depth() -> int:
+    """
+    Function for counting the requests queued in every batch scheduler.
+    """
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+
+    return sum(xx.queue_depth for xx in schedulers)
@@ -0,0 +1,147 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+from typing import Any, List, Optional, Sequence, Tuple
+
+from app.service.model_registry import (
+    ModelKey,
+    ModelRegistry,
+    estimate_model_bytes,
+    load_hf_model,
+)
+from app.utils.logging import get_logger
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "encode_texts",
+    "get_encoder_registry",
+]
+
+logger = get_logger(__name__)
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+# Encoder model used for the embeddings, and for the vector index
+EMBEDDING_MODEL = os.getenv(
+    "EMBEDDING_MODEL",
+    "sentence-transformers/all-MiniLM-L6-v2",
+)
+# Number of texts encoded with a single forward pass
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+# Texts are truncated to this number of tokens
+EMBEDDING_MAX_TOKENS = int(os.getenv("EMBEDDING_MAX_TOKENS", "256"))
+EMBEDDING_REGISTRY_MAX_BYTES = int(
+    os.getenv("EMBEDDING_REGISTRY_MAX_BYTES", str(2 * 1024**3))
+)
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def _load_hf_encoder(key: ModelKey) -> Tuple[Any, Any]:
+    """
+    Function for loading the tokenizer and the encoder model, i.e. the
+    base model without a language modeling head.
+    """
+    from transformers import AutoModel
+
+    # The weights of base models are often stored with the prefix of their
+    # task model, which only `from_pretrained` strips, so they do not get
+    # memory-mapped.
+    return load_hf_model(key, model_class=AutoModel, mmap_weights=False)
+
+
+def encode_texts(
+    texts: Sequence[str],
+    model_name: str = EMBEDDING_MODEL,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    max_tokens: int = EMBEDDING_MAX_TOKENS,
+    registry: Optional[ModelRegistry] = None,
+) -> Any:
+    """
+    Function for encoding texts into unit-length embeddings, so that their
+    inner product is their cosine similarity.
+
+    Texts are encoded in batches of texts of similar length, to limit the
+    padding, and the embedding of each text is the mean of the hidden
+    states of its tokens.
+
+    Returns
+    -----------
+    embeddings : numpy.ndarray
+        Array of shape ``(len(texts), dimension)``, of ``float32`` values,
+        in the order of ``texts``.
+    """
+    import numpy as np
+    import torch
+
+    from app.service.llm_service import length_sorted_chunks
+    from app.service.tokenization import count_tokens
+
+    registry = get_encoder_registry() if registry is None else registry
+    loaded_model = registry.get(ModelKey.for_model(model_name))
+    tokenizer, model_obj = loaded_model.tokenizer, loaded_model.model
+
+    chunks = length_sorted_chunks(
+        count_tokens(tokenizer, texts),
+        chunk_size=batch_size,
+    )
+    embeddings: List[Any] = [None] * len(texts)
+    with torch.no_grad():
+        for chunk in chunks:
+            input_msgs = tokenizer(
+                [texts[idx] for idx in chunk],
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=max_tokens,
+            )
+            hidden_states = model_obj(**input_msgs).last_hidden_state
+            mask = input_msgs["attention_mask"].unsqueeze(-1)
+            n_tokens = mask.sum(dim=1).clamp(min=1)
+            pooled = (hidden_states * mask).sum(dim=1) / n_tokens
+            pooled = torch.nn.functional.normalize(pooled.float(), dim=-1)
+            for idx, embedding in zip(chunk, pooled.numpy()):
+                embeddings[idx] = embedding
+
+    if not embeddings:
+        dimension = model_obj.config.hidden_size
+        return np.zeros((0, dimension), dtype=np.float32)
+
+    return np.stack(embeddings).astype(np.float32)
+
+
+# ------------------------------ REGISTRY -------------------------------------
+
+# Encoders are kept apart from the LLMs, as they are built by another loader
+_encoder_registry = ModelRegistry(
+    max_bytes=EMBEDDING_REGISTRY_MAX_BYTES,
+    loader=_load_hf_encoder,
+    size_fn=estimate_model_bytes,
+)
+
+
+def get_encoder_registry() -> ModelRegistry:
+    """
+    Function for retrieving the process-wide registry of encoder models.
+    """
+    return _encoder_registry
@@ -0,0 +1,116 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import time
+from typing import Any, Dict, Optional
+
+from app.service.inference_executor import (
+    InferenceExecutor,
+    get_inference_executor,
+)
+from app.service.model_preloader import PreloadState, get_preload_state
+from app.service.model_registry import ModelRegistry, get_model_registry
+from app.utils.system import memory_headroom
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "check_liveness",
+    "check_readiness",
+]
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+# Fraction of the executor queue that may be taken before the worker stops
+# reporting itself as ready, so the load balancer routes new requests to
+# other tasks while this one catches up.
+READINESS_MAX_QUEUE_RATIO = float(
+    os.getenv("READINESS_MAX_QUEUE_RATIO", "0.75")
+)
+# Minimum amount of memory (in bytes) the container must still have free
+READINESS_MIN_MEMORY_HEADROOM_BYTES = int(
+    os.getenv("READINESS_MIN_MEMORY_HEADROOM_BYTES", str(256 * 1024**2))
+)
+
+# Time at which the worker process started serving
+_STARTED_AT = time.time()
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def check_liveness() -> Dict[str, Any]:
+    """
+    Function for reporting that the worker process is alive. It does not
+    depend on the models, so a worker that is loading a model, or busy,
+    never gets restarted.
+    """
+    return {
+        "alive": True,
+        "pid": os.getpid(),
+        "uptime_seconds": round(time.time() - _STARTED_AT, 3),
+    }
+
+
+def check_readiness(
+    state: Optional[PreloadState] = None,
+    executor: Optional[InferenceExecutor] = None,
+    registry: Optional[ModelRegistry] = None,
+    memory: Optional[Dict[str, int]] = None,
+    load_aware: bool = True,
+) -> Dict[str, Any]:
+    """
+    Function for checking whether the worker can take new requests, i.e.
+    its models are loaded and warmed up, its inference queue is not close
+    to full, and it has enough memory left.
+
+    When ``load_aware`` is false, only the models decide whether the
+    worker is ready, and the other checks are only reported.
+    """
+    state = get_preload_state() if state is None else state
+    executor = get_inference_executor() if executor is None else executor
+    registry = get_model_registry() if registry is None else registry
+    memory = memory_headroom() if memory is None else memory
+
+    queue_depth = executor.queue_depth
+    max_queue_depth = int(executor.max_queue * READINESS_MAX_QUEUE_RATIO)
+    checks = {
+        "models": state.ready,
+        "queue": not executor.saturated and queue_depth <= max_queue_depth,
+        "memory": (
+            memory["headroom_bytes"] >= READINESS_MIN_MEMORY_HEADROOM_BYTES
+        ),
+    }
+
+    return {
+        "ready": all(checks.values()) if load_aware else checks["models"],
+        "status": state.status,
+        "models": state.models,
+        "error": state.error,
+        "checks": checks,
+        "loaded_models": [
+            f"{xx.model_name}:{xx.load_mode}" for xx in registry.keys()
+        ],
+        "in_flight": executor.in_flight,
+        "queue_depth": queue_depth,
+        "max_queue_depth": max_queue_depth,
+        "memory": memory,
+    }
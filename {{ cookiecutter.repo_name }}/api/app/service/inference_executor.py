@@ -0,0 +1,270 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import status
+
+from app.api_exceptions import ApiException
+from app.service.batching import BATCH_MAX_SIZE, BATCHING_ENABLED
+from app.service.inference_runtime import get_runtime_config
+from app.utils.logging import get_logger
+from app.utils.metrics import get_metrics_registry
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "InferenceExecutor",
+    "get_inference_executor",
+]
+
+logger = get_logger(__name__)
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+# Number of generations that run at the same time, i.e. the generation
+# slots of the inference runtime. When micro-batching is enabled, each
+# worker waits on its batch, so there must be enough of them to fill a
+# batch.
+INFERENCE_WORKERS = int(
+    os.getenv(
+        "INFERENCE_WORKERS",
+        str(
+            BATCH_MAX_SIZE
+            if BATCHING_ENABLED
+            else get_runtime_config().generation_slots
+        ),
+    )
+)
+# Number of generations allowed to wait for a worker before new ones get
+# rejected with a ``429 Too Many Requests``.
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "16"))
+INFERENCE_RETRY_AFTER_SECONDS = int(
+    os.getenv("INFERENCE_RETRY_AFTER_SECONDS", "5")
+)
+# Number of workers kept free for interactive requests. Background work,
+# i.e. jobs and bulk generations, only takes a worker when that leaves this
+# many of them free, or when the executor is idle.
+INFERENCE_RESERVED_WORKERS = int(os.getenv("INFERENCE_RESERVED_WORKERS", "1"))
+# How often (in seconds) background work that waits for a worker checks
+# whether one is free
+INFERENCE_BACKGROUND_POLL_SECONDS = float(
+    os.getenv("INFERENCE_BACKGROUND_POLL_SECONDS", "0.05")
+)
+
+# --------------------------- CLASS DEFINITION --------------------------------
+
+
+class InferenceExecutor(object):
+    """
+    Dedicated, bounded executor for model inference.
+
+    Inference runs on its own pool of threads, so it never takes up the
+    threadpool that Starlette uses for the rest of the routes. Once every
+    worker is busy and the queue is full, new work is rejected right away
+    instead of piling up.
+
+    Background work never takes the workers reserved for interactive
+    requests, unless the executor is idle, and does not count towards the
+    capacity of interactive requests, so it cannot get them rejected.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = INFERENCE_WORKERS,
+        max_queue: int = INFERENCE_MAX_QUEUE,
+        retry_after: int = INFERENCE_RETRY_AFTER_SECONDS,
+        reserved_workers: int = INFERENCE_RESERVED_WORKERS,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self.reserved_workers = max(0, reserved_workers)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="inference",
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._background_in_flight = 0
+
+    @property
+    def capacity(self) -> int:
+        """
+        Maximum number of running and queued tasks.
+        """
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Number of running and queued tasks.
+        """
+        with self._lock:
+            return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of tasks waiting for a worker.
+        """
+        return max(self.in_flight - self.max_workers, 0)
+
+    @property
+    def background_workers(self) -> int:
+        """
+        Number of workers that background work may take while interactive
+        requests are running. Background work still runs on an idle
+        executor when this is zero.
+        """
+        return max(self.max_workers - self.reserved_workers, 0)
+
+    @property
+    def saturated(self) -> bool:
+        with self._lock:
+            return (
+                self._in_flight - self._background_in_flight >= self.capacity
+            )
+
+    def _release(self, _future=None, background: bool = False):
+        with self._lock:
+            self._in_flight -= 1
+            if background:
+                self._background_in_flight -= 1
+
+    def _reject(self):
+        raise ApiException(
+            message="Inference capacity exceeded, retry later.",
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        background: bool = False,
+        **kwargs,
+    ) -> Any:
+        """
+        Method for taking a slot of the executor and starting a blocking
+        function on it. Unlike ``run``, the slot is taken as soon as this
+        is called, so callers can reject a request before responding.
+
+        Returns an ``asyncio.Future`` with the result of the function.
+
+        Raises
+        ---------
+        ApiException
+            With a ``429`` status code, when the executor is saturated or,
+            for ``background`` work, when no unreserved worker is free.
+        """
+        with self._lock:
+            if background:
+                busy = self._in_flight >= self.background_workers
+                if busy and self._in_flight > 0:
+                    self._reject()
+                self._background_in_flight += 1
+            elif self._in_flight - self._background_in_flight >= self.capacity:
+                self._reject()
+            self._in_flight += 1
+
+        release = functools.partial(self._release, background=background)
+        try:
+            future = self._executor.submit(
+                functools.partial(fn, *args, **kwargs)
+            )
+        except Exception:
+            release()
+            raise
+        # Slots are released when the work finishes, not when the caller
+        # stops waiting, so cancelled requests still count until then.
+        future.add_done_callback(release)
+
+        return asyncio.wrap_future(future)
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        background: bool = False,
+        wait: bool = False,
+        **kwargs,
+    ) -> Any:
+        """
+        Method for running a blocking function on the executor, without
+        blocking the event loop. With ``wait``, background work waits for
+        a worker to be free instead of being rejected.
+
+        Raises
+        ---------
+        ApiException
+            With a ``429`` status code, when the executor is saturated.
+        """
+        while True:
+            try:
+                future = self.submit(
+                    fn,
+                    *args,
+                    background=background,
+                    **kwargs,
+                )
+                break
+            except ApiException:
+                if not (background and wait):
+                    raise
+            await asyncio.sleep(INFERENCE_BACKGROUND_POLL_SECONDS)
+
+        return await future
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+# ------------------------------ EXECUTOR -------------------------------------
+
+_inference_executor = InferenceExecutor()
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """
+    Function for retrieving the process-wide inference executor.
+    """
+    return _inference_executor
+
+
+# -------------------------------- METRICS ------------------------------------
+
+_metrics = get_metrics_registry()
+_metrics.gauge(
+    "llm_inference_queue_depth",
+    "Number of generations waiting for an inference worker",
+).set_function(lambda: _inference_executor.queue_depth)
+_metrics.gauge(
+    "llm_inference_in_flight",
+    "Number of generations running or waiting on the inference executor",
+).set_function(lambda: _inference_executor.in_flight)
@@ -0,0 +1,245 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import fcntl
+import math
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import IO, List, Optional
+
+from app.utils.logging import get_logger
+from app.utils.system import available_cpus, cpu_quota
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "RuntimeConfig",
+    "apply_runtime_config",
+    "configure_torch",
+    "derive_runtime_config",
+    "get_runtime_config",
+]
+
+logger = get_logger(__name__)
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+# Number of worker processes sharing the CPUs of the container, as started
+# by `app.main`.
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+# CPUs available to each worker. By default, the CPU quota of the container
+# split evenly between its workers.
+INFERENCE_CPUS = os.getenv("INFERENCE_CPUS")
+# Number of generations that run at the same time in each worker. Each of
+# them gets an even share of the CPUs of the worker for its threads.
+INFERENCE_GENERATION_SLOTS = int(os.getenv("INFERENCE_GENERATION_SLOTS", "1"))
+# Threads used by PyTorch within a single operation (intra-op) and to run
+# independent operations at the same time (inter-op). Derived from the
+# number of CPUs and generation slots when not set.
+INFERENCE_TORCH_THREADS = os.getenv("INFERENCE_TORCH_THREADS")
+INFERENCE_INTEROP_THREADS = os.getenv("INFERENCE_INTEROP_THREADS")
+# Whether to pin each worker to its own set of CPUs, so that the threads of
+# different workers do not compete for, and migrate between, the same CPUs.
+INFERENCE_PIN_CPUS = os.getenv("INFERENCE_PIN_CPUS", "0") == "1"
+# Directory of the lock files that the workers use to pick their CPUs
+INFERENCE_CPU_LOCK_DIR = os.getenv("INFERENCE_CPU_LOCK_DIR", "/tmp")
+
+# --------------------------- CLASS DEFINITION --------------------------------
+
+
+@dataclass(frozen=True)
+class RuntimeConfig(object):
+    """
+    Threading configuration of the inference in a worker process.
+    """
+
+    cpus: float
+    generation_slots: int
+    intra_op_threads: int
+    inter_op_threads: int
+    pin_cpus: bool = False
+
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def derive_runtime_config(
+    quota: Optional[float] = None,
+    server_workers: int = SERVER_WORKERS,
+    cpus: Optional[float] = None,
+    generation_slots: int = INFERENCE_GENERATION_SLOTS,
+    intra_op_threads: Optional[int] = None,
+    inter_op_threads: Optional[int] = None,
+    pin_cpus: bool = False,
+) -> RuntimeConfig:
+    """
+    Function for deriving the threading configuration of a worker. Values
+    that are not given are derived from the CPU quota of the container, so
+    that the threads of every generation of every worker add up to the
+    CPUs that the container may use, instead of each generation trying to
+    use every CPU of the host.
+    """
+    if cpus is None:
+        quota = cpu_quota() if quota is None else quota
+        cpus = quota / max(1, server_workers)
+    # Fractional CPUs still get a thread
+    cpus = max(cpus, 1.0)
+    generation_slots = max(1, generation_slots)
+    if intra_op_threads is None:
+        intra_op_threads = max(1, math.floor(cpus / generation_slots))
+    if inter_op_threads is None:
+        # `generate` runs its operations one after the other
+        inter_op_threads = 1
+
+    return RuntimeConfig(
+        cpus=cpus,
+        generation_slots=generation_slots,
+        intra_op_threads=max(1, intra_op_threads),
+        inter_op_threads=max(1, inter_op_threads),
+        pin_cpus=pin_cpus,
+    )
+
+
+_runtime_config: Optional[RuntimeConfig] = None
+
+
+def get_runtime_config() -> RuntimeConfig:
+    """
+    Function for retrieving the threading configuration of the worker,
+    as set through the environment.
+    """
+    global _runtime_config
+
+    if _runtime_config is None:
+        _runtime_config = derive_runtime_config(
+            cpus=None if INFERENCE_CPUS is None else float(INFERENCE_CPUS),
+            intra_op_threads=(
+                None
+                if INFERENCE_TORCH_THREADS is None
+                else int(INFERENCE_TORCH_THREADS)
+            ),
+            inter_op_threads=(
+                None
+                if INFERENCE_INTEROP_THREADS is None
+                else int(INFERENCE_INTEROP_THREADS)
+            ),
+            pin_cpus=INFERENCE_PIN_CPUS,
+        )
+
+    return _runtime_config
+
+
+# Lock file of the CPU set claimed by the worker, held until it exits
+_cpu_set_lock: Optional[IO] = None
+
+
+def _claim_cpu_set(n_cpus: int) -> Optional[List[int]]:
+    """
+    Function for claiming a set of ``n_cpus`` CPUs that no other worker of
+    the container uses. Workers are started by uvicorn without an index,
+    so each of them locks the first set that is still free.
+    """
+    global _cpu_set_lock
+
+    cpus = available_cpus()
+    n_cpus = min(max(1, n_cpus), len(cpus))
+    for idx in range(len(cpus) // n_cpus):
+        lock_path = os.path.join(
+            INFERENCE_CPU_LOCK_DIR,
+            f"inference-cpus-{idx}.lock",
+        )
+        lock_file = open(lock_path, "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            continue
+        _cpu_set_lock = lock_file
+        return cpus[idx * n_cpus : (idx + 1) * n_cpus]
+
+    return None
+
+
+def _pin_process(cpu_set: List[int]):
+    """
+    Function for pinning every thread of the process to ``cpu_set``. The
+    affinity is set per thread on Linux, and new threads inherit it.
+    """
+    for task_id in os.listdir("/proc/self/task"):
+        try:
+            os.sched_setaffinity(int(task_id), cpu_set)
+        except OSError:
+            # The thread already exited
+            pass
+
+
+def apply_runtime_config(config: Optional[RuntimeConfig] = None):
+    """
+    Function for applying the threading configuration to the worker. It
+    should run at startup, before any inference thread is created.
+
+    PyTorch is not imported here, to keep the startup fast. Its thread
+    pools are sized through the environment instead, which it reads once
+    imported, and by ``configure_torch``.
+    """
+    config = get_runtime_config() if config is None else config
+
+    os.environ.setdefault("OMP_NUM_THREADS", str(config.intra_op_threads))
+    os.environ.setdefault("MKL_NUM_THREADS", str(config.intra_op_threads))
+
+    cpu_set = None
+    if config.pin_cpus:
+        cpu_set = _claim_cpu_set(math.ceil(config.cpus))
+        if cpu_set is None:
+            logger.warning("!!! No free CPU set left, not pinning the worker")
+        else:
+            _pin_process(cpu_set)
+
+    logger.info(
+        f">>> Inference runtime: {asdict(config)}, CPUs pinned: {cpu_set}"
+    )
+
+
+_torch_configured = False
+_torch_lock = threading.Lock()
+
+
+def configure_torch(config: Optional[RuntimeConfig] = None):
+    """
+    Function for sizing the thread pools of PyTorch. Only the first call
+    has an effect, as the inter-op threads cannot change once PyTorch has
+    started using them.
+    """
+    global _torch_configured
+
+    config = get_runtime_config() if config is None else config
+    with _torch_lock:
+        if _torch_configured:
+            return
+        import torch
+
+        torch.set_num_threads(config.intra_op_threads)
+        try:
+            torch.set_num_interop_threads(config.inter_op_threads)
+        except RuntimeError as e:
+            logger.warning(f"!!! Could not set the inter-op threads. e: {e}")
+        _torch_configured = True
@@ -0,0 +1,771 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+
+from app.api_exceptions import ApiException
+from app.service.inference_executor import (
+    InferenceExecutor,
+    get_inference_executor,
+)
+from app.utils.logging import get_logger
+from app.utils.metrics import get_metrics_registry
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "Job",
+    "JobQueue",
+    "JobStore",
+    "MemoryJobStore",
+    "SQLiteJobStore",
+    "get_job_queue",
+]
+
+logger = get_logger(__name__)
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+# Either `sqlite` or `memory`. The SQLite store is shared by the workers of
+# a host, and survives restarts.
+JOBS_BACKEND = os.getenv("JOBS_BACKEND", "sqlite")
+JOBS_SQLITE_PATH = os.getenv("JOBS_SQLITE_PATH", "/tmp/llm_jobs.sqlite3")
+# Number of jobs that run at the same time in each worker process. Jobs run
+# as background work of the inference executor, which keeps
+# `INFERENCE_RESERVED_WORKERS` of its workers for interactive requests, so
+# only `INFERENCE_WORKERS - INFERENCE_RESERVED_WORKERS` jobs make progress at
+# once while those are being served.
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "1"))
+# Maximum number of running and queued jobs of a single tenant
+JOBS_TENANT_MAX_RUNNING = int(os.getenv("JOBS_TENANT_MAX_RUNNING", "1"))
+JOBS_TENANT_MAX_QUEUED = int(os.getenv("JOBS_TENANT_MAX_QUEUED", "100"))
+# Seconds that the results of finished jobs are kept for
+JOBS_RESULT_TTL_SECONDS = float(os.getenv("JOBS_RESULT_TTL_SECONDS", "3600"))
+# Seconds after which a running job is considered lost, e.g. because its
+# worker died, and gets marked as failed.
+JOBS_RUNNING_TIMEOUT_SECONDS = float(
+    os.getenv("JOBS_RUNNING_TIMEOUT_SECONDS", "3600")
+)
+# How often (in seconds) idle workers check the store for new jobs
+JOBS_POLL_INTERVAL_SECONDS = float(
+    os.getenv("JOBS_POLL_INTERVAL_SECONDS", "0.5")
+)
+
+# Statuses of a job
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# --------------------------- CLASS DEFINITION --------------------------------
+
+
+@dataclass
+class Job(object):
+    """
+    Generation job, along with its result once it finishes.
+    """
+
+    job_id: str
+    kind: str
+    payload: Dict[str, Any]
+    tenant: str
+    priority: int = 0
+    status: str = QUEUED
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    expires_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+
+class JobStore(object):
+    """
+    Persistent queue of jobs. Queued jobs are claimed by priority, and then
+    by age, skipping the tenants that already run as many jobs as they are
+    allowed to.
+    """
+
+    def add(self, job: Job):
+        """
+        Method for adding a queued job to the store.
+        """
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Method for retrieving a job, or ``None`` if it is not in the store.
+        """
+        raise NotImplementedError
+
+    def count(self, status: str, tenant: Optional[str] = None) -> int:
+        """
+        Method for counting the jobs with a given ``status``, optionally
+        only those of ``tenant``.
+        """
+        raise NotImplementedError
+
+    def claim(self, max_running_per_tenant: int, now: float) -> Optional[Job]:
+        """
+        Method for marking the next queued job as running, and returning
+        it. Returns ``None`` when no job can run.
+        """
+        raise NotImplementedError
+
+    def requeue(self, job_id: str):
+        """
+        Method for putting a running job back in the queue.
+        """
+        raise NotImplementedError
+
+    def finish(
+        self,
+        job_id: str,
+        result: Optional[Dict[str, Any]],
+        error: Optional[str],
+        now: float,
+        expires_at: float,
+    ):
+        """
+        Method for storing the result, or the error, of a finished job,
+        which is kept until ``expires_at``.
+        """
+        raise NotImplementedError
+
+    def purge(
+        self,
+        now: float,
+        started_before: float,
+        expires_at: float,
+    ) -> int:
+        """
+        Method for removing the jobs whose result expired, and failing
+        the running jobs started before ``started_before``, whose error
+        is kept until ``expires_at``. Returns the number of removed jobs.
+        """
+        raise NotImplementedError
+
+
+class MemoryJobStore(JobStore):
+    """
+    In-memory job store, private to the worker process.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def add(self, job: Job):
+        """
+        Method for adding a queued job to the store.
+        """
+        with self._lock:
+            self._jobs[job.job_id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Method for retrieving a job from the store.
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def count(self, status: str, tenant: Optional[str] = None) -> int:
+        """
+        Method for counting the jobs with a given ``status``.
+        """
+        with self._lock:
+            return sum(
+                1
+                for xx in self._jobs.values()
+                if xx.status == status and tenant in (None, xx.tenant)
+            )
+
+    def claim(self, max_running_per_tenant: int, now: float) -> Optional[Job]:
+        """
+        Method for marking the next queued job as running.
+        """
+        with self._lock:
+            running = Counter(
+                xx.tenant for xx in self._jobs.values() if xx.status == RUNNING
+            )
+            candidates = [
+                xx
+                for xx in self._jobs.values()
+                if xx.status == QUEUED
+                and running[xx.tenant] < max_running_per_tenant
+            ]
+            if not candidates:
+                return None
+            job = min(candidates, key=lambda xx: (-xx.priority, xx.created_at))
+            job.status = RUNNING
+            job.started_at = now
+
+            return job
+
+    def requeue(self, job_id: str):
+        """
+        Method for putting a running job back in the queue.
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+            job.status = QUEUED
+            job.started_at = None
+
+    def finish(
+        self,
+        job_id: str,
+        result: Optional[Dict[str, Any]],
+        error: Optional[str],
+        now: float,
+        expires_at: float,
+    ):
+        """
+        Method for storing the result, or the error, of a finished job.
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+            job.status = FAILED if error is not None else SUCCEEDED
+            job.result = result
+            job.error = error
+            job.finished_at = now
+            job.expires_at = expires_at
+
+    def purge(
+        self,
+        now: float,
+        started_before: float,
+        expires_at: float,
+    ) -> int:
+        """
+        Method for removing expired jobs, and failing timed-out ones.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == RUNNING and job.started_at < started_before:
+                    job.status = FAILED
+                    job.error = "Job timed out"
+                    job.finished_at = now
+                    job.expires_at = expires_at
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.expires_at is not None and job.expires_at <= now
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+        return len(expired)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store kept in a local SQLite database, so that jobs survive
+    restarts, and every worker of the host can report on any job.
+
+    Jobs are claimed within an immediate transaction, so the workers never
+    claim the same job twice, and the per-tenant limits hold across them.
+    """
+
+    _COLUMNS = (
+        "job_id, kind, payload, tenant, priority, status, created_at, "
+        "started_at, finished_at, expires_at, result, error"
+    )
+
+    def __init__(self, path: str = JOBS_SQLITE_PATH):
+        self.path = path
+
+        self._lock = threading.Lock()
+        # Transactions are managed explicitly
+        self._conn = sqlite3.connect(
+            path,
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=30,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " tenant TEXT NOT NULL,"
+            " priority INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL,"
+            " expires_at REAL,"
+            " result TEXT,"
+            " error TEXT)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_by_status "
+            "ON jobs (status, priority DESC, created_at)"
+        )
+
+    @staticmethod
+    def _to_job(row) -> Job:
+        return Job(
+            job_id=row[0],
+            kind=row[1],
+            payload=json.loads(row[2]),
+            tenant=row[3],
+            priority=row[4],
+            status=row[5],
+            created_at=row[6],
+            started_at=row[7],
+            finished_at=row[8],
+            expires_at=row[9],
+            result=None if row[10] is None else json.loads(row[10]),
+            error=row[11],
+        )
+
+    def add(self, job: Job):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jobs ({self._COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, NULL, NULL, NULL, NULL, NULL)",
+                (
+                    job.job_id,
+                    job.kind,
+                    json.dumps(job.payload),
+                    job.tenant,
+                    job.priority,
+                    job.status,
+                    job.created_at,
+                ),
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+
+        return None if row is None else self._to_job(row)
+
+    def count(self, status: str, tenant: Optional[str] = None) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? "
+                "AND (? IS NULL OR tenant = ?)",
+                (status, tenant, tenant),
+            ).fetchone()[0]
+
+    def claim(self, max_running_per_tenant: int, now: float) -> Optional[Job]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT {self._COLUMNS} FROM jobs "
+                    "WHERE status = ? AND tenant NOT IN ("
+                    " SELECT tenant FROM jobs WHERE status = ?"
+                    " GROUP BY tenant HAVING COUNT(*) >= ?) "
+                    "ORDER BY priority DESC, created_at ASC LIMIT 1",
+                    (QUEUED, RUNNING, max_running_per_tenant),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, started_at = ? "
+                        "WHERE job_id = ?",
+                        (RUNNING, now, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = self._to_job(row)
+        job.status = RUNNING
+        job.started_at = now
+
+        return job
+
+    def requeue(self, job_id: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL "
+                "WHERE job_id = ?",
+                (QUEUED, job_id),
+            )
+
+    def finish(
+        self,
+        job_id: str,
+        result: Optional[Dict[str, Any]],
+        error: Optional[str],
+        now: float,
+        expires_at: float,
+    ):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, "
+                "finished_at = ?, expires_at = ? WHERE job_id = ?",
+                (
+                    FAILED if error is not None else SUCCEEDED,
+                    None if result is None else json.dumps(result),
+                    error,
+                    now,
+                    expires_at,
+                    job_id,
+                ),
+            )
+
+    def purge(
+        self,
+        now: float,
+        started_before: float,
+        expires_at: float,
+    ) -> int:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, "
+                "expires_at = ? WHERE status = ? AND started_at < ?",
+                (
+                    FAILED,
+                    "Job timed out",
+                    now,
+                    expires_at,
+                    RUNNING,
+                    started_before,
+                ),
+            )
+            return self._conn.execute(
+                "DELETE FROM jobs WHERE expires_at <= ?",
+                (now,),
+            ).rowcount
+
+
+class JobQueue(object):
+    """
+    Queue of generation jobs, run in the background by a pool of workers
+    on the event loop of the app.
+
+    The workers hand the generations over to the inference executor, so
+    jobs are bounded by it just like the interactive requests. When the
+    executor is saturated, the job goes back to the queue, and the worker
+    waits before claiming another one. Jobs run as background work, so
+    they never take the workers reserved for interactive requests.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]],
+        workers: int = JOBS_WORKERS,
+        tenant_max_running: int = JOBS_TENANT_MAX_RUNNING,
+        tenant_max_queued: int = JOBS_TENANT_MAX_QUEUED,
+        result_ttl_seconds: float = JOBS_RESULT_TTL_SECONDS,
+        running_timeout_seconds: float = JOBS_RUNNING_TIMEOUT_SECONDS,
+        poll_interval: float = JOBS_POLL_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.time,
+        executor: Optional[InferenceExecutor] = None,
+    ):
+        self.store = store
+        self.handlers = handlers
+        self.workers = max(0, workers)
+        self.tenant_max_running = max(1, tenant_max_running)
+        self.tenant_max_queued = tenant_max_queued
+        self.result_ttl_seconds = result_ttl_seconds
+        self.running_timeout_seconds = running_timeout_seconds
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.executor = executor
+
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        tenant: str,
+        priority: int = 0,
+    ) -> Job:
+        """
+        Method for adding a job to the queue.
+
+        Raises
+        ---------
+        ApiException
+            With a ``429`` status code, when the tenant already has too
+            many queued jobs.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind `{kind}`")
+        if self.store.count(QUEUED, tenant=tenant) >= self.tenant_max_queued:
+            raise ApiException(
+                message=f"Too many queued jobs for tenant `{tenant}`.",
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            kind=kind,
+            payload=payload,
+            tenant=tenant,
+            priority=priority,
+            created_at=self.clock(),
+        )
+        self.store.add(job)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Method for retrieving a job. Returns ``None`` for unknown jobs, and
+        for jobs whose result expired.
+        """
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        if job.expires_at is not None and job.expires_at <= self.clock():
+            return None
+
+        return job
+
+    async def run_once(self) -> bool:
+        """
+        Method for claiming and running the next job. Returns whether
+        there was a job to run.
+        """
+        now = self.clock()
+        job = await asyncio.to_thread(
+            self.store.claim,
+            self.tenant_max_running,
+            now,
+        )
+        if job is None:
+            return False
+        JOB_WAIT_SECONDS.observe(now - job.created_at, kind=job.kind)
+
+        result, error = None, None
+        try:
+            result = await self.handlers[job.kind](job.payload)
+        except asyncio.CancelledError:
+            # The queue is stopping
+            self.store.requeue(job.job_id)
+            raise
+        except ApiException as e:
+            if e.status_code != status.HTTP_429_TOO_MANY_REQUESTS:
+                error = e.message
+            else:
+                await asyncio.to_thread(self.store.requeue, job.job_id)
+                retry_after = (e.headers or {}).get("Retry-After")
+                await asyncio.sleep(
+                    float(retry_after) if retry_after else self.poll_interval
+                )
+                return True
+        except HTTPException as e:
+            error = str(e.detail)
+        except Exception as e:
+            logger.exception(f"!!! Job `{job.job_id}` failed. e: {e}")
+            error = str(e)
+
+        finished_at = self.clock()
+        await asyncio.to_thread(
+            self.store.finish,
+            job.job_id,
+            result,
+            error,
+            finished_at,
+            finished_at + self.result_ttl_seconds,
+        )
+        JOBS_FINISHED.inc(
+            kind=job.kind,
+            status=FAILED if error is not None else SUCCEEDED,
+        )
+
+        return True
+
+    async def purge(self) -> int:
+        """
+        Method for removing expired jobs, and failing lost ones.
+        """
+        now = self.clock()
+
+        return await asyncio.to_thread(
+            self.store.purge,
+            now,
+            now - self.running_timeout_seconds,
+            now + self.result_ttl_seconds,
+        )
+
+    async def _work(self):
+        """
+        Method for running jobs until the queue gets stopped.
+        """
+        while True:
+            try:
+                if await self.run_once():
+                    continue
+                await self.purge()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"!!! Job worker error. e: {e}")
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    timeout=self.poll_interval,
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self):
+        """
+        Method for starting the workers on the running event loop.
+        """
+        self.check_workers()
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._work()) for _ in range(self.workers)
+        ]
+        logger.info(f">>> Started {self.workers} job worker(s)")
+
+    def check_workers(self) -> bool:
+        """
+        Method for checking the number of workers against the background
+        workers of the inference executor. Returns whether they fit, and
+        logs a warning when they don't, since the extra workers would only
+        keep requeueing their jobs.
+        """
+        executor = self.executor
+        executor = get_inference_executor() if executor is None else executor
+        background_workers = executor.background_workers
+        if background_workers == 0 and self.workers > 0:
+            logger.warning(
+                f"!!! Every one of the {executor.max_workers} inference "
+                f"worker(s) is reserved for interactive requests, so jobs "
+                f"only run while no interactive request is. Raise "
+                f"`INFERENCE_WORKERS` above `INFERENCE_RESERVED_WORKERS`."
+            )
+            return False
+        if self.workers > background_workers:
+            logger.warning(
+                f"!!! `JOBS_WORKERS` ({self.workers}) is above the "
+                f"{background_workers} inference worker(s) left for "
+                f"background work. Lower it to {background_workers}."
+            )
+            return False
+
+        return True
+
+    async def stop(self):
+        """
+        Method for stopping the workers. Jobs that were running go back to
+        the queue, so another worker can pick them up.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+# ------------------------------ HANDLERS -------------------------------------
+
+
+async def _run_llm(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from app.models.genai.llm_prompt import LLMRequest
+    from app.service.llm_service import LLMService
+
+    return await LLMService.ainvoke(
+        request=LLMRequest(**payload),
+        background=True,
+    )
+
+
+async def _run_llm_batch(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from app.models.genai.llm_prompt import LLMBatchRequest
+    from app.service.llm_service import LLMService
+
+    return await LLMService.ainvoke_batch(request=LLMBatchRequest(**payload))
+
+
+JOB_HANDLERS = {
+    "llm": _run_llm,
+    "llm_batch": _run_llm_batch,
+}
+
+# -------------------------------- QUEUE --------------------------------------
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Function for retrieving the process-wide job queue.
+    """
+    global _job_queue
+
+    with _job_queue_lock:
+        if _job_queue is None:
+            if JOBS_BACKEND == "sqlite":
+                store = SQLiteJobStore()
+            elif JOBS_BACKEND == "memory":
+                store = MemoryJobStore()
+            else:
+                raise ValueError(f"Unknown job store `{JOBS_BACKEND}`")
+            _job_queue = JobQueue(store=store, handlers=JOB_HANDLERS)
+
+    return _job_queue
+
+
+# -------------------------------- METRICS ------------------------------------
+
+_metrics = get_metrics_registry()
+JOB_WAIT_SECONDS = _metrics.histogram(
+    "llm_job_wait_seconds",
+    "Time that jobs spend queued before a worker picks them up",
+    labelnames=("kind",),
+)
+_metrics.gauge(
+    "llm_jobs_queued",
+    "Number of jobs waiting for a job worker",
+).set_function(
+    lambda: 0 if _job_queue is None else _job_queue.store.count(QUEUED)
+)
+JOBS_FINISHED = _metrics.counter(
+    "llm_jobs_finished_total",
+    "Number of finished jobs",
+    labelnames=("kind", "status"),
+)
@@ -21,91 +21,745 @@
 # SOFTWARE.
 
 from app.utils.logging import get_logger
-from app.models.genai.llm_prompt import LLMRequest
+from app.models.genai.llm_prompt import LLMBatchRequest, LLMRequest
+from app.service.batching import (
+    BATCH_MAX_SIZE,
+    BATCH_RESULT_TIMEOUT_SECONDS,
+    BATCHING_ENABLED,
+    PendingRequest,
+    get_batch_scheduler,
+)
+from app.service.inference_executor import (
+    InferenceExecutor,
+    get_inference_executor,
+)
+from app.service.model_registry import (
+    LoadedModel,
+    ModelKey,
+    ModelRegistry,
+    get_model_registry,
+)
+from app.service.prefix_cache import PrefixCache, get_prefix_cache
+from app.service.speculative import generate_with_assistant
+from app.service.tokenization import (
+    count_tokens,
+    decode_batch,
+    encode_batch,
+)
 from app.utils import aws_utils as au
+from app.utils.metrics import get_metrics_registry
+import asyncio
+import concurrent.futures
+import copy
 import os
-from functools import cache
-from transformers import AutoModelForCausalLM, AutoTokenizer
-import torch
+import threading
+import time
 from fastapi import HTTPException
-from typing import Dict
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 __author__ = ["Victor Calderon"]
 __all__ = [
     "LLMService",
+    "chunk_prompts",
+    "generate_batch",
+    "generate_chunk",
+    "generate_chunked",
+    "get_hf_token",
+    "length_sorted_chunks",
 ]
 
 logger = get_logger(__name__)
 
-# Rading in HuggingFace token
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+# How often (in seconds) a stream checks whether its client went away
+STREAM_DISCONNECT_POLL_SECONDS = float(
+    os.getenv("STREAM_DISCONNECT_POLL_SECONDS", "0.5")
+)
+
+# -------------------------------- METRICS ------------------------------------
+
+_metrics = get_metrics_registry()
+TIME_TO_FIRST_TOKEN = _metrics.histogram(
+    "llm_time_to_first_token_seconds",
+    "Time between receiving a streaming request and its first token",
+    labelnames=("model_name",),
+)
+# Time spent in each stage of a request: `model_lookup`, `tokenization`,
+# `generate`, `decode` and `serialization`.
+STAGE_SECONDS = _metrics.histogram(
+    "llm_stage_seconds",
+    "Time spent in each stage of an LLM request",
+    labelnames=("model_name", "stage"),
+)
+TOKENS_IN = _metrics.counter(
+    "llm_tokens_in_total",
+    "Number of prompt tokens processed",
+    labelnames=("model_name",),
+)
+TOKENS_OUT = _metrics.counter(
+    "llm_tokens_out_total",
+    "Number of tokens generated",
+    labelnames=("model_name",),
+)
+
+# Maximum number of prompts accepted by a single bulk request
+BULK_MAX_PROMPTS = int(os.getenv("BULK_MAX_PROMPTS", "1000"))
+
+# Marks the end of a stream
+_END_OF_STREAM = object()
 
 
 # ------------------------------- SECRETS -------------------------------------
 
 HF_TOKEN_SECRET_NAME = os.getenv("HF_CREDENTIALS_SECRET_NAME")
-AWS_REGION = os.getenv("AWS_REGION")
 
-# Reading in secret
-HF_TOKEN = au.get_aws_secret(
-    secret_name=HF_TOKEN_SECRET_NAME,
-    region_name=AWS_REGION,
-)["HF_TOKEN"]
+
+def get_hf_token() -> Optional[str]:
+    """
+    Function for reading in the HuggingFace token. The secret is fetched
+    on first use and cached, instead of when the module gets imported.
+    Without a configured secret, the token is read from the ``HF_TOKEN``
+    environment variable, if set.
+    """
+    if not HF_TOKEN_SECRET_NAME:
+        return os.getenv("HF_TOKEN")
+
+    return au.get_secret_cache().get(HF_TOKEN_SECRET_NAME).get("HF_TOKEN")
+
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def generate_batch(
+    model_obj: Any,
+    tokenizer: Any,
+    prompts: List[str],
+    temperature: float,
+    max_lengths: List[int],
+    model_name: str = "",
+) -> List[str]:
+    """
+    Function for generating the responses of several prompts with a single,
+    padded call to ``generate``.
+
+    Each response is trimmed to its own ``max_length``, i.e. the maximum
+    number of tokens of the prompt plus the generated tokens, so it matches
+    the response of running the prompt on its own.
+    """
+    import torch
+
+    with STAGE_SECONDS.time(model_name=model_name, stage="tokenization"):
+        input_msgs = encode_batch(tokenizer, prompts)
+    padded_length = input_msgs["input_ids"].shape[1]
+    prompt_lengths = input_msgs["attention_mask"].sum(dim=1).tolist()
+    max_new_tokens = [
+        max(max_length - prompt_length, 0)
+        for max_length, prompt_length in zip(max_lengths, prompt_lengths)
+    ]
+
+    with STAGE_SECONDS.time(model_name=model_name, stage="generate"):
+        with torch.no_grad():
+            output_encoded = model_obj.generate(
+                **input_msgs,
+                temperature=temperature,
+                max_new_tokens=max(max(max_new_tokens), 1),
+                pad_token_id=tokenizer.pad_token_id,
+            )
+
+    sequences, n_tokens_out = [], 0
+    with STAGE_SECONDS.time(model_name=model_name, stage="decode"):
+        for idx, row in enumerate(output_encoded):
+            # Dropping the padding of the prompt, and the tokens beyond the
+            # `max_length` of the request.
+            start = padded_length - prompt_lengths[idx]
+            prompt_ids = row[start:padded_length]
+            new_ids = row[padded_length : padded_length + max_new_tokens[idx]]
+            n_tokens_out += int((new_ids != tokenizer.pad_token_id).sum())
+            sequences.append(torch.cat([prompt_ids, new_ids]))
+        generated_texts = decode_batch(tokenizer, sequences)
+
+    TOKENS_IN.inc(sum(prompt_lengths), model_name=model_name)
+    TOKENS_OUT.inc(n_tokens_out, model_name=model_name)
+
+    return generated_texts
+
+
+def length_sorted_chunks(
+    lengths: Sequence[int],
+    chunk_size: int,
+) -> List[List[int]]:
+    """
+    Function for splitting items into chunks of at most ``chunk_size``,
+    grouping items of similar length, so that little padding is needed
+    within each chunk.
+
+    Returns the indices of the items in each chunk.
+    """
+    chunk_size = max(1, chunk_size)
+    order = sorted(range(len(lengths)), key=lambda idx: lengths[idx])
+
+    return [
+        order[start : start + chunk_size]
+        for start in range(0, len(order), chunk_size)
+    ]
+
+
+def chunk_prompts(
+    tokenizer: Any,
+    prompts: List[str],
+    max_length: int,
+    chunk_size: int = BATCH_MAX_SIZE,
+) -> Tuple[List[Dict[str, Any]], List[List[int]]]:
+    """
+    Function for splitting prompts into chunks of prompts of similar
+    length. Prompts that do not fit within ``max_length`` are rejected up
+    front.
+
+    Returns one result per prompt, holding the ``error`` of the rejected
+    ones, and the indices of the prompts of every chunk.
+    """
+    results = [{"index": idx} for idx in range(len(prompts))]
+    token_counts = count_tokens(tokenizer, prompts)
+
+    valid_indices = []
+    for idx, n_tokens in enumerate(token_counts):
+        if n_tokens > max_length:
+            results[idx]["error"] = (
+                f"Prompt has {n_tokens} tokens, more than the `max_length` "
+                f"of {max_length}"
+            )
+        else:
+            valid_indices.append(idx)
+
+    chunks = length_sorted_chunks(
+        [token_counts[idx] for idx in valid_indices],
+        chunk_size=chunk_size,
+    )
+
+    return results, [[valid_indices[pos] for pos in xx] for xx in chunks]
+
+
+def generate_chunk(
+    model_obj: Any,
+    tokenizer: Any,
+    prompts: List[str],
+    indices: List[int],
+    results: List[Dict[str, Any]],
+    temperature: float,
+    max_length: int,
+    model_name: str = "",
+    generate_fn: Optional[Callable[..., List[str]]] = None,
+):
+    """
+    Function for generating the responses of a chunk of prompts, given by
+    their ``indices``, into their ``results``. When the whole chunk fails,
+    its prompts are retried one at a time, so that a single bad prompt
+    does not fail the rest of its chunk.
+    """
+    generate_fn = generate_batch if generate_fn is None else generate_fn
+
+    def run(chunk: List[int]):
+        responses = generate_fn(
+            model_obj=model_obj,
+            tokenizer=tokenizer,
+            prompts=[prompts[idx] for idx in chunk],
+            temperature=temperature,
+            max_lengths=[max_length] * len(chunk),
+            model_name=model_name,
+        )
+        for idx, response in zip(chunk, responses):
+            results[idx]["response"] = response
+
+    try:
+        run(indices)
+    except Exception as e:
+        if len(indices) == 1:
+            results[indices[0]]["error"] = str(e)
+            return
+        logger.warning(
+            f"!!! Chunk of {len(indices)} prompts failed, retrying them "
+            f"one at a time. e: {e}"
+        )
+        for idx in indices:
+            try:
+                run([idx])
+            except Exception as item_error:
+                results[idx]["error"] = str(item_error)
+
+
+def generate_chunked(
+    model_obj: Any,
+    tokenizer: Any,
+    prompts: List[str],
+    temperature: float,
+    max_length: int,
+    chunk_size: int = BATCH_MAX_SIZE,
+    model_name: str = "",
+    generate_fn: Optional[Callable[..., List[str]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Function for generating the responses of many prompts, in padded
+    chunks of prompts of similar length.
+
+    A failure only affects the prompts it belongs to. Prompts that do not
+    fit within ``max_length`` are rejected up front, and when a whole chunk
+    fails, its prompts are retried one at a time, so that a single bad
+    prompt does not fail the rest of its chunk.
+
+    Returns one result per prompt, in the order of ``prompts``, with either
+    its ``response`` or its ``error``.
+    """
+    results, chunks = chunk_prompts(
+        tokenizer,
+        prompts,
+        max_length=max_length,
+        chunk_size=chunk_size,
+    )
+    for indices in chunks:
+        generate_chunk(
+            model_obj=model_obj,
+            tokenizer=tokenizer,
+            prompts=prompts,
+            indices=indices,
+            results=results,
+            temperature=temperature,
+            max_length=max_length,
+            model_name=model_name,
+            generate_fn=generate_fn,
+        )
+
+    return results
+
+
+def _make_batch_fn(
+    key: ModelKey,
+    registry: ModelRegistry,
+) -> Callable[[List[PendingRequest]], List[str]]:
+    """
+    Function for creating the function used by the batch scheduler of
+    a model to run a group of compatible requests.
+    """
+
+    def batch_fn(batch: List[PendingRequest]) -> List[str]:
+        loaded_model = registry.get(key)
+
+        return generate_batch(
+            model_obj=loaded_model.model,
+            tokenizer=loaded_model.tokenizer,
+            prompts=[xx.prompt for xx in batch],
+            temperature=batch[0].temperature,
+            max_lengths=[xx.max_length for xx in batch],
+            model_name=key.model_name,
+        )
+
+    return batch_fn
+
+
+def _log_abandoned_generation(generation: asyncio.Future):
+    """
+    Function for retrieving the error of a generation whose stream was
+    abandoned, so it gets logged once instead of going unretrieved.
+    """
+    if generation.cancelled() or generation.exception() is None:
+        return
+    logger.info(
+        f">>> Abandoned stream ended with an error: {generation.exception()}"
+    )
 
 
 # --------------------------- CLASS DEFINITION --------------------------------
 
 
 class LLMService(object):
-    def __init__(self, request: LLMRequest):
+    def __init__(
+        self,
+        request: LLMRequest,
+        registry: Optional[ModelRegistry] = None,
+    ):
         # Initializing parameters
         self.prompt = request.prompt
         self.model_name = request.model_name
         self.temperature = request.temperature
         self.max_length = request.max_length
+        self.registry = get_model_registry() if registry is None else registry
+        self.prefix_cache = get_prefix_cache()
+        self.model_key = ModelKey.for_model(self.model_name)
+        self.assistant_model_name = request.assistant_model_name
 
         # Initializing model components
         self.model_obj, self.tokenizer = self.initialize_model()
+        self.assistant = self.initialize_assistant()
 
-    @cache
-    def initialize_model(self) -> None:
+    def initialize_model(self):
         """
-        Method for initializing the model from HuggingFace. It initializes
-        the corresponding tokenizer and model from Hugging Face.
+        Method for initializing the model from HuggingFace. The tokenizer
+        and model are retrieved from the process-wide model registry, and
+        only get loaded from Hugging Face the first time they are used.
         """
-        # --- Tokenizer
-        tokenizer = AutoTokenizer.from_pretrained(
-            self.model_name,
-            token=HF_TOKEN,
+        with STAGE_SECONDS.time(
+            model_name=self.model_name,
+            stage="model_lookup",
+        ):
+            loaded_model = self.registry.get(self.model_key)
+
+        return loaded_model.model, loaded_model.tokenizer
+
+    def initialize_assistant(self) -> Optional[LoadedModel]:
+        """
+        Method for retrieving the assistant model of the request, if any,
+        from the same model registry as the model itself.
+        """
+        if not self.assistant_model_name:
+            return None
+        with STAGE_SECONDS.time(
+            model_name=self.model_name,
+            stage="model_lookup",
+        ):
+            return self.registry.get(
+                ModelKey.for_model(self.assistant_model_name)
+            )
+
+    @classmethod
+    async def ainvoke(
+        cls,
+        request: LLMRequest,
+        executor: Optional[InferenceExecutor] = None,
+        background: bool = False,
+    ) -> Dict[str, str]:
+        """
+        Method for invoking the LLM without blocking the event loop. Both
+        the model lookup and the generation run on the inference executor,
+        as ``background`` work for jobs.
+        """
+        executor = get_inference_executor() if executor is None else executor
+
+        return await executor.run(
+            lambda: cls(request=request).invoke(),
+            background=background,
         )
 
-        # --- LLM model
-        model_obj = AutoModelForCausalLM.from_pretrained(
-            self.model_name,
-            token=HF_TOKEN,
+    @classmethod
+    async def ainvoke_batch(
+        cls,
+        request: LLMBatchRequest,
+        executor: Optional[InferenceExecutor] = None,
+        registry: Optional[ModelRegistry] = None,
+    ) -> Dict[str, Any]:
+        """
+        Method for invoking the LLM on many prompts without blocking the
+        event loop.
+
+        Every chunk of prompts runs as its own background work on the
+        inference executor, so interactive requests take a worker between
+        chunks, instead of waiting for the whole request. A request is
+        only rejected if it cannot start.
+        """
+        executor = get_inference_executor() if executor is None else executor
+        registry = get_model_registry() if registry is None else registry
+
+        def plan() -> Tuple[LoadedModel, List[Dict], List[List[int]]]:
+            with STAGE_SECONDS.time(
+                model_name=request.model_name,
+                stage="model_lookup",
+            ):
+                try:
+                    loaded_model = registry.get(
+                        ModelKey.for_model(request.model_name)
+                    )
+                except Exception as e:
+                    raise HTTPException(status_code=500, detail=str(e))
+
+            results, chunks = chunk_prompts(
+                loaded_model.tokenizer,
+                request.prompts,
+                max_length=request.max_length,
+                chunk_size=request.chunk_size or BATCH_MAX_SIZE,
+            )
+            return loaded_model, results, chunks
+
+        loaded_model, results, chunks = await executor.run(
+            plan,
+            background=True,
         )
+        for indices in chunks:
+            await executor.run(
+                generate_chunk,
+                model_obj=loaded_model.model,
+                tokenizer=loaded_model.tokenizer,
+                prompts=request.prompts,
+                indices=indices,
+                results=results,
+                temperature=request.temperature,
+                max_length=request.max_length,
+                model_name=request.model_name,
+                background=True,
+                wait=True,
+            )
+        failed = sum(1 for xx in results if "error" in xx)
+
+        return {
+            "model_name": request.model_name,
+            "results": results,
+            "succeeded": len(results) - failed,
+            "failed": failed,
+        }
+
+    @classmethod
+    def astream(
+        cls,
+        request: LLMRequest,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        executor: Optional[InferenceExecutor] = None,
+        registry: Optional[ModelRegistry] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Method for streaming the text generated by the LLM, piece by piece,
+        as soon as it is produced.
+
+        The generation takes its slot of the inference executor right away,
+        so a saturated executor raises the ``429`` before any response gets
+        sent. It is stopped as soon as the consumer stops iterating, or
+        when ``is_disconnected`` reports that the client went away, so
+        abandoned requests do not keep using the CPU.
+
+        Must be called from the event loop.
+        """
+        executor = get_inference_executor() if executor is None else executor
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop_event = threading.Event()
+
+        def on_text(text: str):
+            loop.call_soon_threadsafe(queue.put_nowait, text)
+
+        generation = executor.submit(
+            lambda: cls(request=request, registry=registry).stream(
+                on_text=on_text,
+                stop_event=stop_event,
+            )
+        )
+        generation.add_done_callback(
+            lambda _: queue.put_nowait(_END_OF_STREAM)
+        )
+
+        return cls._iterate_stream(
+            request=request,
+            generation=generation,
+            queue=queue,
+            stop_event=stop_event,
+            is_disconnected=is_disconnected,
+        )
+
+    @staticmethod
+    async def _iterate_stream(
+        request: LLMRequest,
+        generation: asyncio.Future,
+        queue: asyncio.Queue,
+        stop_event: threading.Event,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]],
+    ) -> AsyncIterator[str]:
+        """
+        Method for yielding the text of a running generation, as it gets
+        handed to ``queue``.
+        """
+        start_time = time.perf_counter()
+        first_token = True
+        awaited = False
+        try:
+            while True:
+                try:
+                    text = await asyncio.wait_for(
+                        queue.get(),
+                        timeout=STREAM_DISCONNECT_POLL_SECONDS,
+                    )
+                except asyncio.TimeoutError:
+                    if is_disconnected is not None and await is_disconnected():
+                        logger.info(">>> Client disconnected, stopping stream")
+                        return
+                    continue
+                if text is _END_OF_STREAM:
+                    break
+                if first_token:
+                    TIME_TO_FIRST_TOKEN.observe(
+                        time.perf_counter() - start_time,
+                        model_name=request.model_name,
+                    )
+                    first_token = False
+                yield text
+            # Surfacing any errors raised during the generation
+            awaited = True
+            await generation
+        finally:
+            stop_event.set()
+            if not awaited:
+                generation.add_done_callback(_log_abandoned_generation)
+
+    def stream(
+        self,
+        on_text: Callable[[str], None],
+        stop_event: Optional[threading.Event] = None,
+    ):
+        """
+        Method for invoking the LLM and handing each new piece of generated
+        text to ``on_text`` as soon as it is decoded. The generation stops
+        early once ``stop_event`` is set.
+        """
+        from transformers import StoppingCriteriaList
+
+        from app.service.streaming import (
+            CallbackTextStreamer,
+            CancellationCriteria,
+        )
+
+        stop_event = threading.Event() if stop_event is None else stop_event
+        input_msgs = self._tokenize()
+        streamer = CallbackTextStreamer(
+            self.tokenizer,
+            on_text=on_text,
+            skip_special_tokens=True,
+        )
+
+        # Decoding happens in the streamer, as part of `generate`
+        with STAGE_SECONDS.time(model_name=self.model_name, stage="generate"):
+            output_encoded = self._generate(
+                input_msgs,
+                streamer=streamer,
+                stopping_criteria=StoppingCriteriaList(
+                    [CancellationCriteria(stop_event)]
+                ),
+            )
+        self._count_tokens(input_msgs, output_encoded)
+
+    def _generate(self, input_msgs: Any, **generate_kwargs) -> Any:
+        """
+        Method for running ``generate`` on a tokenized prompt. When the
+        prefix cache is enabled, the generation continues from the cached
+        attention state of the longest known prefix of the prompt.
+
+        Requests with an assistant model run an assisted generation
+        instead, which does not use the prefix cache.
+        """
+        import torch
+
+        generate_kwargs.update(
+            temperature=self.temperature,
+            max_length=self.max_length,
+        )
+        with torch.no_grad():
+            if self.assistant is not None:
+                output_encoded, _ = generate_with_assistant(
+                    model_obj=self.model_obj,
+                    tokenizer=self.tokenizer,
+                    assistant_model=self.assistant.model,
+                    assistant_tokenizer=self.assistant.tokenizer,
+                    input_msgs=input_msgs,
+                    model_name=self.model_name,
+                    assistant_model_name=self.assistant_model_name,
+                    **generate_kwargs,
+                )
+                return output_encoded
+
+            if self.prefix_cache is not None:
+                past_key_values = self._cached_prefix_state(
+                    prefix_cache=self.prefix_cache,
+                    input_ids=input_msgs["input_ids"],
+                )
+                if past_key_values is not None:
+                    generate_kwargs["past_key_values"] = past_key_values
+
+            return self.model_obj.generate(**input_msgs, **generate_kwargs)
+
+    def _cached_prefix_state(
+        self,
+        prefix_cache: PrefixCache,
+        input_ids: Any,
+    ) -> Optional[Any]:
+        """
+        Method for retrieving a copy of the cached attention state of the
+        longest known prefix of a prompt. Prefixes that are seen often
+        enough get their state computed and cached first.
+        """
+        token_ids = input_ids[0].tolist()
+        cached_prefix, n_cacheable = prefix_cache.lookup(
+            model_key=self.model_key,
+            token_ids=token_ids,
+        )
+        if cached_prefix is None and n_cacheable:
+            outputs = self.model_obj(
+                input_ids=input_ids[:, :n_cacheable],
+                use_cache=True,
+            )
+            cached_prefix = prefix_cache.put(
+                model_key=self.model_key,
+                token_ids=token_ids[:n_cacheable],
+                past_key_values=outputs.past_key_values,
+            )
+        if cached_prefix is None:
+            return None
+
+        # `generate` extends the cache in place
+        return copy.deepcopy(cached_prefix.past_key_values)
 
-        return model_obj, tokenizer
+    def _tokenize(self) -> Any:
+        """
+        Method for tokenizing the prompt of the request.
+        """
+        with STAGE_SECONDS.time(
+            model_name=self.model_name,
+            stage="tokenization",
+        ):
+            return self.tokenizer(self.prompt, return_tensors="pt")
+
+    def _count_tokens(self, input_msgs: Any, output_encoded: Any):
+        """
+        Method for recording the number of prompt and generated tokens.
+        """
+        n_tokens_in = input_msgs["input_ids"].shape[1]
+        TOKENS_IN.inc(n_tokens_in, model_name=self.model_name)
+        TOKENS_OUT.inc(
+            output_encoded.shape[1] - n_tokens_in,
+            model_name=self.model_name,
+        )
 
     def invoke(self) -> Dict[str, str]:
         """
         Method for invoking the LLM with an input prompt.
         """
         try:
-            input_msgs = self.tokenizer(self.prompt, return_tensors="pt")
+            # Assisted generation only runs one prompt at a time
+            if BATCHING_ENABLED and self.assistant is None:
+                return {"response": self._invoke_batched()}
 
-            with torch.no_grad():
+            input_msgs = self._tokenize()
+
+            with STAGE_SECONDS.time(
+                model_name=self.model_name,
+                stage="generate",
+            ):
                 # Generating output response
-                output_encoded = self.model_obj.generate(
-                    **input_msgs,
-                    temperature=self.temperature,
-                    max_length=self.max_length,
-                )
+                output_encoded = self._generate(input_msgs)
+            self._count_tokens(input_msgs, output_encoded)
 
             # Decoding tokens
-            generated_text = self.tokenizer.decode(
-                output_encoded[0],
-                skip_special_tokens=True,
-            )
+            with STAGE_SECONDS.time(
+                model_name=self.model_name,
+                stage="decode",
+            ):
+                generated_text = self.tokenizer.decode(
+                    output_encoded[0],
+                    skip_special_tokens=True,
+                )
 
             return {"response": generated_text}
         except Exception as e:
@@ -113,3 +767,39 @@ class LLMService(object):
                 status_code=500,
                 detail=str(e),
             )
+
+    def _invoke_batched(self) -> str:
+        """
+        Method for invoking the LLM through the micro-batching scheduler
+        of the model, so that concurrent requests share a single call
+        to ``generate``.
+        """
+        batch_fn = _make_batch_fn(key=self.model_key, registry=self.registry)
+        scheduler = get_batch_scheduler(key=self.model_key, batch_fn=batch_fn)
+        try:
+            future = scheduler.submit(
+                prompt=self.prompt,
+                temperature=self.temperature,
+                max_length=self.max_length,
+            )
+        except RuntimeError:
+            # The model was evicted, stopping its scheduler, in the meantime
+            scheduler = get_batch_scheduler(
+                key=self.model_key,
+                batch_fn=batch_fn,
+            )
+            future = scheduler.submit(
+                prompt=self.prompt,
+                temperature=self.temperature,
+                max_length=self.max_length,
+            )
+
+        try:
+            return future.result(timeout=BATCH_RESULT_TIMEOUT_SECONDS)
+        except concurrent.futures.TimeoutError:
+            # Requests still waiting in the queue are not run
+            future.cancel()
+            raise TimeoutError(
+                "Batched generation did not finish within "
+                f"{BATCH_RESULT_TIMEOUT_SECONDS}s"
+            )
@@ -0,0 +1,221 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import mmap
+import os
+import struct
+import warnings
+from typing import Any, Dict, Optional
+
+from app.utils.logging import get_logger
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "has_safetensors",
+    "load_mmap_model",
+    "load_mmap_state_dict",
+    "resolve_model_dir",
+]
+
+logger = get_logger(__name__)
+
+# Files needed to build a model and its tokenizer from a local directory
+MODEL_FILE_PATTERNS = [
+    "*.json",
+    "*.safetensors",
+    "*.model",
+    "*.txt",
+]
+SAFETENSORS_INDEX_NAME = "model.safetensors.index.json"
+SAFETENSORS_WEIGHTS_NAME = "model.safetensors"
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def resolve_model_dir(
+    model_name: str,
+    revision: Optional[str] = None,
+    token: Optional[str] = None,
+) -> str:
+    """
+    Function for finding the local directory of a model, downloading its
+    files from HuggingFace when ``model_name`` is not a local directory.
+    """
+    if os.path.isdir(model_name):
+        return model_name
+
+    from huggingface_hub import snapshot_download
+
+    return snapshot_download(
+        model_name,
+        revision=revision,
+        token=token,
+        allow_patterns=MODEL_FILE_PATTERNS,
+    )
+
+
+def has_safetensors(model_dir: str) -> bool:
+    """
+    Function for checking whether the weights of a model are stored in the
+    safetensors format.
+    """
+    return any(
+        os.path.isfile(os.path.join(model_dir, xx))
+        for xx in (SAFETENSORS_INDEX_NAME, SAFETENSORS_WEIGHTS_NAME)
+    )
+
+
+def _load_safetensors_file(path: str) -> Dict[str, Any]:
+    """
+    Function for loading the tensors of a safetensors file as read-only
+    views of a memory map of the file, without copying them.
+
+    The file starts with the length of its JSON header, as a little-endian
+    64-bit integer, followed by the header, which lists the dtype, shape
+    and byte offsets of every tensor within the data that follows it.
+    """
+    import torch
+
+    dtypes = {
+        "F64": torch.float64,
+        "F32": torch.float32,
+        "F16": torch.float16,
+        "BF16": torch.bfloat16,
+        "I64": torch.int64,
+        "I32": torch.int32,
+        "I16": torch.int16,
+        "I8": torch.int8,
+        "U8": torch.uint8,
+        "BOOL": torch.bool,
+    }
+
+    with open(path, "rb") as weights_file:
+        (header_length,) = struct.unpack("<Q", weights_file.read(8))
+        header = json.loads(weights_file.read(header_length))
+        # The map stays open for as long as a tensor references it
+        buffer = mmap.mmap(
+            weights_file.fileno(),
+            0,
+            access=mmap.ACCESS_READ,
+        )
+
+    data_start = 8 + header_length
+    state_dict = {}
+    with warnings.catch_warnings():
+        # The tensors are read-only, and PyTorch warns about it
+        warnings.simplefilter("ignore", UserWarning)
+        for name, info in header.items():
+            if name == "__metadata__":
+                continue
+            dtype = dtypes[info["dtype"]]
+            start, end = info["data_offsets"]
+            n_items = (end - start) // dtype.itemsize
+            if n_items == 0:
+                tensor = torch.empty(0, dtype=dtype)
+            else:
+                tensor = torch.frombuffer(
+                    buffer,
+                    dtype=dtype,
+                    count=n_items,
+                    offset=data_start + start,
+                )
+            state_dict[name] = tensor.reshape(info["shape"])
+
+    return state_dict
+
+
+def load_mmap_state_dict(model_dir: str) -> Dict[str, Any]:
+    """
+    Function for loading the weights of a model, which may be sharded
+    across several safetensors files, as memory-mapped tensors.
+    """
+    index_path = os.path.join(model_dir, SAFETENSORS_INDEX_NAME)
+    if os.path.isfile(index_path):
+        with open(index_path, "r") as index_file:
+            weight_map = json.load(index_file)["weight_map"]
+        filenames = sorted(set(weight_map.values()))
+    else:
+        filenames = [SAFETENSORS_WEIGHTS_NAME]
+
+    state_dict = {}
+    for filename in filenames:
+        state_dict.update(
+            _load_safetensors_file(os.path.join(model_dir, filename))
+        )
+
+    return state_dict
+
+
+def load_mmap_model(
+    model_dir: str,
+    torch_dtype: Any,
+    model_class: Optional[Any] = None,
+) -> Any:
+    """
+    Function for building a model, by default a causal language model,
+    whose weights are memory-mapped, read-only, from its safetensors files.
+
+    The pages of the weights live in the page cache, so every process
+    that maps the same files shares a single copy of them. Weights stored
+    with a dtype other than ``torch_dtype`` have to be converted, which
+    creates a private copy of them.
+    """
+    from transformers import AutoConfig, AutoModelForCausalLM
+    from transformers.modeling_utils import no_init_weights
+
+    model_class = AutoModelForCausalLM if model_class is None else model_class
+    config = AutoConfig.from_pretrained(model_dir)
+    # Parameters are allocated but never initialized, so their pages are
+    # never touched before being replaced by the memory-mapped tensors.
+    with no_init_weights():
+        model_obj = model_class.from_config(
+            config,
+            torch_dtype=torch_dtype,
+        )
+
+    state_dict = load_mmap_state_dict(model_dir)
+    converted = [
+        name
+        for name, tensor in state_dict.items()
+        if tensor.is_floating_point() and tensor.dtype != torch_dtype
+    ]
+    if converted:
+        logger.warning(
+            f"!!! {len(converted)} tensors of `{model_dir}` are not stored "
+            f"as {torch_dtype}, and get copied instead of shared"
+        )
+        for name in converted:
+            state_dict[name] = state_dict[name].to(torch_dtype)
+
+    result = model_obj.load_state_dict(state_dict, strict=False, assign=True)
+    model_obj.tie_weights()
+    tied_keys = set(getattr(model_obj, "_tied_weights_keys", None) or [])
+    missing_keys = set(result.missing_keys) - tied_keys
+    if missing_keys:
+        raise ValueError(
+            f"Weights of `{model_dir}` are missing tensors: "
+            f"{sorted(missing_keys)}"
+        )
+    model_obj.eval()
+
+    return model_obj
@@ -0,0 +1,538 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.utils.logging import get_logger
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "ArtifactIntegrityError",
+    "ModelArtifact",
+    "fetch_model",
+    "list_artifacts",
+    "prune_artifacts",
+    "resolve_artifact",
+    "verify_artifact",
+]
+
+logger = get_logger(__name__)
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+# Directory with the pre-fetched model artifacts, laid out as:
+#   <MODEL_ARTIFACTS_DIR>/<org>--<name>/versions/<commit>/  Model files
+#   <MODEL_ARTIFACTS_DIR>/<org>--<name>/refs/<revision>     Commit of a ref
+MODEL_ARTIFACTS_DIR = os.getenv("MODEL_ARTIFACTS_DIR", "/opt/models")
+# Whether models may only be loaded from `MODEL_ARTIFACTS_DIR`, without ever
+# reaching the HuggingFace Hub.
+MODEL_OFFLINE = os.getenv("MODEL_OFFLINE", "0") == "1"
+# How artifacts are checked against their manifest before being loaded:
+#   - `sha256`: Size and SHA-256 digest of every file.
+#   - `size`: Size of every file only.
+#   - `none`: No checks.
+# Hashing reads the full weights once per worker, on every cold start, so
+# the runtime only checks sizes by default. Digests are checked by the
+# `verify` command, e.g. when the image gets built.
+MODEL_ARTIFACTS_VERIFY = os.getenv("MODEL_ARTIFACTS_VERIFY", "size")
+
+VERIFY_MODES = ("sha256", "size", "none")
+DEFAULT_REVISION = "main"
+MANIFEST_NAME = "manifest.json"
+# Files needed to build a model and its tokenizer
+ARTIFACT_FILE_PATTERNS = [
+    "*.json",
+    "*.safetensors",
+    "*.model",
+    "*.txt",
+]
+_HASH_CHUNK_BYTES = 8 * 1024**2
+
+# Artifacts already verified by this process
+_verified: Dict[str, str] = {}
+_verified_lock = threading.Lock()
+
+# ---------------------------- DATA STRUCTURES --------------------------------
+
+
+class ArtifactIntegrityError(RuntimeError):
+    """
+    Raised when the files of an artifact do not match its manifest.
+    """
+
+
+@dataclass
+class ModelArtifact:
+    """
+    Version of a model stored in the artifacts directory.
+    """
+
+    model_name: str
+    commit: str
+    path: str
+    size_bytes: int
+    fetched_at: float
+    refs: List[str] = field(default_factory=list)
+
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def _model_root(model_name: str, root: str) -> str:
+    """
+    Function for building the directory of all the versions of a model.
+    """
+    return os.path.join(root, model_name.replace("/", "--"))
+
+
+def _file_sha256(path: str) -> str:
+    """
+    Function for computing the SHA-256 digest of a file, in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as input_file:
+        for chunk in iter(lambda: input_file.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _read_manifest(version_dir: str) -> Dict[str, Any]:
+    """
+    Function for reading the manifest of an artifact.
+    """
+    with open(os.path.join(version_dir, MANIFEST_NAME), "r") as manifest:
+        return json.load(manifest)
+
+
+def build_manifest(
+    model_name: str,
+    commit: str,
+    version_dir: str,
+) -> Dict[str, Any]:
+    """
+    Function for listing the size and SHA-256 digest of every file of an
+    artifact.
+    """
+    files = {}
+    for dirpath, _, filenames in os.walk(version_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            relpath = os.path.relpath(path, version_dir)
+            if relpath == MANIFEST_NAME or relpath.startswith(".cache"):
+                continue
+            files[relpath] = {
+                "size": os.path.getsize(path),
+                "sha256": _file_sha256(path),
+            }
+
+    return {
+        "model_name": model_name,
+        "commit": commit,
+        "fetched_at": time.time(),
+        "files": dict(sorted(files.items())),
+    }
+
+
+def verify_artifact(
+    version_dir: str,
+    mode: str = MODEL_ARTIFACTS_VERIFY,
+):
+    """
+    Function for checking the files of an artifact against its manifest.
+
+    Raises
+    ----------
+    ArtifactIntegrityError
+        If a file is missing, or its size or digest do not match.
+    """
+    if mode not in VERIFY_MODES:
+        raise ValueError(
+            f"Unknown verify mode `{mode}`. Options: {VERIFY_MODES}"
+        )
+    if mode == "none":
+        return
+    try:
+        manifest = _read_manifest(version_dir)
+    except (OSError, ValueError) as exc:
+        raise ArtifactIntegrityError(
+            f"Invalid manifest in `{version_dir}`: {exc}"
+        ) from exc
+
+    for relpath, expected in manifest["files"].items():
+        path = os.path.join(version_dir, relpath)
+        if not os.path.isfile(path):
+            raise ArtifactIntegrityError(f"Missing file `{path}`")
+        if os.path.getsize(path) != expected["size"]:
+            raise ArtifactIntegrityError(f"Size mismatch of `{path}`")
+        if mode == "sha256" and _file_sha256(path) != expected["sha256"]:
+            raise ArtifactIntegrityError(f"Checksum mismatch of `{path}`")
+
+
+def fetch_model(
+    model_name: str,
+    revision: Optional[str] = None,
+    root: str = MODEL_ARTIFACTS_DIR,
+    token: Optional[str] = None,
+    force: bool = False,
+) -> str:
+    """
+    Function for downloading the files of a model from HuggingFace into a
+    new version of the artifacts directory, and pointing ``revision`` at it.
+
+    Returns
+    ----------
+    version_dir : str
+        Directory with the files of the model.
+    """
+    from huggingface_hub import HfApi, snapshot_download
+
+    revision = revision or DEFAULT_REVISION
+    commit = HfApi(token=token).model_info(model_name, revision=revision).sha
+    model_root = _model_root(model_name, root)
+    version_dir = os.path.join(model_root, "versions", commit)
+
+    if os.path.isdir(version_dir) and not force:
+        logger.info(f"Model `{model_name}@{commit}` is already fetched")
+    else:
+        os.makedirs(os.path.join(model_root, "versions"), exist_ok=True)
+        # Files are downloaded next to their final location, and moved
+        # there only once complete, so a failed fetch leaves no artifact.
+        staging_dir = tempfile.mkdtemp(
+            prefix=".staging-",
+            dir=os.path.join(model_root, "versions"),
+        )
+        try:
+            snapshot_download(
+                model_name,
+                revision=commit,
+                token=token,
+                local_dir=staging_dir,
+                allow_patterns=ARTIFACT_FILE_PATTERNS,
+            )
+            shutil.rmtree(
+                os.path.join(staging_dir, ".cache"),
+                ignore_errors=True,
+            )
+            manifest = build_manifest(model_name, commit, staging_dir)
+            with open(os.path.join(staging_dir, MANIFEST_NAME), "w") as out:
+                json.dump(manifest, out, indent=2)
+            shutil.rmtree(version_dir, ignore_errors=True)
+            os.rename(staging_dir, version_dir)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        logger.info(
+            f"Fetched model `{model_name}@{commit}` into `{version_dir}`"
+        )
+
+    _write_ref(model_root, revision, commit)
+
+    return version_dir
+
+
+def _write_ref(model_root: str, revision: str, commit: str):
+    """
+    Function for pointing a revision of a model at one of its versions.
+    """
+    ref_path = os.path.join(model_root, "refs", revision)
+    os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+    tmp_path = f"{ref_path}.tmp"
+    with open(tmp_path, "w") as ref_file:
+        ref_file.write(commit)
+    os.replace(tmp_path, ref_path)
+
+
+def _read_refs(model_root: str) -> Dict[str, str]:
+    """
+    Function for reading the commit that every revision of a model
+    points at.
+    """
+    refs_dir = os.path.join(model_root, "refs")
+    refs = {}
+    if not os.path.isdir(refs_dir):
+        return refs
+    for dirpath, _, filenames in os.walk(refs_dir):
+        for filename in filenames:
+            if filename.endswith(".tmp"):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, "r") as ref_file:
+                refs[os.path.relpath(path, refs_dir)] = ref_file.read().strip()
+
+    return refs
+
+
+def resolve_artifact(
+    model_name: str,
+    revision: Optional[str] = None,
+    root: str = MODEL_ARTIFACTS_DIR,
+    verify: str = MODEL_ARTIFACTS_VERIFY,
+) -> Optional[str]:
+    """
+    Function for finding the local files of a model, verified against
+    their manifest. ``revision`` is either a ref, e.g. ``main``, or a
+    commit.
+
+    Returns
+    ----------
+    version_dir : str, optional
+        Directory with the files of the model, or ``None`` if the model
+        has not been fetched.
+    """
+    revision = revision or DEFAULT_REVISION
+    model_root = _model_root(model_name, root)
+    commit = _read_refs(model_root).get(revision, revision)
+    version_dir = os.path.join(model_root, "versions", commit)
+    if not os.path.isfile(os.path.join(version_dir, MANIFEST_NAME)):
+        return None
+
+    # Every artifact only gets verified once per process
+    with _verified_lock:
+        if _verified.get(version_dir) != verify:
+            start_time = time.perf_counter()
+            verify_artifact(version_dir, mode=verify)
+            _verified[version_dir] = verify
+            logger.info(
+                f"Verified model `{model_name}@{commit}`",
+                verify=verify,
+                seconds=round(time.perf_counter() - start_time, 3),
+            )
+
+    return version_dir
+
+
+def list_artifacts(root: str = MODEL_ARTIFACTS_DIR) -> List[ModelArtifact]:
+    """
+    Function for listing every version of every model in the artifacts
+    directory.
+    """
+    artifacts = []
+    if not os.path.isdir(root):
+        return artifacts
+
+    for model_dirname in sorted(os.listdir(root)):
+        model_root = os.path.join(root, model_dirname)
+        versions_dir = os.path.join(model_root, "versions")
+        if not os.path.isdir(versions_dir):
+            continue
+        refs = _read_refs(model_root)
+        for commit in sorted(os.listdir(versions_dir)):
+            version_dir = os.path.join(versions_dir, commit)
+            try:
+                manifest = _read_manifest(version_dir)
+            except (OSError, ValueError):
+                continue
+            artifacts.append(
+                ModelArtifact(
+                    model_name=manifest["model_name"],
+                    commit=commit,
+                    path=version_dir,
+                    size_bytes=sum(
+                        xx["size"] for xx in manifest["files"].values()
+                    ),
+                    fetched_at=manifest["fetched_at"],
+                    refs=sorted(kk for kk, vv in refs.items() if vv == commit),
+                )
+            )
+
+    return artifacts
+
+
+def prune_artifacts(
+    root: str = MODEL_ARTIFACTS_DIR,
+    keep: int = 1,
+    model_name: Optional[str] = None,
+    dry_run: bool = False,
+) -> List[ModelArtifact]:
+    """
+    Function for deleting the versions of models that no ref points at,
+    apart from the ``keep`` most recently fetched ones of every model, as
+    well as leftovers of failed fetches.
+
+    Returns
+    ----------
+    pruned : list
+        Versions that were, or with ``dry_run`` would be, deleted.
+    """
+    by_model: Dict[str, List[ModelArtifact]] = {}
+    for artifact in list_artifacts(root):
+        if model_name is None or artifact.model_name == model_name:
+            by_model.setdefault(artifact.model_name, []).append(artifact)
+
+    pruned = []
+    for artifacts in by_model.values():
+        artifacts.sort(key=lambda xx: xx.fetched_at, reverse=True)
+        pruned.extend(xx for xx in artifacts[keep:] if not xx.refs)
+
+    for artifact in pruned:
+        logger.info(
+            f"{'Would delete' if dry_run else 'Deleting'} model "
+            f"`{artifact.model_name}@{artifact.commit}`",
+            size_bytes=artifact.size_bytes,
+        )
+        if not dry_run:
+            shutil.rmtree(artifact.path)
+
+    if not dry_run and os.path.isdir(root):
+        for model_dirname in os.listdir(root):
+            versions_dir = os.path.join(root, model_dirname, "versions")
+            if not os.path.isdir(versions_dir):
+                continue
+            for dirname in os.listdir(versions_dir):
+                if dirname.startswith(".staging-"):
+                    shutil.rmtree(
+                        os.path.join(versions_dir, dirname),
+                        ignore_errors=True,
+                    )
+
+    return pruned
+
+
+# ------------------------------ COMMAND LINE ---------------------------------
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    """
+    Function for building the parser of the command line interface.
+    """
+    parser = argparse.ArgumentParser(
+        description="Manages the local artifacts of the models",
+    )
+    parser.add_argument(
+        "--root",
+        default=MODEL_ARTIFACTS_DIR,
+        help="Directory of the model artifacts",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fetch_parser = subparsers.add_parser(
+        "fetch",
+        help="Download models from HuggingFace",
+    )
+    fetch_parser.add_argument(
+        "models",
+        nargs="+",
+        help="Models to download, as `name` or `name@revision`",
+    )
+    fetch_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Download the files of versions that are already fetched",
+    )
+
+    subparsers.add_parser("ls", help="List the fetched models")
+
+    prune_parser = subparsers.add_parser(
+        "prune",
+        help="Delete the versions of models that no ref points at",
+    )
+    prune_parser.add_argument("--model", default=None, help="Model to prune")
+    prune_parser.add_argument(
+        "--keep",
+        type=int,
+        default=1,
+        help="Number of recent versions to keep for every model",
+    )
+    prune_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only show the versions that would be deleted",
+    )
+
+    verify_parser = subparsers.add_parser(
+        "verify",
+        help="Check the files of the fetched models against their manifest",
+    )
+    verify_parser.add_argument(
+        "--mode",
+        default="sha256",
+        choices=VERIFY_MODES,
+        help="Checks to run",
+    )
+
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Function for running the command line interface.
+    """
+    args = _get_parser().parse_args(argv)
+
+    if args.command == "fetch":
+        token = os.getenv("HF_TOKEN") or None
+        if token is None and os.getenv("HF_CREDENTIALS_SECRET_NAME"):
+            # Only needed with a secret, as it imports the whole service
+            from app.service.llm_service import get_hf_token
+
+            token = get_hf_token() or None
+        for model in args.models:
+            model_name, _, revision = model.partition("@")
+            fetch_model(
+                model_name,
+                revision=revision or None,
+                root=args.root,
+                token=token,
+                force=args.force,
+            )
+    elif args.command == "ls":
+        for artifact in list_artifacts(args.root):
+            fetched_at = time.strftime(
+                "%Y-%m-%d %H:%M",
+                time.gmtime(artifact.fetched_at),
+            )
+            print(
+                f"{artifact.model_name}\t{artifact.commit[:12]}\t"
+                f"{artifact.size_bytes / 1024**2:.1f} MiB\t{fetched_at}\t"
+                f"{','.join(artifact.refs)}"
+            )
+    elif args.command == "prune":
+        prune_artifacts(
+            args.root,
+            keep=args.keep,
+            model_name=args.model,
+            dry_run=args.dry_run,
+        )
+    elif args.command == "verify":
+        failed = 0
+        for artifact in list_artifacts(args.root):
+            try:
+                verify_artifact(artifact.path, mode=args.mode)
+            except ArtifactIntegrityError as exc:
+                failed += 1
+                logger.error(str(exc))
+        return 1 if failed else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,215 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.service.model_registry import (
+    LoadedModel,
+    ModelKey,
+    ModelRegistry,
+    get_model_registry,
+)
+from app.utils.logging import get_logger
+from app.utils.system import memory_breakdown
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "PreloadState",
+    "get_preload_state",
+    "preload_models",
+    "warm_up_model",
+]
+
+logger = get_logger(__name__)
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+# Comma-separated list of models to load and warm up before serving traffic
+PRELOAD_MODELS = [
+    xx.strip()
+    for xx in os.getenv("PRELOAD_MODELS", "").split(",")
+    if xx.strip()
+]
+WARMUP_PROMPT = os.getenv("WARMUP_PROMPT", "Hello, world!")
+WARMUP_MAX_NEW_TOKENS = int(os.getenv("WARMUP_MAX_NEW_TOKENS", "4"))
+# Number of attempts at preloading the models, e.g. while the model hub is
+# unreachable. A value of ``0`` keeps retrying until it succeeds.
+PRELOAD_MAX_ATTEMPTS = int(os.getenv("PRELOAD_MAX_ATTEMPTS", "0"))
+# Seconds to wait before the first retry, doubling after every failed
+# attempt up to `PRELOAD_MAX_RETRY_SECONDS`
+PRELOAD_RETRY_SECONDS = float(os.getenv("PRELOAD_RETRY_SECONDS", "5"))
+PRELOAD_MAX_RETRY_SECONDS = float(
+    os.getenv("PRELOAD_MAX_RETRY_SECONDS", "300")
+)
+
+# ---------------------------- DATA STRUCTURES --------------------------------
+
+
+@dataclass
+class PreloadState:
+    """
+    Progress of the model preloading and warm-up that runs at startup.
+    """
+
+    status: str = "pending"
+    models: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+    attempts: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _cancelled: threading.Event = field(
+        default_factory=threading.Event,
+        repr=False,
+    )
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def cancel(self):
+        """
+        Method for stopping the retries of a failed preloading, e.g. when
+        the app shuts down.
+        """
+        self._cancelled.set()
+
+    def wait_for_retry(self, seconds: float) -> bool:
+        """
+        Method for waiting before retrying a failed preloading. Returns
+        whether the preloading got cancelled in the meantime.
+        """
+        return self._cancelled.wait(seconds)
+
+    def set(self, **kwargs):
+        with self._lock:
+            for key, value in kwargs.items():
+                setattr(self, key, value)
+
+
+_preload_state = PreloadState()
+
+
+def get_preload_state() -> PreloadState:
+    """
+    Function for retrieving the preloading state of the current process.
+    """
+    return _preload_state
+
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def warm_up_model(
+    loaded_model: LoadedModel,
+    prompt: str = WARMUP_PROMPT,
+    max_new_tokens: int = WARMUP_MAX_NEW_TOKENS,
+):
+    """
+    Function for running a short generation on a model, so that lazy
+    initialization and the first-call overheads are paid before the
+    model serves any request.
+    """
+    import torch
+
+    input_msgs = loaded_model.tokenizer(prompt, return_tensors="pt")
+    with torch.no_grad():
+        loaded_model.model.generate(
+            **input_msgs,
+            max_new_tokens=max_new_tokens,
+        )
+
+
+def preload_models(
+    model_names: Optional[List[str]] = None,
+    registry: Optional[ModelRegistry] = None,
+    state: Optional[PreloadState] = None,
+    max_attempts: int = PRELOAD_MAX_ATTEMPTS,
+    retry_seconds: float = PRELOAD_RETRY_SECONDS,
+    max_retry_seconds: float = PRELOAD_MAX_RETRY_SECONDS,
+) -> PreloadState:
+    """
+    Function for loading and warming up the configured models.
+
+    The returned state is only marked as ``ready`` once every model has
+    been loaded and warmed up. Any failure marks it as ``failed``, so the
+    worker never reports itself as ready with a cold model, and the models
+    that are not ready yet get retried with an exponential backoff, until
+    ``max_attempts`` is reached or the preloading is cancelled.
+    """
+    model_names = PRELOAD_MODELS if model_names is None else model_names
+    registry = get_model_registry() if registry is None else registry
+    state = get_preload_state() if state is None else state
+
+    delay = retry_seconds
+    while True:
+        if _preload_attempt(model_names, registry=registry, state=state):
+            return state
+        if max_attempts > 0 and state.attempts >= max_attempts:
+            logger.error(
+                f">>> Giving up on preloading models after {state.attempts} "
+                "attempts"
+            )
+            return state
+        logger.info(f">>> Retrying to preload models in {delay:.1f}s")
+        if state.wait_for_retry(delay):
+            return state
+        delay = min(delay * 2, max_retry_seconds)
+
+
+def _preload_attempt(
+    model_names: List[str],
+    registry: ModelRegistry,
+    state: PreloadState,
+) -> bool:
+    """
+    Function for loading and warming up the models that are not ready yet.
+    Returns whether every model is ready.
+    """
+    state.set(status="loading", attempts=state.attempts + 1)
+    try:
+        for model_name in model_names:
+            if model_name in state.models:
+                continue
+            start_time = time.perf_counter()
+            loaded_model = registry.get(ModelKey.for_model(model_name))
+            warm_up_model(loaded_model=loaded_model)
+            elapsed = time.perf_counter() - start_time
+            state.set(models={**state.models, model_name: elapsed})
+            memory = memory_breakdown()
+            logger.info(
+                f">>> Model `{model_name}` loaded and warmed up "
+                f"({elapsed:.2f}s)",
+                pid=os.getpid(),
+                load_seconds=elapsed,
+                **{f"{name}_bytes": value for name, value in memory.items()},
+            )
+    except Exception as e:
+        logger.error(f">>> Error while preloading models. e: {e}")
+        state.set(status="failed", error=str(e))
+        return False
+
+    state.set(status="ready", error=None)
+
+    return True
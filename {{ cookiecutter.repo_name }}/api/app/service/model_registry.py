@@ -0,0 +1,526 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.utils.logging import get_logger
+from app.utils.metrics import get_metrics_registry
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "ModelKey",
+    "LoadedModel",
+    "ModelRegistry",
+    "estimate_model_bytes",
+    "get_model_registry",
+    "load_hf_model",
+    "parse_load_modes",
+]
+
+logger = get_logger(__name__)
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+# Maximum amount of memory (in bytes) that loaded models may use before the
+# least recently used ones get evicted. A value of ``0`` disables the limit.
+MODEL_REGISTRY_MAX_BYTES = int(
+    os.getenv("MODEL_REGISTRY_MAX_BYTES", str(8 * 1024**3))
+)
+MODEL_REVISION = os.getenv("MODEL_REVISION") or None
+
+# Supported ways of loading the weights of a model:
+#   - `fp32`: Full precision weights.
+#   - `bf16`: bfloat16 weights, i.e. half the memory of `fp32`.
+#   - `int8`: `fp32` weights, with every `torch.nn.Linear` layer dynamically
+#             quantized to int8.
+LOAD_MODES = ("fp32", "bf16", "int8")
+
+
+def parse_load_modes(value: str) -> Dict[str, str]:
+    """
+    Function for parsing per-model load modes, e.g.
+    ``model_a=bf16,model_b=int8``. Malformed entries, and entries with an
+    unknown load mode, are skipped with a warning instead of keeping the
+    app from starting.
+    """
+    load_modes = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        model_name, _, load_mode = entry.strip().rpartition("=")
+        model_name, load_mode = model_name.strip(), load_mode.strip()
+        if not model_name or load_mode not in LOAD_MODES:
+            logger.warning(
+                f"!!! Skipping `MODEL_LOAD_MODES` entry `{entry.strip()}`. "
+                f"Expected `<model_name>=<load_mode>`, with a load mode "
+                f"in {LOAD_MODES}"
+            )
+            continue
+        load_modes[model_name] = load_mode
+
+    return load_modes
+
+
+# Default load mode, and per-model overrides, e.g. `model_a=bf16,model_b=int8`
+MODEL_LOAD_MODE = os.getenv("MODEL_LOAD_MODE", "fp32")
+MODEL_LOAD_MODES = parse_load_modes(os.getenv("MODEL_LOAD_MODES", ""))
+# Whether to memory-map safetensors weights, read-only, so that every worker
+# process of a host shares a single copy of them through the page cache.
+MODEL_MMAP_WEIGHTS = os.getenv("MODEL_MMAP_WEIGHTS", "0") == "1"
+
+# ---------------------------- DATA STRUCTURES --------------------------------
+
+
+class ModelKey(NamedTuple):
+    """
+    Key that uniquely identifies a set of loaded model weights.
+    """
+
+    model_name: str
+    load_mode: str = MODEL_LOAD_MODE
+    revision: Optional[str] = MODEL_REVISION
+
+    @classmethod
+    def for_model(cls, model_name: str) -> "ModelKey":
+        """
+        Method for building the key of a model, using the load mode that
+        is configured for it.
+        """
+        return cls(
+            model_name=model_name,
+            load_mode=MODEL_LOAD_MODES.get(model_name, MODEL_LOAD_MODE),
+        )
+
+
+@dataclass
+class LoadedModel:
+    """
+    Model and tokenizer held by the registry, along with its bookkeeping.
+    """
+
+    key: ModelKey
+    model: Any
+    tokenizer: Any
+    size_bytes: int
+    load_seconds: float
+    last_used: float = field(default_factory=time.monotonic)
+
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def estimate_model_bytes(model_obj: Any) -> int:
+    """
+    Function to estimate the amount of memory used by the weights and
+    buffers of a model, including quantized weights, which are not
+    exposed as parameters. Tensors shared between layers are only
+    counted once.
+    """
+    if hasattr(model_obj, "state_dict"):
+        tensors = list(model_obj.state_dict().values())
+    else:
+        tensors = list(model_obj.parameters()) + list(model_obj.buffers())
+
+    n_bytes, seen = 0, set()
+    while tensors:
+        tensor = tensors.pop()
+        # Packed parameters of the quantized layers
+        if isinstance(tensor, (tuple, list)):
+            tensors.extend(tensor)
+            continue
+        if not hasattr(tensor, "element_size"):
+            continue
+        data_ptr = getattr(tensor, "data_ptr", lambda: id(tensor))()
+        if data_ptr in seen:
+            continue
+        seen.add(data_ptr)
+        n_bytes += tensor.numel() * tensor.element_size()
+
+    return n_bytes
+
+
+def load_hf_model(
+    key: ModelKey,
+    model_class: Any,
+    mmap_weights: bool = MODEL_MMAP_WEIGHTS,
+) -> Tuple[Any, Any]:
+    """
+    Function for loading the tokenizer and the model, built with
+    ``model_class``, e.g. ``AutoModelForCausalLM``, using the load mode of
+    the key. Models are loaded from the artifacts directory when they have
+    been pre-fetched, and from HuggingFace otherwise.
+    """
+    import torch
+
+    from app.service.inference_runtime import configure_torch
+    from app.service.llm_service import get_hf_token
+    from app.service.mmap_weights import (
+        has_safetensors,
+        load_mmap_model,
+        resolve_model_dir,
+    )
+    from app.service.model_artifacts import MODEL_OFFLINE, resolve_artifact
+    from app.service.tokenization import load_tokenizer
+
+    # Before the first model runs, as the thread pools are fixed after that
+    configure_torch()
+    if key.load_mode not in LOAD_MODES:
+        raise ValueError(
+            f"Unknown load mode `{key.load_mode}`. Options: {LOAD_MODES}"
+        )
+    torch_dtype = torch.bfloat16 if key.load_mode == "bf16" else torch.float32
+
+    # --- Local files of the model, if it was pre-fetched
+    model_dir = resolve_artifact(key.model_name, revision=key.revision)
+    if model_dir is None and MODEL_OFFLINE:
+        raise FileNotFoundError(
+            f"Model `{key.model_name}` has not been fetched, and models "
+            "cannot be downloaded in offline mode"
+        )
+    hf_token = None if model_dir is not None else get_hf_token()
+
+    # Quantized weights are new tensors, which cannot be shared
+    use_mmap = mmap_weights and key.load_mode != "int8"
+    if use_mmap:
+        model_dir = model_dir or resolve_model_dir(
+            key.model_name,
+            revision=key.revision,
+            token=hf_token,
+        )
+        if not has_safetensors(model_dir):
+            logger.warning(
+                f"!!! Model `{key.model_name}` has no safetensors weights, "
+                "loading a private copy of them"
+            )
+            use_mmap = False
+
+    # --- Tokenizer
+    tokenizer = load_tokenizer(
+        model_dir or key.model_name,
+        token=hf_token,
+        revision=None if model_dir else key.revision,
+        local_files_only=model_dir is not None,
+    )
+
+    # --- Model
+    if use_mmap:
+        model_obj = load_mmap_model(
+            model_dir,
+            torch_dtype=torch_dtype,
+            model_class=model_class,
+        )
+    else:
+        model_obj = model_class.from_pretrained(
+            model_dir or key.model_name,
+            token=hf_token,
+            revision=None if model_dir else key.revision,
+            torch_dtype=torch_dtype,
+            local_files_only=model_dir is not None,
+        )
+        model_obj.eval()
+
+    if key.load_mode == "int8":
+        model_obj = torch.ao.quantization.quantize_dynamic(
+            model_obj,
+            {torch.nn.Linear},
+            dtype=torch.qint8,
+        )
+
+    return model_obj, tokenizer
+
+
+def _load_hf_model(key: ModelKey) -> Tuple[Any, Any]:
+    """
+    Function for loading the tokenizer and the causal language model of
+    a key.
+    """
+    from transformers import AutoModelForCausalLM
+
+    return load_hf_model(key, model_class=AutoModelForCausalLM)
+
+
+# --------------------------- CLASS DEFINITION --------------------------------
+
+
+class ModelRegistry(object):
+    """
+    Process-wide store of loaded models, shared across requests.
+
+    Models are kept in least-recently-used order and evicted once the total
+    size of the loaded weights goes above ``max_bytes``. The most recently
+    loaded model is always kept, even if it exceeds the budget on its own.
+    Eviction listeners are called with the key of every model that leaves
+    the registry, so that the resources tied to it can be released.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = MODEL_REGISTRY_MAX_BYTES,
+        loader: Callable[[ModelKey], Tuple[Any, Any]] = _load_hf_model,
+        size_fn: Callable[[Any], int] = estimate_model_bytes,
+    ):
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self.size_fn = size_fn
+
+        self._models: "OrderedDict[ModelKey, LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+        self._eviction_listeners: List[Callable[[ModelKey], None]] = []
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: ModelKey) -> bool:
+        with self._lock:
+            return key in self._models
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._models)
+
+    @property
+    def total_bytes(self) -> int:
+        """
+        Total size, in bytes, of the models currently loaded.
+        """
+        with self._lock:
+            return sum(xx.size_bytes for xx in self._models.values())
+
+    def keys(self) -> List[ModelKey]:
+        """
+        Keys of the loaded models, from least to most recently used.
+        """
+        with self._lock:
+            return list(self._models.keys())
+
+    def add_eviction_listener(self, listener: Callable[[ModelKey], None]):
+        """
+        Method for registering a function to call with the key of every
+        model that gets evicted or removed from the registry.
+        """
+        with self._lock:
+            self._eviction_listeners.append(listener)
+
+    def _notify_evicted(self, keys: List[ModelKey]):
+        """
+        Method for calling the eviction listeners. Must be called without
+        holding ``self._lock``.
+        """
+        with self._lock:
+            listeners = list(self._eviction_listeners)
+        for key in keys:
+            for listener in listeners:
+                try:
+                    listener(key)
+                except Exception as e:
+                    logger.error(
+                        f">>> Eviction listener failed for model "
+                        f"`{key.model_name}`. e: {e}"
+                    )
+
+    def _lookup(self, key: ModelKey) -> Optional[LoadedModel]:
+        """
+        Method for retrieving a model and marking it as recently used.
+        Must be called while holding ``self._lock``.
+        """
+        entry = self._models.get(key)
+        if entry is not None:
+            self._models.move_to_end(key)
+            entry.last_used = time.monotonic()
+
+        return entry
+
+    def peek(self, key: ModelKey) -> Optional[LoadedModel]:
+        """
+        Method for retrieving a model only if it is already loaded, without
+        marking it as recently used.
+        """
+        with self._lock:
+            return self._models.get(key)
+
+    def get(self, key: ModelKey) -> LoadedModel:
+        """
+        Method for retrieving a model from the registry, loading it if
+        it has not been loaded yet.
+
+        Concurrent requests for the same model that is not loaded yet
+        wait for a single load instead of loading it multiple times.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have loaded the model in the meantime
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry
+                self.misses += 1
+
+            logger.info(f">>> Loading model `{key.model_name}` ...")
+            try:
+                start_time = time.perf_counter()
+                model_obj, tokenizer = self.loader(key)
+                load_seconds = time.perf_counter() - start_time
+                entry = LoadedModel(
+                    key=key,
+                    model=model_obj,
+                    tokenizer=tokenizer,
+                    size_bytes=self.size_fn(model_obj),
+                    load_seconds=load_seconds,
+                )
+                logger.info(
+                    f">>> Loading model `{key.model_name}` ... DONE "
+                    f"({load_seconds:.2f}s, {entry.size_bytes} bytes)"
+                )
+
+                with self._lock:
+                    self._models[key] = entry
+                    evicted = self._evict()
+                self._notify_evicted(evicted)
+            finally:
+                # Failed loads must not leave a lock behind for every
+                # unknown model name requested by clients
+                with self._lock:
+                    self._load_locks.pop(key, None)
+
+        return entry
+
+    def _evict(self) -> List[ModelKey]:
+        """
+        Method for evicting the least recently used models until the
+        registry fits within its memory budget. Must be called while
+        holding ``self._lock``. Returns the keys of the evicted models.
+        """
+        evicted = []
+        if self.max_bytes <= 0:
+            return evicted
+
+        total_bytes = sum(xx.size_bytes for xx in self._models.values())
+        while total_bytes > self.max_bytes and len(self._models) > 1:
+            key, entry = self._models.popitem(last=False)
+            total_bytes -= entry.size_bytes
+            self.evictions += 1
+            evicted.append(key)
+            logger.info(f">>> Evicted model `{key.model_name}` from registry")
+
+        return evicted
+
+    def remove(self, key: ModelKey) -> bool:
+        """
+        Method for removing a model from the registry.
+        """
+        with self._lock:
+            removed = self._models.pop(key, None) is not None
+        if removed:
+            self._notify_evicted([key])
+
+        return removed
+
+    def clear(self):
+        """
+        Method for removing every model from the registry and resetting
+        its counters.
+        """
+        with self._lock:
+            keys = list(self._models)
+            self._models.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+        self._notify_evicted(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Method for summarizing the state of the registry.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "loaded_models": len(self._models),
+                "total_bytes": sum(
+                    xx.size_bytes for xx in self._models.values()
+                ),
+                "max_bytes": self.max_bytes,
+                "models": [
+                    {
+                        "model_name": xx.key.model_name,
+                        "load_mode": xx.key.load_mode,
+                        "revision": xx.key.revision,
+                        "size_bytes": xx.size_bytes,
+                        "load_seconds": xx.load_seconds,
+                    }
+                    for xx in self._models.values()
+                ],
+            }
+
+
+# ------------------------------ REGISTRY -------------------------------------
+
+_model_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Function for retrieving the process-wide model registry.
+    """
+    return _model_registry
+
+
+# -------------------------------- METRICS ------------------------------------
+
+_metrics = get_metrics_registry()
+_metrics.gauge(
+    "llm_loaded_models",
+    "Number of models held by the model registry",
+).set_function(lambda: len(_model_registry))
+_metrics.gauge(
+    "llm_loaded_model_bytes",
+    "Estimated size, in bytes, of the models held by the model registry",
+).set_function(lambda: _model_registry.total_bytes)
+_metrics.counter(
+    "llm_model_registry_hits_total",
+    "Number of model lookups served by an already loaded model",
+).set_function(lambda: _model_registry.hits)
+_metrics.counter(
+    "llm_model_registry_misses_total",
+    "Number of model lookups that had to load the model",
+).set_function(lambda: _model_registry.misses)
+_metrics.counter(
+    "llm_model_registry_evictions_total",
+    "Number of models evicted from the model registry",
+).set_function(lambda: _model_registry.evictions)
@@ -0,0 +1,342 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.service.model_registry import ModelKey
+from app.utils.logging import get_logger
+from app.utils.metrics import get_metrics_registry
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "CachedPrefix",
+    "PrefixCache",
+    "estimate_cache_bytes",
+    "get_prefix_cache",
+]
+
+logger = get_logger(__name__)
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+PREFIX_CACHE_ENABLED = os.getenv("PREFIX_CACHE_ENABLED", "0") == "1"
+PREFIX_CACHE_MAX_BYTES = int(
+    os.getenv("PREFIX_CACHE_MAX_BYTES", str(512 * 1024**2))
+)
+# Prefixes are cached in multiples of this number of tokens, so that a
+# lookup only checks one candidate per block of the prompt.
+PREFIX_CACHE_BLOCK_TOKENS = int(os.getenv("PREFIX_CACHE_BLOCK_TOKENS", "16"))
+# Shortest prefix worth caching
+PREFIX_CACHE_MIN_TOKENS = int(os.getenv("PREFIX_CACHE_MIN_TOKENS", "32"))
+# Number of times a prefix has to be seen before its state gets cached
+PREFIX_CACHE_MIN_HITS = int(os.getenv("PREFIX_CACHE_MIN_HITS", "2"))
+# Number of prefixes whose occurrences are tracked
+PREFIX_CACHE_MAX_TRACKED = int(os.getenv("PREFIX_CACHE_MAX_TRACKED", "10000"))
+
+# -------------------------------- METRICS ------------------------------------
+
+_metrics = get_metrics_registry()
+PREFIX_LOOKUPS = _metrics.counter(
+    "llm_prefix_cache_lookups_total",
+    "Number of prompts looked up in the prefix cache",
+    labelnames=("model_name",),
+)
+PREFIX_HITS = _metrics.counter(
+    "llm_prefix_cache_hits_total",
+    "Number of prompts that reused the cached state of a prefix",
+    labelnames=("model_name",),
+)
+PREFIX_SAVED_TOKENS = _metrics.counter(
+    "llm_prefix_cache_saved_prefill_tokens_total",
+    "Number of prompt tokens whose attention state was not recomputed",
+    labelnames=("model_name",),
+)
+
+# ---------------------------- DATA STRUCTURES --------------------------------
+
+
+@dataclass
+class CachedPrefix:
+    """
+    Attention state (``past_key_values``) of the first tokens of a prompt.
+    """
+
+    token_ids: Tuple[int, ...]
+    past_key_values: Any
+    size_bytes: int
+
+    @property
+    def n_tokens(self) -> int:
+        return len(self.token_ids)
+
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def estimate_cache_bytes(past_key_values: Any) -> int:
+    """
+    Function to estimate the memory used by the tensors of a key/value
+    cache, either a ``transformers`` ``Cache`` or nested tuples.
+    """
+    if hasattr(past_key_values, "key_cache"):
+        tensors = list(past_key_values.key_cache)
+        tensors.extend(past_key_values.value_cache)
+    else:
+        tensors = [past_key_values]
+
+    n_bytes = 0
+    while tensors:
+        tensor = tensors.pop()
+        if isinstance(tensor, (tuple, list)):
+            tensors.extend(tensor)
+        elif hasattr(tensor, "element_size"):
+            n_bytes += tensor.numel() * tensor.element_size()
+
+    return n_bytes
+
+
+# --------------------------- CLASS DEFINITION --------------------------------
+
+
+class PrefixCache(object):
+    """
+    Least-recently-used cache of the attention state of frequently seen
+    prompt prefixes, per model.
+
+    Prompts are split in blocks of ``block_tokens`` tokens, and every
+    block-aligned prefix is identified by a hash chained over its blocks.
+    Once a prefix has been seen ``min_hits`` times, its state gets cached,
+    and later prompts starting with it only run the prefill of their
+    remaining tokens.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = PREFIX_CACHE_MAX_BYTES,
+        block_tokens: int = PREFIX_CACHE_BLOCK_TOKENS,
+        min_tokens: int = PREFIX_CACHE_MIN_TOKENS,
+        min_hits: int = PREFIX_CACHE_MIN_HITS,
+        max_tracked: int = PREFIX_CACHE_MAX_TRACKED,
+        size_fn: Callable[[Any], int] = estimate_cache_bytes,
+    ):
+        self.max_bytes = max_bytes
+        self.block_tokens = block_tokens
+        self.min_tokens = min_tokens
+        self.min_hits = min_hits
+        self.max_tracked = max_tracked
+        self.size_fn = size_fn
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[ModelKey, int], CachedPrefix]" = (
+            OrderedDict()
+        )
+        self._seen: "OrderedDict[Tuple[ModelKey, int], int]" = OrderedDict()
+        self._total_bytes = 0
+
+        # Counters
+        self.lookups = 0
+        self.hits = 0
+        self.saved_tokens = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes
+
+    def _prefix_hashes(
+        self,
+        token_ids: Sequence[int],
+        max_tokens: int,
+    ) -> List[Tuple[int, int]]:
+        """
+        Method for hashing every block-aligned prefix of up to
+        ``max_tokens`` tokens that is long enough to be cached, as
+        ``(n_tokens, hash)`` pairs.
+        """
+        hashes, prefix_hash = [], 0
+        for end in range(self.block_tokens, max_tokens + 1, self.block_tokens):
+            block = tuple(token_ids[end - self.block_tokens : end])
+            prefix_hash = hash((prefix_hash, block))
+            if end >= self.min_tokens:
+                hashes.append((end, prefix_hash))
+
+        return hashes
+
+    def lookup(
+        self,
+        model_key: ModelKey,
+        token_ids: Sequence[int],
+    ) -> Tuple[Optional[CachedPrefix], int]:
+        """
+        Method for finding the longest cached prefix of a prompt.
+
+        Returns the cached prefix, if any, and otherwise the number of
+        tokens of the longest prefix that has been seen often enough to
+        be worth caching, or ``0``.
+        """
+        # At least one token is left out, since `generate` needs a new
+        # token to run on.
+        prefix_hashes = self._prefix_hashes(token_ids, len(token_ids) - 1)
+
+        with self._lock:
+            self.lookups += 1
+            PREFIX_LOOKUPS.inc(model_name=model_key.model_name)
+
+            for n_tokens, prefix_hash in reversed(prefix_hashes):
+                entry = self._entries.get((model_key, prefix_hash))
+                # Guarding against hash collisions
+                if entry is not None and (
+                    entry.token_ids == tuple(token_ids[:n_tokens])
+                ):
+                    self._entries.move_to_end((model_key, prefix_hash))
+                    self.hits += 1
+                    self.saved_tokens += n_tokens
+                    PREFIX_HITS.inc(model_name=model_key.model_name)
+                    PREFIX_SAVED_TOKENS.inc(
+                        n_tokens,
+                        model_name=model_key.model_name,
+                    )
+                    return entry, 0
+
+            n_cacheable = 0
+            for n_tokens, prefix_hash in prefix_hashes:
+                seen_key = (model_key, prefix_hash)
+                n_seen = self._seen.pop(seen_key, 0) + 1
+                self._seen[seen_key] = n_seen
+                if n_seen >= self.min_hits:
+                    n_cacheable = n_tokens
+            while len(self._seen) > self.max_tracked:
+                self._seen.popitem(last=False)
+
+        return None, n_cacheable
+
+    def put(
+        self,
+        model_key: ModelKey,
+        token_ids: Sequence[int],
+        past_key_values: Any,
+    ) -> CachedPrefix:
+        """
+        Method for caching the attention state of a prefix. ``token_ids``
+        must be the block-aligned prefix that ``past_key_values`` was
+        computed from, as returned by ``lookup``.
+        """
+        prefix_hashes = self._prefix_hashes(token_ids, len(token_ids))
+        if not prefix_hashes or prefix_hashes[-1][0] != len(token_ids):
+            raise ValueError(
+                f"Prefixes must be a multiple of {self.block_tokens} tokens, "
+                f"and at least {self.min_tokens} tokens long"
+            )
+        prefix_hash = prefix_hashes[-1][1]
+
+        entry = CachedPrefix(
+            token_ids=tuple(token_ids),
+            past_key_values=past_key_values,
+            size_bytes=self.size_fn(past_key_values),
+        )
+        if 0 < self.max_bytes < entry.size_bytes:
+            return entry
+
+        with self._lock:
+            previous = self._entries.pop((model_key, prefix_hash), None)
+            if previous is not None:
+                self._total_bytes -= previous.size_bytes
+            self._entries[(model_key, prefix_hash)] = entry
+            self._total_bytes += entry.size_bytes
+            self._evict()
+
+        return entry
+
+    def _evict(self):
+        """
+        Method for evicting the least recently used prefixes until the
+        cache fits within its memory budget. Must be called while holding
+        ``self._lock``.
+        """
+        if self.max_bytes <= 0:
+            return
+
+        while self._total_bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry.size_bytes
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Method for removing every cached prefix and resetting the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._seen.clear()
+            self._total_bytes = 0
+            self.lookups = 0
+            self.hits = 0
+            self.saved_tokens = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Method for summarizing the state of the cache.
+        """
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "saved_prefill_tokens": self.saved_tokens,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# ------------------------------- CACHE ---------------------------------------
+
+_prefix_cache: Optional[PrefixCache] = (
+    PrefixCache() if PREFIX_CACHE_ENABLED else None
+)
+
+
+def get_prefix_cache() -> Optional[PrefixCache]:
+    """
+    Function for retrieving the process-wide prefix cache. Returns ``None``
+    when the cache is disabled.
+    """
+    return _prefix_cache
+
+
+_metrics.gauge(
+    "llm_prefix_cache_bytes",
+    "Size, in bytes, of the cached prefix states",
+).set_function(
+    lambda: 0 if _prefix_cache is None else _prefix_cache.total_bytes
+)
@@ -0,0 +1,333 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.models.genai.llm_prompt import LLMRequest
+from app.service.model_registry import ModelKey
+from app.utils.logging import get_logger
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "ResponseCache",
+    "SQLiteCacheBackend",
+    "get_response_cache",
+    "request_cache_key",
+]
+
+logger = get_logger(__name__)
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "0") == "1"
+# Either `memory` or `sqlite`
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_MAX_BYTES = int(
+    os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024**2))
+)
+RESPONSE_CACHE_TTL_SECONDS = float(
+    os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600")
+)
+RESPONSE_CACHE_SQLITE_PATH = os.getenv(
+    "RESPONSE_CACHE_SQLITE_PATH",
+    "/tmp/llm_response_cache.sqlite3",
+)
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def request_cache_key(request: LLMRequest) -> str:
+    """
+    Function for computing the canonical key of a request, i.e. a hash of
+    every field that affects the generated response. The assistant model is
+    part of it, since assisted generations only match the plain ones when
+    decoding greedily.
+    """
+    model_key = ModelKey.for_model(request.model_name)
+    payload = {
+        "prompt": request.prompt,
+        "model_name": model_key.model_name,
+        "load_mode": model_key.load_mode,
+        "revision": model_key.revision,
+        "temperature": request.temperature,
+        "max_length": request.max_length,
+        "assistant_model_name": request.assistant_model_name,
+    }
+    serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+# --------------------------- CLASS DEFINITION --------------------------------
+
+
+class CacheBackend(object):
+    """
+    Storage of serialized responses, with a time-to-live per entry.
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-memory, least-recently-used cache bounded by the total size of its
+    keys and values.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _pop(self, key: str):
+        expires_at, value = self._entries.pop(key)
+        self._total_bytes -= len(key) + len(value)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key: str, value: bytes):
+        entry_bytes = len(key) + len(value)
+        if entry_bytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (self.clock() + self.ttl_seconds, value)
+            self._total_bytes += entry_bytes
+            while self._total_bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache stored in a local SQLite database, so that it survives restarts
+    and can be shared by the workers of a host. Least recently used entries
+    are pruned once the stored values go above ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        path: str = RESPONSE_CACHE_SQLITE_PATH,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key = ?",
+                    (key,),
+                )
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                (now, key),
+            )
+            self._conn.commit()
+
+        return bytes(row[0])
+
+    def set(self, key: str, value: bytes):
+        now = self.clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now),
+            )
+            self._prune(now)
+            self._conn.commit()
+
+    def _prune(self, now: float):
+        """
+        Method for removing expired entries, and then the least recently
+        used ones until the cache fits within its budget. Must be called
+        while holding ``self._lock``.
+        """
+        self._conn.execute(
+            "DELETE FROM responses WHERE expires_at <= ?",
+            (now,),
+        )
+        total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(key) + LENGTH(value)), 0) "
+            "FROM responses"
+        ).fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, LENGTH(key) + LENGTH(value) FROM responses "
+            "ORDER BY last_access ASC"
+        )
+        stale_keys = []
+        for key, entry_bytes in rows:
+            if total_bytes <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total_bytes -= entry_bytes
+        self._conn.executemany(
+            "DELETE FROM responses WHERE key = ?",
+            stale_keys,
+        )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+class ResponseCache(object):
+    """
+    Cache of LLM responses, keyed by the canonical hash of their request.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, request: LLMRequest) -> Optional[Dict[str, Any]]:
+        """
+        Method for retrieving the cached response of a request, if any.
+        """
+        value = self.backend.get(request_cache_key(request))
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        return json.loads(value)
+
+    def set(self, request: LLMRequest, response: Dict[str, Any]):
+        """
+        Method for caching the response of a request.
+        """
+        value = json.dumps(response, separators=(",", ":")).encode("utf-8")
+        self.backend.set(request_cache_key(request), value)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+# ------------------------------- CACHE ---------------------------------------
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Function for retrieving the process-wide response cache. Returns
+    ``None`` when the cache is disabled.
+    """
+    global _response_cache
+
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+
+    with _response_cache_lock:
+        if _response_cache is None:
+            if RESPONSE_CACHE_BACKEND == "sqlite":
+                backend = SQLiteCacheBackend()
+            elif RESPONSE_CACHE_BACKEND == "memory":
+                backend = MemoryCacheBackend()
+            else:
+                msg = f"Unknown cache backend `{RESPONSE_CACHE_BACKEND}`"
+                raise ValueError(msg)
+            _response_cache = ResponseCache(backend=backend)
+
+    return _response_cache
@@ -0,0 +1,179 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import contextlib
+import functools
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Tuple
+
+from app.utils.logging import get_logger
+from app.utils.metrics import get_metrics_registry
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "SpeculativeStats",
+    "generate_with_assistant",
+]
+
+logger = get_logger(__name__)
+
+# -------------------------------- METRICS ------------------------------------
+
+_metrics = get_metrics_registry()
+DRAFT_TOKENS = _metrics.counter(
+    "llm_speculative_draft_tokens_total",
+    "Number of tokens proposed by assistant models",
+    labelnames=("model_name", "assistant_model_name"),
+)
+ACCEPTED_TOKENS = _metrics.counter(
+    "llm_speculative_accepted_tokens_total",
+    "Number of tokens proposed by assistant models and accepted",
+    labelnames=("model_name", "assistant_model_name"),
+)
+ACCEPTANCE_RATE = _metrics.histogram(
+    "llm_speculative_acceptance_rate",
+    "Share of the tokens proposed by the assistant model that got accepted",
+    labelnames=("model_name", "assistant_model_name"),
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+)
+
+# ---------------------------- DATA STRUCTURES --------------------------------
+
+
+@dataclass
+class SpeculativeStats:
+    """
+    Outcome of an assisted generation.
+    """
+
+    new_tokens: int
+    draft_tokens: int
+    verify_steps: int
+
+    @property
+    def accepted_tokens(self) -> int:
+        # Every verification step yields one token of the model itself,
+        # on top of the draft tokens that it accepts.
+        accepted_tokens = max(self.new_tokens - self.verify_steps, 0)
+
+        return min(accepted_tokens, self.draft_tokens)
+
+    @property
+    def acceptance_rate(self) -> float:
+        if not self.draft_tokens:
+            return 0.0
+        return self.accepted_tokens / self.draft_tokens
+
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+# Forward calls of every model, counted only in the threads that track them
+_local = threading.local()
+_hooked_models: "weakref.WeakSet" = weakref.WeakSet()
+_hooked_models_lock = threading.Lock()
+
+
+def _count_forward_call(module: Any, args: Any, output: Any):
+    calls = getattr(_local, "calls", None)
+    if calls is not None:
+        calls[id(module)] = calls.get(id(module), 0) + 1
+
+
+@contextlib.contextmanager
+def _forward_calls(*models: Any) -> Iterator[Dict[int, int]]:
+    """
+    Function for counting the forward calls of ``models`` made by the
+    current thread, keyed by the ``id`` of each model. Models are shared
+    by concurrent requests, so calls from other threads are left out.
+    """
+    with _hooked_models_lock:
+        for model_obj in models:
+            if model_obj not in _hooked_models:
+                model_obj.register_forward_hook(_count_forward_call)
+                _hooked_models.add(model_obj)
+
+    _local.calls = {}
+    try:
+        yield _local.calls
+    finally:
+        _local.calls = None
+
+
+@functools.lru_cache(maxsize=16)
+def _same_vocabulary(tokenizer: Any, assistant_tokenizer: Any) -> bool:
+    return tokenizer.get_vocab() == assistant_tokenizer.get_vocab()
+
+
+def generate_with_assistant(
+    model_obj: Any,
+    tokenizer: Any,
+    assistant_model: Any,
+    assistant_tokenizer: Any,
+    input_msgs: Any,
+    model_name: str = "",
+    assistant_model_name: str = "",
+    **generate_kwargs,
+) -> Tuple[Any, SpeculativeStats]:
+    """
+    Function for running an assisted (speculative) generation. The
+    assistant model drafts a few tokens at a time, and the model checks
+    all of them in a single forward pass, keeping the ones it agrees with.
+    Each accepted token saves a forward pass of the model.
+
+    The two models may use different tokenizers, in which case the drafts
+    get translated between them, at some extra cost.
+    """
+    if assistant_tokenizer is not tokenizer and not _same_vocabulary(
+        tokenizer,
+        assistant_tokenizer,
+    ):
+        generate_kwargs.update(
+            tokenizer=tokenizer,
+            assistant_tokenizer=assistant_tokenizer,
+        )
+
+    with _forward_calls(model_obj, assistant_model) as calls:
+        output_encoded = model_obj.generate(
+            **input_msgs,
+            assistant_model=assistant_model,
+            **generate_kwargs,
+        )
+        stats = SpeculativeStats(
+            new_tokens=(
+                output_encoded.shape[1] - input_msgs["input_ids"].shape[1]
+            ),
+            draft_tokens=calls.get(id(assistant_model), 0),
+            verify_steps=calls.get(id(model_obj), 0),
+        )
+
+    labels = dict(
+        model_name=model_name,
+        assistant_model_name=assistant_model_name,
+    )
+    DRAFT_TOKENS.inc(stats.draft_tokens, **labels)
+    ACCEPTED_TOKENS.inc(stats.accepted_tokens, **labels)
+    if stats.draft_tokens:
+        ACCEPTANCE_RATE.observe(stats.acceptance_rate, **labels)
+
+    return output_encoded, stats
@@ -0,0 +1,73 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import threading
+from typing import Any, Callable
+
+import torch
+from transformers import StoppingCriteria, TextStreamer
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "CallbackTextStreamer",
+    "CancellationCriteria",
+]
+
+# --------------------------- CLASS DEFINITION --------------------------------
+
+
+class CallbackTextStreamer(TextStreamer):
+    """
+    Streamer that incrementally decodes the generated tokens and hands
+    every new piece of text to a callback as soon as it is complete.
+    """
+
+    def __init__(
+        self,
+        tokenizer: Any,
+        on_text: Callable[[str], None],
+        **decode_kwargs,
+    ):
+        super().__init__(tokenizer, skip_prompt=True, **decode_kwargs)
+        self.on_text = on_text
+
+    def on_finalized_text(self, text: str, stream_end: bool = False):
+        if text:
+            self.on_text(text)
+
+
+class CancellationCriteria(StoppingCriteria):
+    """
+    Stopping criteria that ends the generation once ``stop_event`` is set,
+    e.g. because the client went away.
+    """
+
+    def __init__(self, stop_event: threading.Event):
+        self.stop_event = stop_event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full(
+            (input_ids.shape[0],),
+            self.stop_event.is_set(),
+            dtype=torch.bool,
+            device=input_ids.device,
+        )
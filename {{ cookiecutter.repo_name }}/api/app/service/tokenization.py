@@ -0,0 +1,204 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.service.model_registry import (
+    ModelKey,
+    ModelRegistry,
+    get_model_registry,
+)
+from app.utils.logging import get_logger
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "count_tokens",
+    "decode_batch",
+    "encode_batch",
+    "get_tokenizer",
+    "load_tokenizer",
+]
+
+logger = get_logger(__name__)
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+# Whether to refuse loading models whose tokenizer only exists as a slow,
+# pure Python implementation.
+TOKENIZER_REQUIRE_FAST = os.getenv("TOKENIZER_REQUIRE_FAST", "0") == "1"
+# Maximum number of tokenizers kept for models that are not in the registry
+TOKENIZER_CACHE_SIZE = int(os.getenv("TOKENIZER_CACHE_SIZE", "16"))
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def load_tokenizer(
+    model_name: str,
+    token: Optional[str] = None,
+    revision: Optional[str] = None,
+    local_files_only: bool = False,
+) -> Any:
+    """
+    Function for loading the tokenizer of a model, using the Rust "fast"
+    implementation whenever the model provides one.
+
+    Tokenizers are padded on the left, so that prompts can be batched for
+    generation.
+    """
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(
+        model_name,
+        token=token,
+        revision=revision,
+        use_fast=True,
+        local_files_only=local_files_only,
+    )
+    if not getattr(tokenizer, "is_fast", False):
+        if TOKENIZER_REQUIRE_FAST:
+            raise ValueError(
+                f"Model `{model_name}` has no fast tokenizer, and "
+                "`TOKENIZER_REQUIRE_FAST` is set"
+            )
+        logger.warning(
+            f"!!! Model `{model_name}` has no fast tokenizer. Falling back "
+            f"to `{type(tokenizer).__name__}`, which is much slower"
+        )
+
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    return tokenizer
+
+
+def encode_batch(
+    tokenizer: Any,
+    prompts: Sequence[str],
+    return_tensors: Optional[str] = "pt",
+) -> Any:
+    """
+    Function for encoding several prompts with a single call to the
+    tokenizer, padding them to the same length.
+    """
+    return tokenizer(
+        list(prompts),
+        return_tensors=return_tensors,
+        padding=return_tensors is not None,
+    )
+
+
+def decode_batch(tokenizer: Any, sequences: Sequence[Any]) -> List[str]:
+    """
+    Function for decoding several sequences of token IDs with a single
+    call to the tokenizer.
+    """
+    return tokenizer.batch_decode(sequences, skip_special_tokens=True)
+
+
+def count_tokens(tokenizer: Any, prompts: Sequence[str]) -> List[int]:
+    """
+    Function for counting the tokens of each prompt, including the special
+    tokens added by the tokenizer.
+    """
+    encoded = encode_batch(tokenizer, prompts, return_tensors=None)
+
+    return [len(xx) for xx in encoded["input_ids"]]
+
+
+# ------------------------------ TOKENIZERS -----------------------------------
+
+# Tokenizers loaded on their own, for models that are not in the registry,
+# from least to most recently used
+_tokenizers: "OrderedDict[ModelKey, Any]" = OrderedDict()
+# Locks of the tokenizers being loaded, so that each one is loaded once,
+# without holding up the others
+_tokenizer_locks: Dict[ModelKey, threading.Lock] = {}
+_tokenizers_lock = threading.Lock()
+
+
+def _load_tokenizer(key: ModelKey) -> Any:
+    """
+    Function for loading the tokenizer of a key, from the artifacts
+    directory when the model has been pre-fetched, and from HuggingFace
+    otherwise.
+    """
+    from app.service.llm_service import get_hf_token
+    from app.service.model_artifacts import MODEL_OFFLINE, resolve_artifact
+
+    model_dir = resolve_artifact(key.model_name, revision=key.revision)
+    if model_dir is not None:
+        return load_tokenizer(model_dir, local_files_only=True)
+    if MODEL_OFFLINE:
+        raise FileNotFoundError(
+            f"Model `{key.model_name}` has not been fetched, and tokenizers "
+            "cannot be downloaded in offline mode"
+        )
+
+    return load_tokenizer(
+        key.model_name,
+        token=get_hf_token(),
+        revision=key.revision,
+    )
+
+
+def get_tokenizer(
+    model_name: str,
+    registry: Optional[ModelRegistry] = None,
+) -> Any:
+    """
+    Function for retrieving the tokenizer of a model without loading its
+    weights. The tokenizer of a model that is already loaded is reused, and
+    the last ``TOKENIZER_CACHE_SIZE`` tokenizers loaded on their own are
+    kept.
+    """
+    registry = get_model_registry() if registry is None else registry
+    key = ModelKey.for_model(model_name)
+    loaded_model = registry.peek(key)
+    if loaded_model is not None:
+        return loaded_model.tokenizer
+
+    with _tokenizers_lock:
+        if key in _tokenizers:
+            _tokenizers.move_to_end(key)
+            return _tokenizers[key]
+        key_lock = _tokenizer_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        with _tokenizers_lock:
+            tokenizer = _tokenizers.get(key)
+        if tokenizer is not None:
+            return tokenizer
+        try:
+            tokenizer = _load_tokenizer(key)
+            with _tokenizers_lock:
+                _tokenizers[key] = tokenizer
+                while len(_tokenizers) > max(TOKENIZER_CACHE_SIZE, 0):
+                    _tokenizers.popitem(last=False)
+        finally:
+            with _tokenizers_lock:
+                _tokenizer_locks.pop(key, None)
+
+    return tokenizer
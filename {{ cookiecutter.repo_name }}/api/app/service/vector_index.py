@@ -0,0 +1,403 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.utils.logging import get_logger
+from app.utils.metrics import get_metrics_registry
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "INDEX_TYPES",
+    "VectorIndex",
+    "get_vector_index",
+]
+
+logger = get_logger(__name__)
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+# Directory of the index, and of the documents of its vectors
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "/tmp/vector_index")
+# Kind of index used when a new one gets created:
+#   - `flat`: Exact search, comparing the query with every vector.
+#   - `ivf`: Vectors are split into `VECTOR_INDEX_IVF_NLIST` clusters, and
+#            only the `VECTOR_INDEX_IVF_NPROBE` closest ones get searched.
+#   - `hnsw`: Graph of the vectors, where the search walks from neighbour
+#             to neighbour. Fast, at the cost of more memory.
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "flat")
+# Whether to memory-map the index when loading it, so that the workers of a
+# host share a single copy of it through the page cache.
+VECTOR_INDEX_MMAP = os.getenv("VECTOR_INDEX_MMAP", "1") == "1"
+VECTOR_INDEX_IVF_NLIST = int(os.getenv("VECTOR_INDEX_IVF_NLIST", "256"))
+VECTOR_INDEX_IVF_NPROBE = int(os.getenv("VECTOR_INDEX_IVF_NPROBE", "16"))
+VECTOR_INDEX_HNSW_M = int(os.getenv("VECTOR_INDEX_HNSW_M", "32"))
+VECTOR_INDEX_HNSW_EF_SEARCH = int(
+    os.getenv("VECTOR_INDEX_HNSW_EF_SEARCH", "64")
+)
+VECTOR_INDEX_HNSW_EF_CONSTRUCTION = int(
+    os.getenv("VECTOR_INDEX_HNSW_EF_CONSTRUCTION", "80")
+)
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+# Vectors needed per cluster to train an IVF index
+_IVF_VECTORS_PER_LIST = 39
+
+# -------------------------------- METRICS ------------------------------------
+
+_metrics = get_metrics_registry()
+VECTOR_SEARCH_SECONDS = _metrics.histogram(
+    "llm_vector_search_seconds",
+    "Time spent searching the vector index",
+    labelnames=("index_type",),
+)
+
+# --------------------------- CLASS DEFINITION --------------------------------
+
+
+class VectorIndex(object):
+    """
+    FAISS index of unit-length vectors, searched by inner product, along
+    with the document of each vector, stored in SQLite.
+
+    The index is saved to disk after every addition, and memory-mapped when
+    loaded. Memory-mapped indexes are read-only, so the first addition
+    loads a private copy of it. Other workers reload the index once it
+    changes on disk.
+
+    Vectors are added to the existing index without rebuilding it. The
+    only exception is an ``ivf`` index, which starts as a ``flat`` one,
+    and gets trained once, as soon as it holds enough vectors to do so.
+
+    Every call to ``add`` writes the whole index to disk, and a worker
+    whose copy is memory-mapped, or older than the file, first reads the
+    whole index into memory. Adding costs I/O in the size of the index,
+    not of the new vectors, so documents should be added in large
+    batches rather than one at a time.
+    """
+
+    def __init__(
+        self,
+        path: str = VECTOR_INDEX_DIR,
+        index_type: str = VECTOR_INDEX_TYPE,
+        mmap: bool = VECTOR_INDEX_MMAP,
+        nlist: int = VECTOR_INDEX_IVF_NLIST,
+        nprobe: int = VECTOR_INDEX_IVF_NPROBE,
+        hnsw_m: int = VECTOR_INDEX_HNSW_M,
+        ef_search: int = VECTOR_INDEX_HNSW_EF_SEARCH,
+        ef_construction: int = VECTOR_INDEX_HNSW_EF_CONSTRUCTION,
+    ):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(
+                f"Unknown index type `{index_type}`. Options: {INDEX_TYPES}"
+            )
+        self.path = path
+        self.index_type = index_type
+        self.mmap = mmap
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+        self.ef_construction = ef_construction
+
+        os.makedirs(path, exist_ok=True)
+        self.index_path = os.path.join(path, "index.faiss")
+        self.lock_path = os.path.join(path, "index.lock")
+        self._lock = threading.Lock()
+        self._index: Optional[Any] = None
+        self._mmapped = False
+        self._mtime_ns: Optional[int] = None
+
+        self._conn = sqlite3.connect(
+            os.path.join(path, "documents.sqlite3"),
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " id INTEGER PRIMARY KEY,"
+            " text TEXT NOT NULL,"
+            " metadata TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+        with self._lock:
+            self._load(mmap=self.mmap)
+
+    @property
+    def ntotal(self) -> int:
+        """
+        Number of vectors in the index.
+        """
+        return 0 if self._index is None else self._index.ntotal
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return None if self._index is None else self._index.d
+
+    def _new_index(self, dimension: int, index_type: str) -> Any:
+        """
+        Method for creating an empty index.
+        """
+        import faiss
+
+        if index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(
+                dimension,
+                self.hnsw_m,
+                faiss.METRIC_INNER_PRODUCT,
+            )
+            index.hnsw.efConstruction = self.ef_construction
+        elif index_type == "ivf":
+            quantizer = faiss.IndexFlatIP(dimension)
+            index = faiss.IndexIVFFlat(
+                quantizer,
+                dimension,
+                self.nlist,
+                faiss.METRIC_INNER_PRODUCT,
+            )
+        else:
+            index = faiss.IndexFlatIP(dimension)
+
+        return self._configure(index)
+
+    def _configure(self, index: Any) -> Any:
+        """
+        Method for applying the search settings to an index.
+        """
+        import faiss
+
+        if isinstance(index, faiss.IndexIVF):
+            index.nprobe = self.nprobe
+        if isinstance(index, faiss.IndexHNSW):
+            index.hnsw.efSearch = self.ef_search
+
+        return index
+
+    def _load(self, mmap: bool):
+        """
+        Method for loading the index from disk, if it was saved. Documents
+        whose vectors were not saved, e.g. because the worker died while
+        adding them, are dropped. Must be called while holding
+        ``self._lock``.
+        """
+        import faiss
+
+        if not os.path.exists(self.index_path):
+            return
+        flags = 0
+        if mmap:
+            # Older versions only memory-map the inverted lists of IVF
+            flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+        mtime_ns = os.stat(self.index_path).st_mtime_ns
+        self._index = self._configure(faiss.read_index(self.index_path, flags))
+        self._mmapped = mmap
+        self._mtime_ns = mtime_ns
+
+        self._conn.execute(
+            "DELETE FROM documents WHERE id >= ?",
+            (self._index.ntotal,),
+        )
+        self._conn.commit()
+
+    def _refresh(self, mmap: bool):
+        """
+        Method for reloading the index when another worker saved a new
+        version of it. Must be called while holding ``self._lock``.
+        """
+        try:
+            mtime_ns = os.stat(self.index_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime_ns != self._mtime_ns:
+            self._load(mmap=mmap)
+
+    def _save(self):
+        """
+        Method for saving the index. The file gets replaced atomically, so
+        workers that memory-mapped the previous version keep reading it.
+        Must be called while holding ``self._lock``.
+        """
+        import faiss
+
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        faiss.write_index(self._index, tmp_path)
+        os.replace(tmp_path, self.index_path)
+        self._mtime_ns = os.stat(self.index_path).st_mtime_ns
+
+    def _add_vectors(self, vectors: Any):
+        """
+        Method for adding vectors to the index. An ``ivf`` index holds the
+        vectors in a ``flat`` index until there are enough of them to
+        train it. Must be called while holding ``self._lock``.
+        """
+        import faiss
+        import numpy as np
+
+        if self._index is None:
+            self._index = self._new_index(
+                vectors.shape[1],
+                "flat" if self.index_type == "ivf" else self.index_type,
+            )
+
+        n_train = self.nlist * _IVF_VECTORS_PER_LIST
+        trainable = (
+            self.index_type == "ivf"
+            and isinstance(self._index, faiss.IndexFlat)
+            and self._index.ntotal + len(vectors) >= n_train
+        )
+        if not trainable:
+            self._index.add(vectors)
+            return
+
+        # Keeping the order of the vectors, which are their IDs
+        vectors = np.concatenate(
+            [self._index.reconstruct_n(0, self._index.ntotal), vectors]
+        )
+        logger.info(f">>> Training IVF index on {len(vectors)} vectors ...")
+        index = self._new_index(vectors.shape[1], "ivf")
+        index.train(vectors)
+        index.add(vectors)
+        self._index = index
+
+    def add(
+        self,
+        vectors: Any,
+        documents: Sequence[Dict[str, Any]],
+    ) -> List[int]:
+        """
+        Method for adding vectors, and their ``documents``, i.e. their
+        ``text`` and ``metadata``, to the index.
+
+        Returns the IDs of the new vectors.
+        """
+        import numpy as np
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(documents):
+            raise ValueError("Expected one vector per document")
+
+        # Workers add vectors one at a time, so that IDs are not reused
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Memory-mapped indexes cannot grow
+            self._refresh(mmap=False)
+            if self._mmapped:
+                self._load(mmap=False)
+            if self.dimension not in (None, vectors.shape[1]):
+                raise ValueError(
+                    f"Vectors have {vectors.shape[1]} dimensions, the index "
+                    f"has {self.dimension}"
+                )
+
+            start = self.ntotal
+            ids = list(range(start, start + len(vectors)))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?)",
+                [
+                    (idx, doc["text"], json.dumps(doc.get("metadata") or {}))
+                    for idx, doc in zip(ids, documents)
+                ],
+            )
+            self._conn.commit()
+            self._add_vectors(vectors)
+            self._save()
+
+        return ids
+
+    def search(
+        self,
+        vectors: Any,
+        k: int,
+    ) -> List[List[Tuple[int, float, Dict[str, Any]]]]:
+        """
+        Method for finding the ``k`` most similar vectors to each of
+        ``vectors``.
+
+        Returns, for each query vector, a list of ``(id, score, document)``
+        tuples, from the most to the least similar.
+        """
+        import numpy as np
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            self._refresh(mmap=self.mmap)
+            if not self.ntotal:
+                return [[] for _ in range(len(vectors))]
+
+            start_time = time.perf_counter()
+            scores, ids = self._index.search(vectors, min(k, self.ntotal))
+            VECTOR_SEARCH_SECONDS.observe(
+                time.perf_counter() - start_time,
+                index_type=type(self._index).__name__,
+            )
+
+            found_ids = sorted({int(xx) for xx in ids.ravel() if xx >= 0})
+            rows = self._conn.execute(
+                "SELECT id, text, metadata FROM documents WHERE id IN "
+                f"({','.join('?' * len(found_ids))})",
+                found_ids,
+            ).fetchall()
+        documents = {
+            row[0]: {"text": row[1], "metadata": json.loads(row[2])}
+            for row in rows
+        }
+
+        return [
+            [
+                (int(idx), float(score), documents.get(int(idx), {}))
+                for idx, score in zip(query_ids, query_scores)
+                if idx >= 0
+            ]
+            for query_ids, query_scores in zip(ids, scores)
+        ]
+
+
+# -------------------------------- INDEX --------------------------------------
+
+_vector_index: Optional[VectorIndex] = None
+_vector_index_lock = threading.Lock()
+
+
+def get_vector_index() -> VectorIndex:
+    """
+    Function for retrieving the process-wide vector index.
+    """
+    global _vector_index
+
+    with _vector_index_lock:
+        if _vector_index is None:
+            _vector_index = VectorIndex()
+
+    return _vector_index
+
+
+_metrics.gauge(
+    "llm_vector_index_size",
+    "Number of vectors in the vector index",
+).set_function(lambda: 0 if _vector_index is None else _vector_index.ntotal)
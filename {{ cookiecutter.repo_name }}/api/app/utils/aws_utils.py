@@ -21,30 +21,72 @@
 # SOFTWARE.
 
 from app.utils.logging import get_logger
-import boto3
-from botocore.exceptions import ClientError
+import functools
 import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 
 __author__ = ["Victor Calderon"]
-__all__ = ["get_aws_secret"]
+__all__ = [
+    "AwsSecretsBackend",
+    "EnvSecretsBackend",
+    "FileSecretsBackend",
+    "SecretCache",
+    "get_aws_secret",
+    "get_secret_cache",
+    "get_secrets_client",
+]
 
 logger = get_logger(__name__)
 
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
 
-def get_aws_secret(
-    secret_name: str,
-    region_name: str,
-) -> str:
+# Where secrets are read from: `aws` (Secrets Manager), `env` or `file`
+SECRETS_BACKEND = os.getenv("SECRETS_BACKEND", "aws")
+SECRETS_FILE_PATH = os.getenv("SECRETS_FILE_PATH", "secrets.json")
+SECRETS_CACHE_TTL_SECONDS = float(
+    os.getenv("SECRETS_CACHE_TTL_SECONDS", "3600")
+)
+# Seconds to wait before fetching an expired secret again, after a failed
+# refresh
+SECRETS_RETRY_SECONDS = float(os.getenv("SECRETS_RETRY_SECONDS", "30"))
+# Comma-separated environment variables that the `env` backend exposes as
+# the keys of every secret
+SECRETS_ENV_KEYS = os.getenv("SECRETS_ENV_KEYS", "HF_TOKEN")
+AWS_REGION = os.getenv("AWS_REGION")
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+@functools.lru_cache(maxsize=None)
+def get_secrets_client(region_name: Optional[str] = None):
     """
-    Function to extract the value of a 'Secret' in AWS.
+    Function for retrieving the Secrets Manager client of a region. The
+    client is created on first use and then reused.
     """
-    # Creating an AWS client
+    import boto3
+
     session = boto3.session.Session()
-    secrets_client = session.client(
+
+    return session.client(
         service_name="secretsmanager",
         region_name=region_name,
     )
 
+
+def get_aws_secret(
+    secret_name: str,
+    region_name: str,
+) -> Dict[str, Any]:
+    """
+    Function to extract the value of a 'Secret' in AWS.
+    """
+    from botocore.exceptions import ClientError
+
+    secrets_client = get_secrets_client(region_name)
+
     try:
         get_secret_value_response = secrets_client.get_secret_value(
             SecretId=secret_name
@@ -58,3 +100,188 @@ def get_aws_secret(
     secret = json.loads(get_secret_value_response["SecretString"])
 
     return secret
+
+
+# --------------------------- CLASS DEFINITION --------------------------------
+
+
+class AwsSecretsBackend(object):
+    """
+    Secrets stored in AWS Secrets Manager.
+    """
+
+    def __init__(self, region_name: Optional[str] = AWS_REGION):
+        self.region_name = region_name
+
+    def fetch(self, secret_name: str) -> Dict[str, Any]:
+        return get_aws_secret(
+            secret_name=secret_name,
+            region_name=self.region_name,
+        )
+
+
+class EnvSecretsBackend(object):
+    """
+    Secrets read from the environment, for local and offline development.
+    Each key of a secret is read from the environment variable with the
+    same name, e.g. ``HF_TOKEN``. Only the variables listed in ``keys`` are
+    exposed, so that the rest of the environment never ends up in a secret.
+    """
+
+    def __init__(self, keys: str = SECRETS_ENV_KEYS):
+        self.keys = [xx.strip() for xx in keys.split(",") if xx.strip()]
+
+    def fetch(self, secret_name: str) -> Dict[str, Any]:
+        return {key: os.environ[key] for key in self.keys if key in os.environ}
+
+
+class FileSecretsBackend(object):
+    """
+    Secrets read from a local JSON file that maps the name of each secret
+    to its values, for tests and offline development.
+    """
+
+    def __init__(self, path: str = SECRETS_FILE_PATH):
+        self.path = path
+
+    def fetch(self, secret_name: str) -> Dict[str, Any]:
+        with open(self.path, "r") as secrets_file:
+            secrets = json.load(secrets_file)
+        if secret_name not in secrets:
+            raise KeyError(f"Secret `{secret_name}` not found in {self.path}")
+
+        return secrets[secret_name]
+
+
+class SecretCache(object):
+    """
+    In-process cache of secrets.
+
+    A secret is fetched from its backend the first time it is requested.
+    After that, a background thread refreshes it before it expires, so
+    callers never wait on the backend again. If a refresh fails, the last
+    known value keeps being served and the refresh is retried after
+    ``retry_seconds``, so an outage of the backend does not turn every
+    request into a call to it.
+    """
+
+    def __init__(
+        self,
+        backend: Any,
+        ttl_seconds: float = SECRETS_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        retry_seconds: float = SECRETS_RETRY_SECONDS,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.retry_seconds = min(retry_seconds, ttl_seconds)
+
+        # Secret name -> (fetched at, value)
+        self._secrets: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def get(self, secret_name: str) -> Dict[str, Any]:
+        """
+        Method for retrieving the value of a secret.
+
+        Expired secrets are fetched again. If that fails, the expired value
+        keeps being served, and the error is only raised for secrets that
+        were never fetched.
+        """
+        with self._lock:
+            entry = self._secrets.get(secret_name)
+        if entry is not None:
+            fetched_at, value = entry
+            if self.clock() - fetched_at < self.ttl_seconds:
+                return value
+
+        try:
+            value = self.refresh(secret_name)
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning(
+                f">>> Could not refresh secret `{secret_name}`, "
+                f"serving the cached value. e: {e}"
+            )
+            value = entry[1]
+            # Backing off, by making the entry expire in `retry_seconds`
+            retry_at = self.clock() - self.ttl_seconds + self.retry_seconds
+            with self._lock:
+                if self._secrets.get(secret_name) is entry:
+                    self._secrets[secret_name] = (retry_at, value)
+        self._ensure_refresher()
+
+        return value
+
+    def refresh(self, secret_name: str) -> Dict[str, Any]:
+        """
+        Method for fetching the current value of a secret from the backend.
+        """
+        value = self.backend.fetch(secret_name)
+        with self._lock:
+            self._secrets[secret_name] = (self.clock(), value)
+
+        return value
+
+    def _ensure_refresher(self):
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(
+                target=self._refresh_loop,
+                name="secret-cache-refresher",
+                daemon=True,
+            )
+            self._refresher.start()
+
+    def _refresh_loop(self):
+        # Refreshing well before the secrets expire
+        interval = max(self.ttl_seconds * 0.8, 1.0)
+        while not self._stop_event.wait(interval):
+            with self._lock:
+                secret_names = list(self._secrets)
+            for secret_name in secret_names:
+                try:
+                    self.refresh(secret_name)
+                except Exception as e:
+                    logger.warning(
+                        f">>> Could not refresh secret `{secret_name}`, "
+                        f"serving the cached value. e: {e}"
+                    )
+
+    def stop(self):
+        self._stop_event.set()
+
+
+# -------------------------------- CACHE --------------------------------------
+
+_secret_cache: Optional[SecretCache] = None
+_secret_cache_lock = threading.Lock()
+
+
+def get_secret_cache() -> SecretCache:
+    """
+    Function for retrieving the process-wide secret cache, using the
+    backend selected through ``SECRETS_BACKEND``.
+    """
+    global _secret_cache
+
+    with _secret_cache_lock:
+        if _secret_cache is None:
+            if SECRETS_BACKEND == "aws":
+                backend = AwsSecretsBackend()
+            elif SECRETS_BACKEND == "env":
+                backend = EnvSecretsBackend()
+            elif SECRETS_BACKEND == "file":
+                backend = FileSecretsBackend()
+            else:
+                raise ValueError(
+                    f"Unknown secrets backend `{SECRETS_BACKEND}`"
+                )
+            _secret_cache = SecretCache(backend=backend)
+
+    return _secret_cache
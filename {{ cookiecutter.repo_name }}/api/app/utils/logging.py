@@ -20,12 +20,20 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import structlog
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
 import sys
-import logging
+import time
+from datetime import datetime, timezone
+from functools import partialmethod
+from typing import Any, Dict, Optional, TextIO
+
+import structlog
 
-from loguru import logger
+from app.utils.metrics import get_metrics_registry
 
 __author__ = []
 __all__ = []
@@ -33,31 +41,202 @@ __all__ = []
 
 LOG_LEVEL = logging.getLevelName(os.environ.get("LOG_LEVEL", "DEBUG"))
 JSON_LOGS = os.environ.get("JSON_LOGS", "0") == "1"
+# Maximum number of records waiting to be written. Once the queue is full,
+# new records are dropped instead of blocking the caller.
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+
+# Background thread that renders and writes the queued records
+_listener: Optional[logging.handlers.QueueListener] = None
+_configured = False
+
+
+# ------------------------------ PROCESSORS -----------------------------------
+
+
+def _capture_exc_info(
+    logger: Any,
+    method_name: str,
+    event_dict: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Processor that resolves ``exc_info=True`` on the calling thread, since
+    the record gets rendered on the thread of the listener.
+    """
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+
+    return event_dict
+
+
+def _add_timestamp(
+    logger: Any,
+    method_name: str,
+    event_dict: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Processor that adds the time at which the record was created, rather
+    than the time at which it gets rendered.
+    """
+    record = event_dict.get("_record")
+    event_dict["timestamp"] = datetime.fromtimestamp(
+        record.created,
+        tz=timezone.utc,
+    ).isoformat()
+
+    return event_dict
+
 
+# ------------------------------- HANDLERS ------------------------------------
 
-class InterceptHandler(logging.Handler):
-    def emit(self, record):
-        # get corresponding Loguru level if it exists
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Handler that hands records over to a queue without formatting them.
+
+    Rendering is left to the ``QueueListener``, so a log call only costs
+    the creation of the record. Records are dropped, and counted, when
+    the queue is full.
+    """
+
+    def __init__(self, queue_obj: queue.Queue):
+        super().__init__(queue_obj)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: Any):
         try:
-            level = logger.level(record.levelname).name
-        except ValueError:
-            level = record.levelno
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class QueueLogger(object):
+    """
+    structlog logger that puts the processed event dicts straight on the
+    log queue, skipping the creation of a ``logging.LogRecord`` on the
+    calling thread.
+    """
+
+    def __init__(self, name: str, handler: NonBlockingQueueHandler):
+        self.name = name
+        self.handler = handler
+
+    def _enqueue(
+        self,
+        method_name: str,
+        event_dict: Dict[str, Any],
+        extra: Dict[str, Any],
+    ):
+        self.handler.enqueue(
+            (self.name, method_name, time.time(), event_dict, extra)
+        )
+
+    debug = partialmethod(_enqueue, "debug")
+    info = partialmethod(_enqueue, "info")
+    warning = partialmethod(_enqueue, "warning")
+    error = partialmethod(_enqueue, "error")
+    critical = partialmethod(_enqueue, "critical")
+
+
+class QueueLoggerFactory(object):
+    """
+    Factory of the ``QueueLogger`` of every module.
+    """
 
-        # find caller from where originated the logged message
-        frame, depth = sys._getframe(6), 6
-        while frame and frame.f_code.co_filename == logging.__file__:
-            frame = frame.f_back
-            depth += 1
+    def __init__(self, handler: NonBlockingQueueHandler):
+        self.handler = handler
 
-        logger.opt(
-            depth=depth,
-            exception=record.exc_info,
-        ).log(level, record.getMessage())
+    def __call__(self, name: str = "root", *args: Any) -> QueueLogger:
+        return QueueLogger(name=name, handler=self.handler)
 
 
-def setup_logging():
+class LogQueueListener(logging.handlers.QueueListener):
+    """
+    Listener that turns the event dicts queued by ``QueueLogger`` into
+    records, so both kinds of entries share the same handlers.
+    """
+
+    def prepare(self, record: Any) -> logging.LogRecord:
+        if isinstance(record, logging.LogRecord):
+            return record
+
+        name, method_name, created, event_dict, extra = record
+        log_record = logging.LogRecord(
+            name=name,
+            level=logging.getLevelName(method_name.upper()),
+            pathname="",
+            lineno=0,
+            msg=event_dict,
+            args=None,
+            exc_info=None,
+        )
+        log_record.created = created
+        log_record.__dict__.update(extra)
+
+        return log_record
+
+    def enqueue_sentinel(self):
+        # Waiting for room in the queue, rather than failing when it is full
+        self.queue.put(self._sentinel)
+
+
+def _build_formatter() -> logging.Formatter:
+    """
+    Function for building the formatter that renders both structlog and
+    standard library records.
+    """
+    if JSON_LOGS:
+        renderers = [
+            structlog.processors.ExceptionRenderer(
+                structlog.tracebacks.ExceptionDictTransformer(
+                    show_locals=False,
+                )
+            ),
+            structlog.processors.JSONRenderer(),
+        ]
+    else:
+        renderers = [structlog.dev.ConsoleRenderer(colors=False)]
+
+    return structlog.stdlib.ProcessorFormatter(
+        processors=[
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            _add_timestamp,
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            *renderers,
+        ],
+    )
+
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def setup_logging(stream: Optional[TextIO] = None):
+    """
+    Function for routing every log entry, from both structlog and the
+    standard library, through a single pipeline.
+
+    Log calls only filter by level and enqueue the entry, while a
+    background thread renders it, as JSON when ``JSON_LOGS`` is set, and
+    writes it to ``stream``.
+    Calling it more than once has no effect.
+    """
+    global _configured, _listener
+
+    if _configured:
+        return
+    _configured = True
+
+    stream_handler = logging.StreamHandler(stream or sys.stdout)
+    stream_handler.setFormatter(_build_formatter())
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    _listener = LogQueueListener(handler.queue, stream_handler)
+
     # intercept everything at the root logger
-    logging.root.handlers = [InterceptHandler()]
+    logging.root.handlers = [handler]
     logging.root.setLevel(LOG_LEVEL)
 
     # remove every other logger's handlers
@@ -66,16 +245,50 @@ def setup_logging():
         logging.getLogger(name).handlers = []
         logging.getLogger(name).propagate = True
 
-    # configure loguru
-    logger.configure(
-        handlers=[
-            {"sink": sys.stdout, "serialize": JSON_LOGS},
-        ]
+    # configure structlog, leaving the rendering to the formatter
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            _capture_exc_info,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(LOG_LEVEL),
+        logger_factory=QueueLoggerFactory(handler),
+        cache_logger_on_first_use=True,
     )
 
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """
+    Function for writing out the queued records and stopping the
+    background thread.
+    """
+    global _configured, _listener
+
+    _configured = False
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records() -> int:
+    """
+    Function for counting the records dropped because the queue was full.
+    """
+    return sum(getattr(xx, "dropped", 0) for xx in logging.root.handlers)
+
 
 def get_logger(cls: str):
     """
     Function for defining the logger to use.
     """
-    return structlog.get_logger().bind(cls=cls)
+    return structlog.get_logger(cls)
+
+
+get_metrics_registry().counter(
+    "log_records_dropped_total",
+    "Number of log records dropped because the log queue was full",
+).set_function(dropped_records)
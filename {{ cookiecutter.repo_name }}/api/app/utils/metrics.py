@@ -0,0 +1,424 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsMiddleware",
+    "MetricsRegistry",
+    "current_model_name",
+    "get_metrics_registry",
+]
+
+# Default upper bounds (in seconds) of the latency histograms
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+# Model used by the request being handled, for labelling the metrics
+# recorded outside of the service layer.
+current_model_name: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "current_model_name",
+    default="",
+)
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    labels = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+
+    return "{" + labels + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+
+    return repr(float(value))
+
+
+# --------------------------- CLASS DEFINITION --------------------------------
+
+
+class _Metric(object):
+    """
+    Base class of the metrics, split by label values.
+    """
+
+    type_name = ""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+    ):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def _label_values(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[xx]) for xx in self.labelnames)
+
+    def set_function(self, function: Callable[[], float]):
+        """
+        Method for computing the value of an unlabelled metric when it gets
+        collected, instead of keeping it up to date.
+        """
+        self._function = function
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """
+        Method for listing the samples of the metric, as tuples of name
+        suffix, formatted labels and value.
+        """
+        if self._function is not None:
+            return [("", "", float(self._function()))]
+        with self._lock:
+            values = dict(self._values)
+
+        return [
+            ("", _format_labels(self.labelnames, key), value)
+            for key, value in values.items()
+        ]
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count, split by label values.
+    """
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down, split by label values.
+    """
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: str):
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """
+    Cumulative histogram of observed values, split by label values.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Label values -> (bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels: str):
+        """
+        Method for recording a new observation.
+        """
+        label_values = self._label_values(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[label_values] = state
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """
+        Context manager for observing the time spent in its block.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time, **labels)
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Dict]:
+        """
+        Method for retrieving the cumulative bucket counts, sum and count
+        of every set of label values.
+        """
+        with self._lock:
+            values = {
+                key: (list(counts), total, count)
+                for key, (counts, total, count) in self._values.items()
+            }
+
+        snapshot = {}
+        for key, (counts, total, count) in values.items():
+            cumulative, running = [], 0
+            for bucket_count in counts:
+                running += bucket_count
+                cumulative.append(running)
+            snapshot[key] = {
+                "buckets": dict(
+                    zip(self.buckets + (float("inf"),), cumulative)
+                ),
+                "sum": total,
+                "count": count,
+            }
+
+        return snapshot
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        samples = []
+        for key, state in self.snapshot().items():
+            for upper_bound, count in state["buckets"].items():
+                labels = _format_labels(
+                    self.labelnames + ("le",),
+                    key + (_format_value(upper_bound),),
+                )
+                samples.append(("_bucket", labels, count))
+            labels = _format_labels(self.labelnames, key)
+            samples.append(("_sum", labels, state["sum"]))
+            samples.append(("_count", labels, state["count"]))
+
+        return samples
+
+
+class MetricsRegistry(object):
+    """
+    Process-wide collection of metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, metric_cls, name: str, **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_cls(name=name, **kwargs)
+                self._metrics[name] = metric
+
+        return metric
+
+    def counter(
+        self,
+        name: str,
+        description: str = "",
+        labelnames: Sequence[str] = (),
+    ) -> Counter:
+        """
+        Method for retrieving a counter, creating it if it does not
+        exist yet.
+        """
+        return self._get_or_create(
+            Counter,
+            name,
+            description=description,
+            labelnames=labelnames,
+        )
+
+    def gauge(
+        self,
+        name: str,
+        description: str = "",
+        labelnames: Sequence[str] = (),
+    ) -> Gauge:
+        """
+        Method for retrieving a gauge, creating it if it does not
+        exist yet.
+        """
+        return self._get_or_create(
+            Gauge,
+            name,
+            description=description,
+            labelnames=labelnames,
+        )
+
+    def histogram(
+        self,
+        name: str,
+        description: str = "",
+        labelnames: Sequence[str] = (),
+        buckets: Optional[Sequence[float]] = None,
+    ) -> Histogram:
+        """
+        Method for retrieving a histogram, creating it if it does not
+        exist yet.
+        """
+        return self._get_or_create(
+            Histogram,
+            name,
+            description=description,
+            labelnames=labelnames,
+            buckets=buckets or DEFAULT_BUCKETS,
+        )
+
+    def collect(self) -> List[_Metric]:
+        """
+        Method for listing every registered metric.
+        """
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render(self) -> str:
+        """
+        Method for rendering every metric in the Prometheus text format.
+        """
+        lines = []
+        for metric in sorted(self.collect(), key=lambda xx: xx.name):
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for suffix, labels, value in metric.samples():
+                lines.append(
+                    f"{metric.name}{suffix}{labels} {_format_value(value)}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+# ------------------------------ REGISTRY -------------------------------------
+
+_metrics_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """
+    Function for retrieving the process-wide metrics registry.
+    """
+    return _metrics_registry
+
+
+# ------------------------------ MIDDLEWARE -----------------------------------
+
+HTTP_REQUEST_SECONDS = _metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests",
+    labelnames=("method", "route", "status_code"),
+)
+
+
+class MetricsMiddleware(object):
+    """
+    ASGI middleware that records the duration of every HTTP request.
+
+    Requests are labelled with the template of the route that handled
+    them, e.g. ``/api/genai/llm``, so that the number of label values
+    stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start_time,
+                method=scope["method"],
+                route=_route_template(scope),
+                status_code=status_code,
+            )
+
+
+def _route_template(scope) -> str:
+    """
+    Function for finding the path template of the route that matches
+    a request.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+
+    return "unmatched"
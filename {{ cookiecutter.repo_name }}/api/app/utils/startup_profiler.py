@@ -0,0 +1,234 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from app.utils.logging import get_logger
+from app.utils.system import process_age_seconds
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "ImportTime",
+    "StartupProfiler",
+    "get_startup_profiler",
+    "measure_import_times",
+]
+
+logger = get_logger(__name__)
+
+# ----------------------- ENVIRONMENT VARIABLES -------------------------------
+
+# Whether to log the cost of every module and initialization step once the
+# application has started. Set by the `--profile-startup` flag of
+# `start`/`dev`, so that every worker process inherits it.
+PROFILE_STARTUP = os.getenv("PROFILE_STARTUP", "0") == "1"
+# Number of most expensive modules shown in the report
+PROFILE_STARTUP_TOP_MODULES = int(
+    os.getenv("PROFILE_STARTUP_TOP_MODULES", "25")
+)
+
+# Modules that must only be imported once a model gets used
+HEAVY_MODULES = ("torch", "transformers", "huggingface_hub", "boto3")
+
+# Line of the output of `python -X importtime`, i.e.
+# `import time:  self [us] | cumulative | imported package`
+_IMPORT_TIME_PATTERN = re.compile(
+    r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$"
+)
+
+# ---------------------------- DATA STRUCTURES --------------------------------
+
+
+@dataclass
+class ImportTime:
+    """
+    Time spent importing a module, on its own and including the modules
+    it imported first.
+    """
+
+    module: str
+    self_seconds: float
+    cumulative_seconds: float
+    depth: int
+
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def measure_import_times(
+    module: str = "app.main",
+    python: str = sys.executable,
+) -> List[ImportTime]:
+    """
+    Function for measuring the import time of ``module``, and of every
+    module it imports, in a fresh interpreter.
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    import_times = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_PATTERN.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        import_times.append(
+            ImportTime(
+                module=name,
+                self_seconds=int(self_us) / 1e6,
+                cumulative_seconds=int(cumulative_us) / 1e6,
+                depth=len(indent) // 2,
+            )
+        )
+
+    return import_times
+
+
+# --------------------------- CLASS DEFINITION --------------------------------
+
+
+class StartupProfiler(object):
+    """
+    Records how long each initialization step of the application takes,
+    and when each milestone is reached, counting from the start of the
+    process.
+    """
+
+    def __init__(self, enabled: bool = PROFILE_STARTUP):
+        self.enabled = enabled
+        self.start_time = time.perf_counter() - process_age_seconds()
+        self.steps: Dict[str, float] = {}
+        self.marks: Dict[str, float] = {}
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """
+        Method for timing an initialization step.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = time.perf_counter() - start_time
+
+    def mark(self, name: str):
+        """
+        Method for recording that a milestone of the startup was reached.
+        """
+        self.marks[name] = time.perf_counter() - self.start_time
+
+    def report(
+        self,
+        import_times: Optional[List[ImportTime]] = None,
+        module: str = "app.main",
+    ) -> Dict:
+        """
+        Method for summarizing the cost of the startup of the application,
+        given the import times of ``module``.
+        """
+        import_times = [] if import_times is None else import_times
+        top_modules = sorted(
+            import_times,
+            key=lambda xx: xx.self_seconds,
+            reverse=True,
+        )[:PROFILE_STARTUP_TOP_MODULES]
+        app_modules = [
+            xx
+            for xx in import_times
+            if xx.module == "app" or xx.module.startswith("app.")
+        ]
+        imported_packages = {xx.module.split(".")[0] for xx in import_times}
+
+        return {
+            "marks": {kk: round(vv, 4) for kk, vv in self.marks.items()},
+            "steps": {kk: round(vv, 4) for kk, vv in self.steps.items()},
+            "import_seconds": round(
+                sum(
+                    xx.cumulative_seconds
+                    for xx in import_times
+                    if xx.module == module
+                ),
+                4,
+            ),
+            "top_modules": {
+                xx.module: round(xx.self_seconds, 4) for xx in top_modules
+            },
+            "app_modules": {
+                xx.module: round(xx.cumulative_seconds, 4)
+                for xx in app_modules
+            },
+            "heavy_modules": sorted(
+                imported_packages.intersection(HEAVY_MODULES)
+            ),
+        }
+
+    def log_report(self, module: str = "app.main"):
+        """
+        Method for logging the startup report, if profiling is enabled.
+        """
+        if not self.enabled:
+            return
+        report = self.report(
+            import_times=measure_import_times(module),
+            module=module,
+        )
+        logger.info(">>> Startup profile", pid=os.getpid(), **report)
+        if report["heavy_modules"]:
+            logger.warning(
+                f"!!! Importing `{module}` imports heavy modules: "
+                f"{report['heavy_modules']}"
+            )
+
+
+# ------------------------------ SINGLETON ------------------------------------
+
+_startup_profiler = StartupProfiler()
+
+
+def get_startup_profiler() -> StartupProfiler:
+    """
+    Function for retrieving the process-wide startup profiler.
+    """
+    return _startup_profiler
+
+
+if __name__ == "__main__":
+    # Import-time report of the app, e.g. to compare two commits
+    import json
+
+    print(
+        json.dumps(
+            StartupProfiler().report(import_times=measure_import_times()),
+            indent=2,
+        )
+    )
@@ -0,0 +1,239 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import contextlib
+import os
+import resource
+import sys
+from typing import Dict, List, Optional
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "available_cpus",
+    "cpu_quota",
+    "current_rss_bytes",
+    "memory_breakdown",
+    "memory_headroom",
+    "peak_rss_bytes",
+    "process_age_seconds",
+]
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def current_rss_bytes() -> int:
+    """
+    Function for measuring the resident memory of the current process.
+    """
+    try:
+        with open("/proc/self/statm", "r") as statm_file:
+            resident_pages = int(statm_file.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Not on Linux, falling back to the peak resident memory
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """
+    Function for measuring the peak resident memory of the current process.
+    """
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux, and in bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def memory_breakdown() -> Dict[str, int]:
+    """
+    Function for splitting the resident memory of the current process into
+    the pages it shares with other processes, e.g. memory-mapped weights
+    in the page cache, and its private pages.
+
+    ``pss`` divides every shared page by the number of processes using it,
+    so summing it across workers gives their actual memory usage.
+    """
+    fields = {
+        "Rss": "rss",
+        "Pss": "pss",
+        "Shared_Clean": "shared",
+        "Shared_Dirty": "shared",
+        "Private_Clean": "private",
+        "Private_Dirty": "private",
+    }
+    breakdown = {"rss": 0, "pss": 0, "shared": 0, "private": 0}
+    try:
+        with open("/proc/self/smaps_rollup", "r") as smaps_file:
+            for line in smaps_file:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    # Reported in kilobytes
+                    breakdown[fields[name]] += int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        # Not on Linux, only the resident memory is available
+        rss_bytes = current_rss_bytes()
+        breakdown.update(rss=rss_bytes, pss=rss_bytes, private=rss_bytes)
+
+    return breakdown
+
+
+def process_age_seconds() -> float:
+    """
+    Function for measuring how long ago the current process was started,
+    including the time the interpreter took to start.
+    """
+    try:
+        with open("/proc/self/stat", "r") as stat_file:
+            # The name of the process, in parentheses, may contain spaces
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", "r") as uptime_file:
+            uptime = float(uptime_file.read().split()[0])
+        # Start time of the process, in clock ticks since boot
+        start_ticks = int(fields[19])
+        return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+    except (OSError, ValueError, IndexError):
+        # Not on Linux
+        return 0.0
+
+
+def _read_int(path: str) -> Optional[int]:
+    """
+    Function for reading a file that holds a single integer, e.g. a cgroup
+    limit. Returns ``None`` if the file is missing or holds no number.
+    """
+    try:
+        with open(path, "r") as input_file:
+            return int(input_file.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _read_stat(path: str, name: str) -> int:
+    """
+    Function for reading a field of a ``<name> <value>`` statistics file,
+    e.g. ``memory.stat``.
+    """
+    try:
+        with open(path, "r") as stat_file:
+            for line in stat_file:
+                key, _, value = line.partition(" ")
+                if key == name:
+                    return int(value)
+    except (OSError, ValueError):
+        pass
+
+    return 0
+
+
+def memory_headroom() -> Dict[str, int]:
+    """
+    Function for measuring how much memory the container, or the host when
+    the container has no limit, can still use.
+
+    Usage is the working set, i.e. it leaves out the inactive page cache
+    that the kernel reclaims before running out of memory, the same way
+    the container runtimes do.
+    """
+    # cgroup v2, and then cgroup v1
+    cgroup_files = [
+        (
+            "/sys/fs/cgroup/memory.max",
+            "/sys/fs/cgroup/memory.current",
+            "/sys/fs/cgroup/memory.stat",
+            "inactive_file",
+        ),
+        (
+            "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+            "/sys/fs/cgroup/memory/memory.usage_in_bytes",
+            "/sys/fs/cgroup/memory/memory.stat",
+            "total_inactive_file",
+        ),
+    ]
+    meminfo = {}
+    with contextlib.suppress(OSError, ValueError, IndexError):
+        with open("/proc/meminfo", "r") as meminfo_file:
+            for line in meminfo_file:
+                name, _, value = line.partition(":")
+                # Reported in kilobytes
+                meminfo[name] = int(value.split()[0]) * 1024
+    host_bytes = meminfo.get("MemTotal", 0)
+
+    for limit_path, usage_path, stat_path, inactive_name in cgroup_files:
+        limit_bytes = _read_int(limit_path)
+        usage_bytes = _read_int(usage_path)
+        # Without a limit, cgroup v2 reports `max`, and cgroup v1 a huge
+        # number, so the memory of the host applies.
+        if limit_bytes is None or usage_bytes is None:
+            continue
+        if host_bytes and limit_bytes >= host_bytes:
+            break
+        usage_bytes -= min(_read_stat(stat_path, inactive_name), usage_bytes)
+        return {
+            "limit_bytes": limit_bytes,
+            "usage_bytes": usage_bytes,
+            "headroom_bytes": max(limit_bytes - usage_bytes, 0),
+        }
+
+    available_bytes = meminfo.get("MemAvailable", host_bytes)
+    return {
+        "limit_bytes": host_bytes,
+        "usage_bytes": host_bytes - available_bytes,
+        "headroom_bytes": available_bytes,
+    }
+
+
+def available_cpus() -> List[int]:
+    """
+    Function for listing the CPUs that the current process may run on.
+    """
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        # Not on Linux
+        return list(range(os.cpu_count() or 1))
+
+
+def cpu_quota() -> float:
+    """
+    Function for measuring the number of CPUs that the container may use,
+    e.g. the vCPUs of a Fargate task.
+
+    Containers see every CPU of the host, but their CPU time is capped by
+    the CFS quota of their cgroup. Without a quota, the CPUs that the
+    process may run on apply.
+    """
+    n_cpus = len(available_cpus())
+
+    # cgroup v2, e.g. `200000 100000`, or `max 100000` without a quota
+    with contextlib.suppress(OSError, ValueError, IndexError):
+        with open("/sys/fs/cgroup/cpu.max", "r") as cpu_max_file:
+            quota, period = cpu_max_file.read().split()[:2]
+        if quota != "max":
+            return min(int(quota) / int(period), n_cpus)
+        return float(n_cpus)
+
+    # cgroup v1, where `-1` means no quota
+    quota = _read_int("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+    period = _read_int("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if quota is not None and period and quota > 0:
+        return min(quota / period, n_cpus)
+
+    return float(n_cpus)
@@ -28,11 +28,18 @@ import contextlib
 import json
 import logging
 import os
+import re
+import shutil
+import subprocess
+import time
 import traceback
+import urllib.error
+import urllib.request
 from argparse import ArgumentParser, HelpFormatter
+from concurrent.futures import ThreadPoolExecutor
 from operator import attrgetter
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 import boto3
 import docker
@@ -45,6 +52,7 @@ __all__ = [
     "check_environment_variables",
     "get_repository_metadata",
     "docker_build_and_push",
+    "measure_image",
 ]
 
 logger = logging.getLogger(__name__)
@@ -54,6 +62,18 @@ logging.basicConfig(
 )
 logger.setLevel(logging.INFO)
 
+# Port the API listens on inside the container
+APP_PORT = 8000
+# Maximum time to wait for a container of the image to become ready
+READY_TIMEOUT_SECONDS = 300
+# Name of the `buildx` builder. Unlike the default one, it can build several
+# platforms and export its cache.
+BUILDER_NAME = "{{ cookiecutter.application_name }}-builder"
+# Steps of the `--progress=plain` output of BuildKit, e.g.
+# `#12 [linux/amd64 builder 4/6] RUN pip install ...` and `#12 DONE 35.2s`
+_BUILD_STEP_PATTERN = re.compile(r"^#(\d+) \[(?:\S+/\S+ )?(\S+) \d+/\d+\]")
+_BUILD_DONE_PATTERN = re.compile(r"^#(\d+) DONE (\d+(?:\.\d+)?)s")
+
 # -------------------------------- SERVICES -----------------------------------
 
 
@@ -223,6 +243,32 @@ def get_parser():
         [Default: '%(default)s']
         """,
     )
+    # Stage of the Dockerfile to build
+    parser.add_argument(
+        "--target",
+        "-t",
+        dest="target",
+        type=str,
+        default="runtime",
+        choices=["dev", "runtime"],
+        help="""
+        Stage of the Dockerfile to build.
+        [Default: '%(default)s']
+        """,
+    )
+    # Option for measuring the size, start-up time and pull time of the image
+    parser.add_argument(
+        "--measure",
+        "-m",
+        dest="measure",
+        type=_str2bool,
+        default=True,
+        help="""
+        Option for measuring the size, start-to-ready time and pull time of
+        the Docker image.
+        [Default: '%(default)s']
+        """,
+    )
     # Type of platform to use when building the Docker image
     parser.add_argument(
         "--platform",
@@ -230,7 +276,44 @@ def get_parser():
         type=str,
         default="linux/amd64",
         help="""
-        Type of platform to use when building the Docker image.
+        Platforms to build the Docker image for, separated by commas, e.g.
+        `linux/amd64,linux/arm64`. They are built concurrently.
+        [Default: '%(default)s']
+        """,
+    )
+    # Tag of the Docker image
+    parser.add_argument(
+        "--image-tag",
+        dest="image_tag",
+        type=str,
+        default=None,
+        help="""
+        Tag of the Docker image. Defaults to the SHA of the current git
+        commit. Images of the `runtime` stage are also tagged `latest`.
+        [Default: '%(default)s']
+        """,
+    )
+    # Cache of the layers of the Docker image
+    parser.add_argument(
+        "--cache",
+        dest="cache",
+        type=str,
+        default="registry",
+        choices=["registry", "local", "none"],
+        help="""
+        Where to read and write the cache of the layers of the image, i.e.
+        the ECR repository, `--cache-dir`, or nowhere.
+        [Default: '%(default)s']
+        """,
+    )
+    # Directory of the local cache of the layers of the Docker image
+    parser.add_argument(
+        "--cache-dir",
+        dest="cache_dir",
+        type=str,
+        default=str(Path.home().joinpath(".cache", BUILDER_NAME)),
+        help="""
+        Directory of the layer cache, when `--cache` is `local`.
         [Default: '%(default)s']
         """,
     )
@@ -342,6 +425,20 @@ def _docker_login(params_dict: Dict):
             password,
             registry=registry,
         )
+        # The Docker CLI, used by `buildx`, keeps its own credentials
+        subprocess.run(
+            [
+                "docker",
+                "login",
+                "--username",
+                username,
+                "--password-stdin",
+                registry,
+            ],
+            input=password.encode(),
+            capture_output=True,
+            check=True,
+        )
     except Exception:
         msg = traceback.format_exc()
         logger.error(msg)
@@ -349,15 +446,450 @@ def _docker_login(params_dict: Dict):
     logger.info(">>> Logging into Docker .... DONE")
 
 
+def _get_image_tag(params_dict: Dict) -> str:
+    """
+    Function to determine the tag of the Docker image, i.e. the SHA of the
+    current git commit, unless a tag was given.
+
+    Parameters
+    -------------
+    params_dict : dict
+        Dictionary with set of input parameters
+
+    Returns
+    -----------
+    image_tag : str
+        Tag of the Docker image.
+    """
+    if params_dict.get("image_tag"):
+        return params_dict["image_tag"]
+    # Set by GitHub Actions
+    git_sha = os.environ.get("GITHUB_SHA")
+    if not git_sha:
+        git_sha = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    image_tag = git_sha[:12]
+
+    if params_dict["target"] != "runtime":
+        image_tag = f"dev-{image_tag}"
+
+    return image_tag
+
+
+def _ensure_builder():
+    """
+    Function for creating the `buildx` builder, unless it already exists.
+    """
+    inspect_process = subprocess.run(
+        ["docker", "buildx", "inspect", BUILDER_NAME],
+        capture_output=True,
+    )
+    if inspect_process.returncode != 0:
+        logger.info(f">> Creating `buildx` builder `{BUILDER_NAME}` ...")
+        subprocess.run(
+            [
+                "docker",
+                "buildx",
+                "create",
+                "--name",
+                BUILDER_NAME,
+                "--driver",
+                "docker-container",
+                "--bootstrap",
+            ],
+            check=True,
+        )
+
+
+def _platform_slug(platform: str) -> str:
+    """
+    Function to turn a platform into a string that can be used in tags,
+    e.g. `linux/arm64/v8` into `linux-arm64-v8`.
+    """
+    return platform.replace("/", "-")
+
+
+def _cache_name(platform: str, params_dict: Dict) -> str:
+    """
+    Function to build the name of the layer cache of a stage and platform.
+    """
+    return f"buildcache-{params_dict['target']}-{_platform_slug(platform)}"
+
+
+def _cache_args(
+    ecr_metadata: Dict,
+    platform: str,
+    params_dict: Dict,
+) -> List[str]:
+    """
+    Function to build the arguments for reading and writing the layer cache
+    of a platform.
+
+    Parameters
+    --------------
+    ecr_metadata : dict
+        Dictionary containing the metadata of the ECR repository.
+
+    platform : str
+        Platform of the Docker image.
+
+    params_dict : dict
+        Dictionary with set of input parameters
+
+    Returns
+    -----------
+    cache_args : list
+        Arguments of `docker buildx build`.
+    """
+    cache_name = _cache_name(platform, params_dict)
+    if params_dict["cache"] == "registry":
+        cache_ref = (
+            f"type=registry,ref={ecr_metadata['ecr_repo']}:{cache_name}"
+        )
+        # ECR only accepts the cache as an OCI image manifest
+        return [
+            "--cache-from",
+            cache_ref,
+            "--cache-to",
+            f"{cache_ref},mode=max,image-manifest=true,oci-mediatypes=true",
+        ]
+    if params_dict["cache"] == "local":
+        cache_dir = Path(params_dict["cache_dir"]).joinpath(cache_name)
+        cache_args = []
+        if cache_dir.exists():
+            cache_args += ["--cache-from", f"type=local,src={cache_dir}"]
+        # Written next to the current cache, which it replaces once the
+        # build succeeds, so that the cache does not keep growing.
+        return cache_args + [
+            "--cache-to",
+            f"type=local,dest={cache_dir}-new,mode=max",
+        ]
+
+    return []
+
+
+def _stage_timings(build_output: List[str]) -> Dict[str, float]:
+    """
+    Function to add up the time spent on the steps of each stage of the
+    Dockerfile, from the `--progress=plain` output of BuildKit.
+
+    Parameters
+    --------------
+    build_output : list
+        Lines of the output of `docker buildx build`.
+
+    Returns
+    -----------
+    stage_timings : dict
+        Dictionary with the seconds spent on each stage. Cached steps
+        count as zero seconds.
+    """
+    step_stages = {}
+    stage_timings = {}
+    for line in build_output:
+        step_match = _BUILD_STEP_PATTERN.match(line)
+        if step_match:
+            step_id, stage = step_match.groups()
+            step_stages[step_id] = stage
+            stage_timings.setdefault(stage, 0.0)
+            continue
+        done_match = _BUILD_DONE_PATTERN.match(line)
+        if done_match and done_match.group(1) in step_stages:
+            stage = step_stages[done_match.group(1)]
+            stage_timings[stage] += float(done_match.group(2))
+
+    return {key: round(value, 2) for key, value in stage_timings.items()}
+
+
+def _docker_build(
+    docker_context: str,
+    docker_filepath: str,
+    image_uris: List[str],
+    platform: str,
+    ecr_metadata: Dict,
+    params_dict: Dict,
+    push_image: bool,
+) -> Dict:
+    """
+    Function for building a stage of the Docker image for a single platform
+    with `buildx`, and either pushing it or loading it into Docker.
+
+    Parameters
+    --------------
+    docker_context : str
+        Path to the context of the Docker build.
+
+    docker_filepath : str
+        Path to the Dockerfile.
+
+    image_uris : list
+        Names and tags of the Docker image.
+
+    platform : str
+        Platform of the Docker image.
+
+    ecr_metadata : dict
+        Dictionary containing the metadata of the ECR repository.
+
+    params_dict : dict
+        Dictionary with set of input parameters
+
+    push_image : bool
+        If ``True``, the layers of the image are pushed to the repository
+        as they get built. Otherwise, the image is loaded into Docker.
+
+    Returns
+    -----------
+    build_metrics : dict
+        Dictionary with the build time of the image and of each stage.
+    """
+    build_cmd = [
+        "docker",
+        "buildx",
+        "build",
+        "--builder",
+        BUILDER_NAME,
+        "--file",
+        docker_filepath,
+        "--target",
+        params_dict["target"],
+        "--platform",
+        platform,
+        "--build-arg",
+        f"ENV={params_dict['environment']}",
+        "--progress",
+        "plain",
+        # Keeps a single image manifest per platform, which the
+        # multi-platform manifest list can point at.
+        "--provenance",
+        "false",
+        "--push" if push_image else "--load",
+    ]
+    for image_uri in image_uris:
+        build_cmd += ["--tag", image_uri]
+    build_cmd += _cache_args(ecr_metadata, platform, params_dict)
+    build_cmd.append(docker_context)
+    #
+    logger.info(f">> [{platform}] Building docker image ...")
+    start_time = time.perf_counter()
+    build_output = []
+    with subprocess.Popen(
+        build_cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    ) as build_process:
+        for line in build_process.stdout:
+            build_output.append(line.rstrip())
+            logger.info(f"[{platform}] {line.rstrip()}")
+    if build_process.returncode != 0:
+        raise subprocess.CalledProcessError(
+            build_process.returncode,
+            build_cmd,
+        )
+    build_seconds = round(time.perf_counter() - start_time, 2)
+    logger.info(f">> [{platform}] Building docker image ... DONE")
+    # Replacing the local cache with the one of this build
+    if params_dict["cache"] == "local":
+        cache_dir = Path(params_dict["cache_dir"]).joinpath(
+            _cache_name(platform, params_dict)
+        )
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        Path(f"{cache_dir}-new").rename(cache_dir)
+
+    return {
+        "build_seconds": build_seconds,
+        "stage_seconds": _stage_timings(build_output),
+    }
+
+
+def _wait_until_ready(container, timeout: float) -> bool:
+    """
+    Function for waiting until the API of a container reports that it is
+    ready to take traffic.
+
+    Parameters
+    --------------
+    container : docker.models.containers.Container
+        Running container of the Docker image.
+
+    timeout : float
+        Maximum number of seconds to wait for.
+
+    Returns
+    -----------
+    is_ready : bool
+        Whether the container became ready before ``timeout``.
+    """
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        container.reload()
+        if container.status == "exited":
+            return False
+        host_ports = pydash.get(
+            container.attrs,
+            f"NetworkSettings.Ports.{APP_PORT}/tcp",
+        )
+        if host_ports:
+            url = f"http://127.0.0.1:{host_ports[0]['HostPort']}/health/ready"
+            with contextlib.suppress(OSError, urllib.error.URLError):
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return True
+        time.sleep(0.25)
+
+    return False
+
+
+def measure_image(
+    image_uri: str,
+    platform: str,
+    params_dict: Dict,
+) -> Dict:
+    """
+    Function to measure the size of a Docker image, and the time it takes
+    for a container of it to start and report that it is ready.
+
+    Parameters
+    --------------
+    image_uri : str
+        Name and tag of the Docker image.
+
+    platform : str
+        Platform of the Docker image.
+
+    params_dict : dict
+        Dictionary with set of input parameters
+
+    Returns
+    -----------
+    image_metrics : dict
+        Dictionary with the size and start-to-ready time of the image.
+    """
+    docker_client = params_dict["services"]["docker"]
+    image = docker_client.images.get(image_uri)
+    image_metrics = {"image_size_mb": round(image.attrs["Size"] / 1024**2, 1)}
+    #
+    logger.info(f">> Measuring start-to-ready time of `{image_uri}` ...")
+    start_time = time.perf_counter()
+    container = docker_client.containers.run(
+        image_uri,
+        detach=True,
+        ports={f"{APP_PORT}/tcp": None},
+        platform=platform,
+    )
+    try:
+        is_ready = _wait_until_ready(container, READY_TIMEOUT_SECONDS)
+        if is_ready:
+            image_metrics["start_to_ready_seconds"] = round(
+                time.perf_counter() - start_time, 2
+            )
+        else:
+            logger.warning(
+                f">> Container of `{image_uri}` did not become ready!!\n"
+                + container.logs(tail=50).decode(errors="replace")
+            )
+    finally:
+        with contextlib.suppress(Exception):
+            container.remove(force=True)
+    logger.info(f">> Measuring start-to-ready time of `{image_uri}` ... DONE")
+
+    return image_metrics
+
+
+def _measure_pull(
+    ecr_metadata: Dict,
+    image_tag: str,
+    platform: str,
+    params_dict: Dict,
+) -> Dict:
+    """
+    Function to measure the time it takes to pull the Docker image from
+    the ECR repository, and its compressed size in the repository.
+
+    Parameters
+    --------------
+    ecr_metadata : dict
+        Dictionary containing the metadata of the ECR repository.
+
+    image_tag : str
+        Tag of the Docker image.
+
+    platform : str
+        Platform of the Docker image.
+
+    params_dict : dict
+        Dictionary with set of input parameters
+
+    Returns
+    -----------
+    pull_metrics : dict
+        Dictionary with the pull time and compressed size of the image.
+    """
+    docker_client = params_dict["services"]["docker"]
+    image_name = ecr_metadata["ecr_repo"]
+    # The image has to be pulled from the repository, not from the cache
+    with contextlib.suppress(docker.errors.ImageNotFound):
+        docker_client.images.remove(f"{image_name}:{image_tag}", force=True)
+    #
+    start_time = time.perf_counter()
+    docker_client.images.pull(
+        image_name,
+        tag=image_tag,
+        platform=platform,
+    )
+    pull_metrics = {
+        "pull_seconds": round(time.perf_counter() - start_time, 2),
+    }
+    #
+    response = params_dict["services"]["ecr"].describe_images(
+        registryId=ecr_metadata["ecr_registry_id"],
+        repositoryName=ecr_metadata["ecr_repository_name"],
+        imageIds=[{"imageTag": image_tag}],
+    )
+    pull_metrics["compressed_size_mb"] = round(
+        response["imageDetails"][0]["imageSizeInBytes"] / 1024**2, 1
+    )
+
+    return pull_metrics
+
+
+def _create_manifest_list(image_uris: List[str], platform_uris: List[str]):
+    """
+    Function for tagging the images of every platform as a single,
+    multi-platform image.
+
+    Parameters
+    --------------
+    image_uris : list
+        Names and tags of the multi-platform image.
+
+    platform_uris : list
+        Names and tags of the image of each platform.
+    """
+    manifest_cmd = ["docker", "buildx", "imagetools", "create"]
+    for image_uri in image_uris:
+        manifest_cmd += ["--tag", image_uri]
+    subprocess.run(manifest_cmd + platform_uris, check=True)
+
+
 def docker_build_and_push(
     ecr_metadata: Dict,
     params_dict: Dict,
     push_image: Optional[bool] = True,
     remove_local_image: Optional[bool] = True,
-):  # sourcery skip: use-fstring-for-formatting
+) -> Dict:  # sourcery skip: use-fstring-for-formatting
     """
     Function to build the Docker image and deploy it to the Docker repository.
 
+    The image of each platform is built concurrently, and its layers get
+    pushed as soon as they are built.
+
     Parameters
     --------------
     ecr_metadata : dict
@@ -374,8 +906,15 @@ def docker_build_and_push(
     remove_local_image : bool, optional
         If ``True``, the function will remove the local image that was just
         built. This variable is set to ``True`` by default.
+
+    Returns
+    -----------
+    image_metrics : dict
+        Dictionary with the timings and sizes of the Docker image.
     """
     logger.info(">>> Building and pushing Docker image ....")
+    image_metrics = {}
+    start_time = time.perf_counter()
     # --- Building Docker image
     # Docker context
     docker_context = str(
@@ -395,59 +934,117 @@ def docker_build_and_push(
         )
         .resolve()
     )
-    # Build arguments
-    docker_build_args = {
-        "PLATFORM": params_dict["platform"],
-        "ENVIRONMENT": params_dict["environment"],
-    }
-    # Docker image name and tag
+    # Docker image name and tags
+    platforms = [xx.strip() for xx in params_dict["platform"].split(",")]
     image_name = ecr_metadata["ecr_repo"]
-    image_tag = "latest"
+    image_tag = _get_image_tag(params_dict=params_dict)
+    image_tags = [
+        image_tag,
+        "latest" if params_dict["target"] == "runtime" else "dev",
+    ]
+    image_uris = [f"{image_name}:{xx}" for xx in image_tags]
+    # Every platform gets its own tag, which the multi-platform image points at
+    platform_uris = {
+        xx: f"{image_name}:{image_tag}-{_platform_slug(xx)}"
+        for xx in platforms
+    }
     #
     logger.info(f">> docker_context:    `{docker_context}")
     logger.info(f">> docker_filepath:   `{docker_filepath}")
+    logger.info(f">> docker_target:     `{params_dict['target']}")
+    logger.info(f">> platforms:         `{platforms}")
     logger.info(f">> image_name:        `{image_name}")
-    logger.info(f">> image_tag:         `{image_tag}")
+    logger.info(f">> image_tags:        `{image_tags}")
     # Check that Dockerfile exists
     if not Path(docker_filepath).exists():
         msg = f">> Dockerfile `{docker_filepath}` does not exist!"
         logger.error(msg)
         raise FileNotFoundError(msg)
-    # -- Building image
-    logger.info(f">> Building docker image: `{image_name}` ...")
-    #
-    params_dict["services"]["docker"].images.build(
-        path=docker_context,
-        tag=f"{image_name}:{image_tag}",
-        nocache=True,
-        rm=False,
-        dockerfile=str(Path(docker_filepath).relative_to(docker_context)),
-        platform=params_dict["platform"],
-        buildargs=docker_build_args,
-    )
-    logger.info(f">> Building docker image: `{image_name}` ... DONE")
-    # ---  Validate login
+    # ---  Validate login, needed to push, and for the registry cache
     _docker_login(params_dict=params_dict)
-    # --- Pushing to ECR container
-    if push_image:
-        logger.info(f">> Pushing image to repository`{image_name}` ...")
-        #
-        params_dict["services"]["docker"].images.push(
-            repository=image_name,
-            tag=image_tag,
+    _ensure_builder()
+    # -- Building image for every platform concurrently
+    with ThreadPoolExecutor(max_workers=len(platforms)) as executor:
+        build_futures = {
+            platform: executor.submit(
+                _docker_build,
+                docker_context=docker_context,
+                docker_filepath=docker_filepath,
+                # A single-platform image can get its final tags directly
+                image_uris=[platform_uris[platform]]
+                + (image_uris if len(platforms) == 1 else []),
+                platform=platform,
+                ecr_metadata=ecr_metadata,
+                params_dict=params_dict,
+                push_image=push_image,
+            )
+            for platform in platforms
+        }
+        for platform, build_future in build_futures.items():
+            build_metrics = build_future.result()
+            image_metrics[f"{platform}.build_seconds"] = build_metrics[
+                "build_seconds"
+            ]
+            for stage, seconds in build_metrics["stage_seconds"].items():
+                image_metrics[f"{platform}.stage.{stage}_seconds"] = seconds
+    image_metrics["build_seconds"] = round(time.perf_counter() - start_time, 2)
+    # --- Tagging the multi-platform image
+    if push_image and len(platforms) > 1:
+        logger.info(f">> Creating multi-platform image `{image_uris}` ...")
+        manifest_start_time = time.perf_counter()
+        _create_manifest_list(image_uris, list(platform_uris.values()))
+        image_metrics["manifest_seconds"] = round(
+            time.perf_counter() - manifest_start_time, 2
+        )
+        logger.info(
+            f">> Creating multi-platform image `{image_uris}` ... DONE"
+        )
+    # -- Measuring image of the first platform
+    if params_dict["measure"]:
+        if push_image:
+            image_metrics.update(
+                _measure_pull(
+                    ecr_metadata=ecr_metadata,
+                    image_tag=f"{image_tag}-{_platform_slug(platforms[0])}",
+                    platform=platforms[0],
+                    params_dict=params_dict,
+                )
+            )
+        image_metrics.update(
+            measure_image(
+                image_uri=platform_uris[platforms[0]],
+                platform=platforms[0],
+                params_dict=params_dict,
+            )
         )
-        #
-        logger.info(f">> Pushing image to repository`{image_name}` ... DONE")
     # Removing local image
     if remove_local_image:
-        with contextlib.suppress(Exception):
-            params_dict["services"]["docker"].images.remove(
-                image_name,
-                force=True,
-            )
+        for image_uri in image_uris + list(platform_uris.values()):
+            with contextlib.suppress(Exception):
+                params_dict["services"]["docker"].images.remove(
+                    image_uri,
+                    force=True,
+                )
     #
+    image_metrics["total_seconds"] = round(time.perf_counter() - start_time, 2)
     logger.info(">>> Building and pushing Docker image .... DONE")
 
+    return image_metrics
+
+
+def _show_image_metrics(image_metrics: Dict):
+    """
+    Function to show the timings and sizes of the Docker image.
+    """
+    msg = "-" * 50 + "\n"
+    msg += "\t---- DOCKER IMAGE METRICS ----" + "\n"
+    msg += "" + "\n"
+    for key_ii, value_ii in image_metrics.items():
+        msg += f"\t>>> {key_ii} : {value_ii}\n"
+    #
+    msg += "\n" + "-" * 50 + "\n"
+    logger.info(msg)
+
 
 def main(params_dict: Dict):
     # Extracting default parameters
@@ -467,12 +1064,14 @@ def main(params_dict: Dict):
     # Extracting ECR repository's metadata
     ecr_metadata = get_repository_metadata(params_dict=params_dict)
     # Build and push docker image
-    docker_build_and_push(
+    image_metrics = docker_build_and_push(
         ecr_metadata=ecr_metadata,
         params_dict=params_dict,
         push_image=params_dict["push_to_repo"],
         remove_local_image=params_dict["remove_image"],
     )
+    # Showing the timings and sizes of the image
+    _show_image_metrics(image_metrics=image_metrics)
 
     return
 
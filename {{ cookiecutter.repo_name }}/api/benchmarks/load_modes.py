@@ -0,0 +1,221 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import argparse
+import json
+import logging
+import multiprocessing
+import tempfile
+import time
+from typing import Dict, List
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "benchmark_load_mode",
+    "main",
+]
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s]: %(message)s",
+)
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def benchmark_load_mode(
+    model_dir: str,
+    load_mode: str,
+    prompt: str,
+    max_new_tokens: int,
+    n_runs: int,
+) -> Dict:
+    """
+    Function for measuring the load time, resident memory and generation
+    throughput of a model with a given load mode.
+    """
+    import torch
+
+    from app.service.model_registry import ModelKey, ModelRegistry
+    from app.utils.system import current_rss_bytes
+
+    rss_before = current_rss_bytes()
+    registry = ModelRegistry(max_bytes=0)
+    start_time = time.perf_counter()
+    loaded_model = registry.get(ModelKey(model_dir, load_mode, None))
+    load_seconds = time.perf_counter() - start_time
+    rss_after_load = current_rss_bytes()
+
+    input_msgs = loaded_model.tokenizer(prompt, return_tensors="pt")
+    generate_kwargs = dict(
+        max_new_tokens=max_new_tokens,
+        min_new_tokens=max_new_tokens,
+        do_sample=False,
+    )
+    with torch.no_grad():
+        # Warm-up
+        loaded_model.model.generate(**input_msgs, **generate_kwargs)
+        start_time = time.perf_counter()
+        for _ in range(n_runs):
+            loaded_model.model.generate(**input_msgs, **generate_kwargs)
+        generate_seconds = time.perf_counter() - start_time
+
+    return {
+        "load_mode": load_mode,
+        "load_seconds": load_seconds,
+        "model_bytes": loaded_model.size_bytes,
+        "rss_model_bytes": rss_after_load - rss_before,
+        "rss_bytes": current_rss_bytes(),
+        "tokens_per_second": n_runs * max_new_tokens / generate_seconds,
+    }
+
+
+def _run_in_subprocess(queue: multiprocessing.Queue, kwargs: Dict):
+    queue.put(benchmark_load_mode(**kwargs))
+
+
+def run_benchmark(
+    model_dir: str,
+    load_modes: List[str],
+    prompt: str,
+    max_new_tokens: int,
+    n_runs: int,
+) -> List[Dict]:
+    """
+    Function for benchmarking every load mode. Each mode runs in its own
+    process, so that the memory measurements do not affect each other.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for load_mode in load_modes:
+        logger.info(f">>> Benchmarking load mode `{load_mode}` ...")
+        queue = context.Queue()
+        process = context.Process(
+            target=_run_in_subprocess,
+            args=(
+                queue,
+                dict(
+                    model_dir=model_dir,
+                    load_mode=load_mode,
+                    prompt=prompt,
+                    max_new_tokens=max_new_tokens,
+                    n_runs=n_runs,
+                ),
+            ),
+        )
+        process.start()
+        results.append(queue.get())
+        process.join()
+
+    return results
+
+
+# ----------------------------- INPUT PARAMETERS ------------------------------
+
+
+def get_parser():
+    """
+    Function to get the input parameters to the script.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare the load modes of a model: RSS, load time "
+        "and tokens/s.",
+    )
+    parser.add_argument(
+        "--model-dir",
+        dest="model_dir",
+        type=str,
+        default=None,
+        help="""
+        Local model to benchmark. By default, a tiny model is built in a
+        temporary directory.
+        [Default: '%(default)s']
+        """,
+    )
+    parser.add_argument(
+        "--load-modes",
+        dest="load_modes",
+        nargs="+",
+        default=["fp32", "bf16", "int8"],
+        help="Load modes to compare. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--prompt",
+        dest="prompt",
+        type=str,
+        default="the model is fast and the cache is slow",
+        help="Prompt used for the generation. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--max-new-tokens",
+        dest="max_new_tokens",
+        type=int,
+        default=32,
+        help="Tokens generated per run. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--n-runs",
+        dest="n_runs",
+        type=int,
+        default=5,
+        help="Number of timed generations. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        type=str,
+        default=None,
+        help="Optional JSON file to save the results to.",
+    )
+
+    return parser.parse_args()
+
+
+def main(params_dict: Dict):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_dir = params_dict["model_dir"]
+        if model_dir is None:
+            from benchmarks.tiny_model import build_tiny_model
+
+            model_dir = build_tiny_model(tmp_dir)
+
+        results = run_benchmark(
+            model_dir=model_dir,
+            load_modes=params_dict["load_modes"],
+            prompt=params_dict["prompt"],
+            max_new_tokens=params_dict["max_new_tokens"],
+            n_runs=params_dict["n_runs"],
+        )
+
+    report = json.dumps(results, indent=2)
+    logger.info(f">>> Results:\n{report}")
+    if params_dict["output"]:
+        with open(params_dict["output"], "w") as output_file:
+            output_file.write(report)
+
+
+if __name__ == "__main__":
+    # Input parameters
+    params_dict = vars(get_parser())
+    #
+    main(params_dict=params_dict)
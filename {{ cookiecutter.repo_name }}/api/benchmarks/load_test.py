@@ -0,0 +1,534 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "AsgiDriver",
+    "HttpDriver",
+    "compare_reports",
+    "run_load_test",
+]
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s]: %(message)s",
+)
+
+# Metrics of a report where lower values are better. Every other metric is
+# considered better when higher.
+LOWER_IS_BETTER = (
+    "elapsed_seconds",
+    "n_errors",
+    "latency_p50",
+    "latency_p95",
+    "latency_p99",
+    "ttft_p50",
+    "ttft_p95",
+    "ttft_p99",
+    "rss_bytes",
+    "error_rate",
+)
+
+# ---------------------------- DATA STRUCTURES --------------------------------
+
+
+@dataclass
+class RequestResult:
+    """
+    Outcome of a single request sent by the load test.
+    """
+
+    status_code: int
+    latency: float
+    ttft: Optional[float]
+
+
+# -------------------------------- DRIVERS ------------------------------------
+
+
+def _request_result(
+    status_code: int,
+    start_time: float,
+    first_byte_time: Optional[float],
+) -> RequestResult:
+    end_time = time.perf_counter()
+    ttft = None if first_byte_time is None else first_byte_time - start_time
+
+    return RequestResult(
+        status_code=status_code,
+        latency=end_time - start_time,
+        ttft=ttft,
+    )
+
+
+class AsgiDriver(object):
+    """
+    Driver that calls the ASGI application in-process, without going
+    through the network.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def post(self, path: str, payload: Dict) -> RequestResult:
+        body = json.dumps(payload).encode("utf-8")
+        url = urlsplit(path)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": url.path,
+            "raw_path": url.path.encode("utf-8"),
+            "query_string": url.query.encode("utf-8"),
+            "root_path": "",
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("utf-8")),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("benchmark", 80),
+        }
+        request_sent = False
+        response_done = asyncio.Event()
+        status_code, first_byte_time = 500, None
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {
+                    "type": "http.request",
+                    "body": body,
+                    "more_body": False,
+                }
+            # The client only goes away once the response is complete
+            await response_done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status_code, first_byte_time
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                if message.get("body") and first_byte_time is None:
+                    first_byte_time = time.perf_counter()
+                if not message.get("more_body", False):
+                    response_done.set()
+
+        start_time = time.perf_counter()
+        await self.app(scope, receive, send)
+
+        return _request_result(status_code, start_time, first_byte_time)
+
+
+class HttpDriver(object):
+    """
+    Driver that sends requests to a running server over HTTP.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 300):
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _post(self, path: str, payload: Dict) -> RequestResult:
+        start_time = time.perf_counter()
+        first_byte_time = None
+        with self.session.post(
+            f"{self.base_url}{path}",
+            json=payload,
+            stream=True,
+            timeout=self.timeout,
+        ) as response:
+            for chunk in response.iter_content(chunk_size=None):
+                if chunk and first_byte_time is None:
+                    first_byte_time = time.perf_counter()
+
+        return _request_result(
+            response.status_code,
+            start_time,
+            first_byte_time,
+        )
+
+    async def post(self, path: str, payload: Dict) -> RequestResult:
+        return await asyncio.to_thread(self._post, path, payload)
+
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """
+    Function for computing the ``q``-th percentile of a list of values,
+    using the nearest-rank method.
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(math.ceil(q / 100.0 * len(values)), 1)
+
+    return values[rank - 1]
+
+
+def prompt_length_sampler(spec: str, seed: int = 0) -> Callable[[], int]:
+    """
+    Function for building a sampler of prompt lengths (in words) from its
+    specification:
+
+        - ``fixed:N``: Always ``N`` words.
+        - ``uniform:LOW:HIGH``: Uniformly distributed between both values.
+        - ``normal:MEAN:STD``: Normally distributed, and at least 1 word.
+    """
+    rng = random.Random(seed)
+    kind, *args = spec.split(":")
+    args = [float(xx) for xx in args]
+
+    if kind == "fixed":
+        return lambda: int(args[0])
+    if kind == "uniform":
+        return lambda: rng.randint(int(args[0]), int(args[1]))
+    if kind == "normal":
+        return lambda: max(int(round(rng.gauss(args[0], args[1]))), 1)
+
+    raise ValueError(f"Unknown prompt length distribution `{spec}`")
+
+
+def build_prompts(n_prompts: int, lengths_spec: str, seed: int = 0):
+    """
+    Function for building random prompts, using the vocabulary of the
+    tiny benchmark model.
+    """
+    from benchmarks.tiny_model import TINY_MODEL_WORDS
+
+    rng = random.Random(seed)
+    sample_length = prompt_length_sampler(lengths_spec, seed=seed)
+
+    return [
+        " ".join(rng.choices(TINY_MODEL_WORDS, k=sample_length()))
+        for _ in range(n_prompts)
+    ]
+
+
+async def run_load_test(
+    driver,
+    path: str,
+    payloads: List[Dict],
+    concurrency: int,
+) -> Tuple[List[RequestResult], float]:
+    """
+    Function for sending every payload, with at most ``concurrency``
+    requests in flight at any time.
+
+    Returns
+    -----------
+    results, elapsed : list, float
+        Outcome of each request, and the total duration of the test.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(payload: Dict) -> RequestResult:
+        async with semaphore:
+            try:
+                return await driver.post(path, payload)
+            except Exception as e:
+                logger.error(f">>> Request failed. e: {e}")
+                return RequestResult(status_code=0, latency=0.0, ttft=None)
+
+    start_time = time.perf_counter()
+    results = await asyncio.gather(*(send(xx) for xx in payloads))
+
+    return list(results), time.perf_counter() - start_time
+
+
+def summarize(
+    results: List[RequestResult],
+    elapsed: float,
+    rss_bytes: Optional[int],
+) -> Dict:
+    """
+    Function for summarizing the outcome of a load test.
+    """
+    succeeded = [xx for xx in results if 200 <= xx.status_code < 300]
+    latencies = [xx.latency for xx in succeeded]
+    ttfts = [xx.ttft for xx in succeeded if xx.ttft is not None]
+
+    return {
+        "n_requests": len(results),
+        "n_errors": len(results) - len(succeeded),
+        "error_rate": 1 - len(succeeded) / max(len(results), 1),
+        "elapsed_seconds": elapsed,
+        "throughput_rps": len(succeeded) / elapsed if elapsed else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "ttft_p50": percentile(ttfts, 50),
+        "ttft_p95": percentile(ttfts, 95),
+        "ttft_p99": percentile(ttfts, 99),
+        "rss_bytes": rss_bytes,
+    }
+
+
+def compare_reports(
+    report: Dict,
+    baseline: Dict,
+    tolerance: float,
+) -> Dict[str, Dict]:
+    """
+    Function for comparing a report against a saved baseline. A metric
+    regresses when it is worse than the baseline by more than
+    ``tolerance``, e.g. ``0.1`` for 10%.
+    """
+    comparison = {}
+    for key, value in report["summary"].items():
+        baseline_value = baseline.get("summary", {}).get(key)
+        if value is None or not baseline_value or key == "n_requests":
+            continue
+        change = (value - baseline_value) / baseline_value
+        worse = change if key in LOWER_IS_BETTER else -change
+        comparison[key] = {
+            "value": value,
+            "baseline": baseline_value,
+            "change": change,
+            "regression": worse > tolerance,
+        }
+
+    return comparison
+
+
+# ----------------------------- INPUT PARAMETERS ------------------------------
+
+
+def get_parser():
+    """
+    Function to get the input parameters to the script.
+    """
+    parser = argparse.ArgumentParser(
+        description="Load test and latency benchmark of the genai API.",
+    )
+    parser.add_argument(
+        "--url",
+        dest="url",
+        type=str,
+        default=None,
+        help="""
+        Base URL of a running server, e.g. 'http://localhost:8000'. By
+        default, the application is called in-process.
+        [Default: '%(default)s']
+        """,
+    )
+    parser.add_argument(
+        "--model-name",
+        dest="model_name",
+        type=str,
+        default=None,
+        help="""
+        Model to use. By default, a tiny local model is built, so that the
+        benchmark runs without network access or a GPU. When using '--url',
+        the server must be able to load this model as well.
+        [Default: '%(default)s']
+        """,
+    )
+    parser.add_argument(
+        "--stream",
+        dest="stream",
+        action="store_true",
+        help="Use the streaming endpoint, to measure time-to-first-token.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        dest="concurrency",
+        type=int,
+        default=4,
+        help="Maximum requests in flight. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--n-requests",
+        dest="n_requests",
+        type=int,
+        default=50,
+        help="Total number of requests. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--prompt-lengths",
+        dest="prompt_lengths",
+        type=str,
+        default="uniform:8:64",
+        help="""
+        Distribution of the prompt lengths, in words: 'fixed:N',
+        'uniform:LOW:HIGH' or 'normal:MEAN:STD'.
+        [Default: '%(default)s']
+        """,
+    )
+    parser.add_argument(
+        "--max-length",
+        dest="max_length",
+        type=int,
+        default=128,
+        help="`max_length` of each request. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--seed",
+        dest="seed",
+        type=int,
+        default=0,
+        help="Seed used for building the prompts. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        type=str,
+        default="benchmark_report.json",
+        help="JSON file to save the report to. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--baseline",
+        dest="baseline",
+        type=str,
+        default=None,
+        help="Saved report to compare against.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        dest="tolerance",
+        type=float,
+        default=0.1,
+        help="""
+        Relative change allowed before a metric counts as a regression.
+        [Default: '%(default)s']
+        """,
+    )
+
+    return parser.parse_args()
+
+
+def main(params_dict: Dict) -> int:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_name = params_dict["model_name"]
+        if model_name is None:
+            from benchmarks.tiny_model import build_tiny_model
+
+            model_name = build_tiny_model(tmp_dir)
+
+        if params_dict["url"]:
+            driver = HttpDriver(params_dict["url"])
+        else:
+            from app.main import app
+
+            driver = AsgiDriver(app)
+
+        path = "/api/genai/llm"
+        if params_dict["stream"]:
+            path += "/stream?format=jsonl"
+        payloads = [
+            {
+                "prompt": prompt,
+                "model_name": model_name,
+                "max_length": params_dict["max_length"],
+                "cache_bypass": True,
+            }
+            for prompt in build_prompts(
+                n_prompts=params_dict["n_requests"],
+                lengths_spec=params_dict["prompt_lengths"],
+                seed=params_dict["seed"],
+            )
+        ]
+
+        # Warm-up request, so that the model load is not measured
+        asyncio.run(run_load_test(driver, path, payloads[:1], 1))
+        results, elapsed = asyncio.run(
+            run_load_test(
+                driver=driver,
+                path=path,
+                payloads=payloads,
+                concurrency=params_dict["concurrency"],
+            )
+        )
+
+    rss_bytes = None
+    if not params_dict["url"]:
+        from app.utils.system import current_rss_bytes
+
+        rss_bytes = current_rss_bytes()
+
+    report = {
+        "params": {
+            key: params_dict[key]
+            for key in (
+                "url",
+                "model_name",
+                "stream",
+                "concurrency",
+                "n_requests",
+                "prompt_lengths",
+                "max_length",
+                "seed",
+            )
+        },
+        "summary": summarize(results, elapsed, rss_bytes),
+    }
+    logger.info(f">>> Report:\n{json.dumps(report['summary'], indent=2)}")
+    with open(params_dict["output"], "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    logger.info(f">>> Report saved to `{params_dict['output']}`")
+
+    if not params_dict["baseline"]:
+        return 0
+
+    with open(params_dict["baseline"], "r") as baseline_file:
+        baseline = json.load(baseline_file)
+    comparison = compare_reports(report, baseline, params_dict["tolerance"])
+    regressions = []
+    for key, values in comparison.items():
+        flag = "REGRESSION" if values["regression"] else "ok"
+        logger.info(
+            f">> {key:<18} {values['baseline']:>12.4g} -> "
+            f"{values['value']:>12.4g} ({values['change']:+.1%}) {flag}"
+        )
+        if values["regression"]:
+            regressions.append(key)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    # Input parameters
+    params_dict = vars(get_parser())
+    #
+    sys.exit(main(params_dict=params_dict))
@@ -0,0 +1,272 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "benchmark_logging",
+    "main",
+]
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s]: %(message)s",
+)
+
+# Logging setups that can be compared:
+#   - `legacy`: Unconfigured structlog loggers printing straight to stdout,
+#               and standard library records forwarded to loguru by an
+#               `InterceptHandler` that walks the stack of every record.
+#   - `pipeline`: The queue-backed pipeline of `app.utils.logging`.
+SETUPS = ("legacy", "pipeline")
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def _setup_legacy(stream) -> Optional[Callable[[], None]]:
+    """
+    Function for reproducing the logging setup that `app.utils.logging`
+    used before the queue-backed pipeline. The standard library part is
+    only available when `loguru` is installed.
+    """
+    import structlog
+
+    structlog.reset_defaults()
+    structlog.configure(logger_factory=structlog.PrintLoggerFactory(stream))
+
+    try:
+        from loguru import logger as loguru_logger
+    except ImportError:
+        return None
+
+    class InterceptHandler(logging.Handler):
+        def emit(self, record):
+            try:
+                level = loguru_logger.level(record.levelname).name
+            except ValueError:
+                level = record.levelno
+
+            frame, depth = sys._getframe(6), 6
+            while frame and frame.f_code.co_filename == logging.__file__:
+                frame = frame.f_back
+                depth += 1
+
+            loguru_logger.opt(
+                depth=depth,
+                exception=record.exc_info,
+            ).log(level, record.getMessage())
+
+    logging.root.handlers = [InterceptHandler()]
+    logging.root.setLevel(logging.DEBUG)
+    loguru_logger.configure(handlers=[{"sink": stream, "serialize": False}])
+
+    return lambda: None
+
+
+def _setup_pipeline(stream) -> Optional[Callable[[], None]]:
+    """
+    Function for setting up the queue-backed pipeline. The returned
+    function waits until every queued entry has been written.
+    """
+    from app.utils import logging as app_logging
+
+    app_logging.setup_logging(stream=stream)
+
+    def drain():
+        while not app_logging._listener.queue.empty():
+            time.sleep(0.001)
+
+    return drain
+
+
+def _time_calls(
+    log_fn: Callable[[int], None],
+    drain: Callable[[], None],
+    n_calls: int,
+    n_bursts: int,
+) -> Dict:
+    """
+    Function for timing bursts of log calls. The queue is drained between
+    bursts, so every burst fits in the queue and no entry is dropped.
+    """
+    per_call_ns = []
+    for _ in range(n_bursts):
+        drain()
+        start_time = time.perf_counter()
+        for idx in range(n_calls):
+            log_fn(idx)
+        per_call_ns.append((time.perf_counter() - start_time) / n_calls * 1e9)
+    drain()
+
+    return {
+        "median_ns_per_call": statistics.median(per_call_ns),
+        "min_ns_per_call": min(per_call_ns),
+        "max_ns_per_call": max(per_call_ns),
+    }
+
+
+def benchmark_logging(setup: str, n_calls: int, n_bursts: int) -> Dict:
+    """
+    Function for measuring the cost of a structlog call and of a standard
+    library call for a given logging setup.
+    """
+    os.environ["LOG_LEVEL"] = "INFO"
+    stream = open(os.devnull, "w")
+    if setup == "legacy":
+        stdlib_drain = _setup_legacy(stream)
+        drain = lambda: None  # noqa: E731
+    else:
+        drain = stdlib_drain = _setup_pipeline(stream)
+
+    from app.utils.logging import get_logger
+
+    structlog_logger = get_logger("benchmark")
+    stdlib_logger = logging.getLogger("benchmark")
+
+    results = {
+        "setup": setup,
+        "structlog": _time_calls(
+            lambda idx: structlog_logger.info("request done", idx=idx),
+            drain=drain,
+            n_calls=n_calls,
+            n_bursts=n_bursts,
+        ),
+        # Calls below the log level
+        "structlog_filtered": _time_calls(
+            lambda idx: structlog_logger.debug("request done", idx=idx),
+            drain=drain,
+            n_calls=n_calls,
+            n_bursts=n_bursts,
+        ),
+        "stdlib": None,
+    }
+    if stdlib_drain is not None:
+        results["stdlib"] = _time_calls(
+            lambda idx: stdlib_logger.info("request %s done", idx),
+            drain=stdlib_drain,
+            n_calls=n_calls,
+            n_bursts=n_bursts,
+        )
+
+    return results
+
+
+def _run_in_subprocess(queue: multiprocessing.Queue, kwargs: Dict):
+    queue.put(benchmark_logging(**kwargs))
+
+
+def run_benchmark(setups: List[str], n_calls: int, n_bursts: int) -> List:
+    """
+    Function for benchmarking every logging setup. Each setup runs in its
+    own process, since logging is configured globally.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for setup in setups:
+        logger.info(f">>> Benchmarking logging setup `{setup}` ...")
+        queue = context.Queue()
+        process = context.Process(
+            target=_run_in_subprocess,
+            args=(
+                queue,
+                dict(setup=setup, n_calls=n_calls, n_bursts=n_bursts),
+            ),
+        )
+        process.start()
+        results.append(queue.get())
+        process.join()
+
+    return results
+
+
+# ----------------------------- INPUT PARAMETERS ------------------------------
+
+
+def get_parser():
+    """
+    Function to get the input parameters to the script.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare the per-call cost of the logging setups.",
+    )
+    parser.add_argument(
+        "--setups",
+        dest="setups",
+        nargs="+",
+        choices=SETUPS,
+        default=list(SETUPS),
+        help="Logging setups to compare. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--n-calls",
+        dest="n_calls",
+        type=int,
+        default=1000,
+        help="Log calls per timed burst. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--n-bursts",
+        dest="n_bursts",
+        type=int,
+        default=20,
+        help="Number of timed bursts. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        type=str,
+        default=None,
+        help="Optional JSON file to save the results to.",
+    )
+
+    return parser.parse_args()
+
+
+def main(params_dict: Dict):
+    results = run_benchmark(
+        setups=params_dict["setups"],
+        n_calls=params_dict["n_calls"],
+        n_bursts=params_dict["n_bursts"],
+    )
+
+    report = json.dumps(results, indent=2)
+    logger.info(f">>> Results:\n{report}")
+    if params_dict["output"]:
+        with open(params_dict["output"], "w") as output_file:
+            output_file.write(report)
+
+
+if __name__ == "__main__":
+    # Input parameters
+    params_dict = vars(get_parser())
+    #
+    main(params_dict=params_dict)
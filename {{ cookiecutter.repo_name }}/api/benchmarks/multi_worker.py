@@ -0,0 +1,211 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "main",
+    "run_workers",
+]
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s]: %(message)s",
+)
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def _worker(
+    queue: multiprocessing.Queue,
+    loaded: multiprocessing.Barrier,
+    measured: multiprocessing.Barrier,
+    model_dir: str,
+    load_mode: str,
+    mmap_weights: bool,
+):
+    """
+    Function run by every worker process. The memory of a worker is only
+    measured once every worker has loaded the model, so that the pages
+    shared between them are split across all of them.
+    """
+    # Read when the model registry gets imported
+    os.environ["MODEL_MMAP_WEIGHTS"] = "1" if mmap_weights else "0"
+
+    from app.service.model_preloader import warm_up_model
+    from app.service.model_registry import ModelKey, ModelRegistry
+    from app.utils.system import memory_breakdown
+
+    registry = ModelRegistry(max_bytes=0)
+    start_time = time.perf_counter()
+    loaded_model = registry.get(ModelKey(model_dir, load_mode, None))
+    load_seconds = time.perf_counter() - start_time
+    # Touching every weight, as serving requests would
+    warm_up_model(loaded_model=loaded_model)
+
+    loaded.wait()
+    queue.put(
+        {
+            "pid": os.getpid(),
+            "load_seconds": load_seconds,
+            **{f"{k}_bytes": v for k, v in memory_breakdown().items()},
+        }
+    )
+    measured.wait()
+
+
+def run_workers(
+    model_dir: str,
+    n_workers: int,
+    load_mode: str,
+    mmap_weights: bool,
+) -> Dict:
+    """
+    Function for loading a model in ``n_workers`` processes at the same
+    time, and measuring the load time and memory of each of them.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    loaded = context.Barrier(n_workers)
+    measured = context.Barrier(n_workers + 1)
+    processes = [
+        context.Process(
+            target=_worker,
+            args=(queue, loaded, measured, model_dir, load_mode, mmap_weights),
+        )
+        for _ in range(n_workers)
+    ]
+    for process in processes:
+        process.start()
+    workers = [queue.get() for _ in range(n_workers)]
+    measured.wait()
+    for process in processes:
+        process.join()
+
+    return {
+        "mmap_weights": mmap_weights,
+        "n_workers": n_workers,
+        "total_rss_bytes": sum(xx["rss_bytes"] for xx in workers),
+        # Shared pages are only counted once across the workers
+        "total_pss_bytes": sum(xx["pss_bytes"] for xx in workers),
+        "workers": workers,
+    }
+
+
+# ----------------------------- INPUT PARAMETERS ------------------------------
+
+
+def get_parser():
+    """
+    Function to get the input parameters to the script.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare the memory used by several workers serving "
+        "the same model, with and without memory-mapped weights.",
+    )
+    parser.add_argument(
+        "--model-dir",
+        dest="model_dir",
+        type=str,
+        default=None,
+        help="""
+        Local model to load. By default, a small model is built in a
+        temporary directory.
+        [Default: '%(default)s']
+        """,
+    )
+    parser.add_argument(
+        "--n-workers",
+        dest="n_workers",
+        type=int,
+        default=4,
+        help="Number of worker processes. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--load-mode",
+        dest="load_mode",
+        type=str,
+        default="fp32",
+        help="Load mode of the model. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        type=str,
+        default=None,
+        help="Optional JSON file to save the results to.",
+    )
+
+    return parser.parse_args()
+
+
+def main(params_dict: Dict):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_dir = params_dict["model_dir"]
+        if model_dir is None:
+            from benchmarks.tiny_model import build_tiny_model
+
+            # Large enough for the weights to dominate the memory usage
+            model_dir = build_tiny_model(
+                tmp_dir,
+                hidden_size=512,
+                num_hidden_layers=8,
+                num_attention_heads=8,
+                intermediate_size=1024,
+            )
+
+        results: List[Dict] = []
+        for mmap_weights in (False, True):
+            logger.info(
+                f">>> Running {params_dict['n_workers']} workers "
+                f"(mmap_weights={mmap_weights}) ..."
+            )
+            results.append(
+                run_workers(
+                    model_dir=model_dir,
+                    n_workers=params_dict["n_workers"],
+                    load_mode=params_dict["load_mode"],
+                    mmap_weights=mmap_weights,
+                )
+            )
+
+    report = json.dumps(results, indent=2)
+    logger.info(f">>> Results:\n{report}")
+    if params_dict["output"]:
+        with open(params_dict["output"], "w") as output_file:
+            output_file.write(report)
+
+
+if __name__ == "__main__":
+    # Input parameters
+    params_dict = vars(get_parser())
+    #
+    main(params_dict=params_dict)
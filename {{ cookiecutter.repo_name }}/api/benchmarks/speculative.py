@@ -0,0 +1,267 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import argparse
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "benchmark_assistant",
+    "build_model_pair",
+    "main",
+]
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s]: %(message)s",
+)
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def build_model_pair(
+    output_dir: str,
+    num_hidden_layers: int = 12,
+    num_draft_layers: int = 1,
+    hidden_size: int = 256,
+) -> Dict[str, str]:
+    """
+    Function for building a tiny model, along with two assistant models
+    that share its tokenizer:
+
+    - ``aligned``: The first ``num_draft_layers`` layers of the model. The
+      remaining layers of the model have their output projections zeroed,
+      so they leave the hidden states untouched, and both models predict
+      the same tokens. It stands for a well-matched draft model.
+    - ``independent``: A randomly initialized model, whose drafts the model
+      almost never accepts.
+
+    Returns the directory of each model.
+    """
+    import torch
+    from transformers import LlamaForCausalLM
+
+    from benchmarks.tiny_model import build_tiny_model
+
+    output_dir = Path(output_dir)
+    model_kwargs = dict(
+        hidden_size=hidden_size,
+        num_attention_heads=4,
+        intermediate_size=hidden_size * 2,
+    )
+    model_dir = build_tiny_model(
+        output_dir / "model",
+        num_hidden_layers=num_hidden_layers,
+        **model_kwargs,
+    )
+    model_obj = LlamaForCausalLM.from_pretrained(model_dir)
+    with torch.no_grad():
+        for layer in model_obj.model.layers[num_draft_layers:]:
+            layer.self_attn.o_proj.weight.zero_()
+            layer.mlp.down_proj.weight.zero_()
+    model_obj.save_pretrained(model_dir, safe_serialization=True)
+
+    aligned_dir = build_tiny_model(
+        output_dir / "aligned",
+        num_hidden_layers=num_draft_layers,
+        **model_kwargs,
+    )
+    aligned_obj = LlamaForCausalLM.from_pretrained(aligned_dir)
+    state_dict = {
+        name: value
+        for name, value in model_obj.state_dict().items()
+        if name in aligned_obj.state_dict()
+    }
+    aligned_obj.load_state_dict(state_dict)
+    aligned_obj.save_pretrained(aligned_dir, safe_serialization=True)
+
+    independent_dir = build_tiny_model(
+        output_dir / "independent",
+        num_hidden_layers=num_draft_layers,
+        seed=1,
+        **model_kwargs,
+    )
+
+    return {
+        "model": model_dir,
+        "aligned": aligned_dir,
+        "independent": independent_dir,
+    }
+
+
+def benchmark_assistant(
+    model_dir: str,
+    assistant_dir: Optional[str],
+    prompts: List[str],
+    max_new_tokens: int,
+) -> Dict:
+    """
+    Function for measuring the tokens/s of greedy generation with, or
+    without, an assistant model.
+    """
+    import torch
+
+    from app.service.model_registry import ModelKey, ModelRegistry
+    from app.service.speculative import generate_with_assistant
+
+    registry = ModelRegistry(max_bytes=0)
+    loaded_model = registry.get(ModelKey(model_dir, "fp32", None))
+    assistant = None
+    if assistant_dir is not None:
+        assistant = registry.get(ModelKey(assistant_dir, "fp32", None))
+    generate_kwargs = dict(
+        max_new_tokens=max_new_tokens,
+        min_new_tokens=max_new_tokens,
+        do_sample=False,
+        pad_token_id=loaded_model.tokenizer.pad_token_id,
+    )
+
+    def generate(prompt: str) -> Dict:
+        input_msgs = loaded_model.tokenizer(prompt, return_tensors="pt")
+        if assistant is None:
+            loaded_model.model.generate(**input_msgs, **generate_kwargs)
+            return {}
+        _, stats = generate_with_assistant(
+            model_obj=loaded_model.model,
+            tokenizer=loaded_model.tokenizer,
+            assistant_model=assistant.model,
+            assistant_tokenizer=assistant.tokenizer,
+            input_msgs=input_msgs,
+            **generate_kwargs,
+        )
+        return {"draft": stats.draft_tokens, "accepted": stats.accepted_tokens}
+
+    draft_tokens, accepted_tokens = 0, 0
+    with torch.no_grad():
+        # Warm-up
+        generate(prompts[0])
+        start_time = time.perf_counter()
+        for prompt in prompts:
+            stats = generate(prompt)
+            draft_tokens += stats.get("draft", 0)
+            accepted_tokens += stats.get("accepted", 0)
+        elapsed_seconds = time.perf_counter() - start_time
+
+    return {
+        "tokens_per_second": len(prompts) * max_new_tokens / elapsed_seconds,
+        "acceptance_rate": (
+            accepted_tokens / draft_tokens if draft_tokens else None
+        ),
+    }
+
+
+# ----------------------------- INPUT PARAMETERS ------------------------------
+
+
+def get_parser():
+    """
+    Function to get the input parameters to the script.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare the tokens/s of a tiny model with and without "
+        "assistant models (speculative decoding).",
+    )
+    parser.add_argument(
+        "--num-hidden-layers",
+        dest="num_hidden_layers",
+        type=int,
+        default=12,
+        help="Layers of the model. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--num-draft-layers",
+        dest="num_draft_layers",
+        type=int,
+        default=1,
+        help="Layers of the assistant models. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--n-prompts",
+        dest="n_prompts",
+        type=int,
+        default=8,
+        help="Prompts generated per setup. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--max-new-tokens",
+        dest="max_new_tokens",
+        type=int,
+        default=64,
+        help="Tokens generated per prompt. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        type=str,
+        default=None,
+        help="Optional JSON file to save the results to.",
+    )
+
+    return parser.parse_args()
+
+
+def main(params_dict: Dict):
+    from benchmarks.tiny_model import TINY_MODEL_WORDS
+
+    prompts = [
+        " ".join(TINY_MODEL_WORDS[idx : idx + 6])
+        for idx in range(params_dict["n_prompts"])
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_dirs = build_model_pair(
+            tmp_dir,
+            num_hidden_layers=params_dict["num_hidden_layers"],
+            num_draft_layers=params_dict["num_draft_layers"],
+        )
+        results = {}
+        for assistant in (None, "aligned", "independent"):
+            name = assistant or "none"
+            logger.info(f">>> Benchmarking assistant `{name}` ...")
+            results[name] = benchmark_assistant(
+                model_dir=model_dirs["model"],
+                assistant_dir=model_dirs.get(assistant),
+                prompts=prompts,
+                max_new_tokens=params_dict["max_new_tokens"],
+            )
+
+    baseline = results["none"]["tokens_per_second"]
+    for result in results.values():
+        result["speedup"] = result["tokens_per_second"] / baseline
+
+    report = json.dumps(results, indent=2)
+    logger.info(f">>> Results:\n{report}")
+    if params_dict["output"]:
+        with open(params_dict["output"], "w") as output_file:
+            output_file.write(report)
+
+
+if __name__ == "__main__":
+    # Input parameters
+    params_dict = vars(get_parser())
+    #
+    main(params_dict=params_dict)
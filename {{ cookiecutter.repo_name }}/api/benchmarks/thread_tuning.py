@@ -0,0 +1,333 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import argparse
+import json
+import logging
+import multiprocessing
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "benchmark_runtime_config",
+    "main",
+    "run_sweep",
+]
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s]: %(message)s",
+)
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    idx = int(round(percentile / 100 * (len(ordered) - 1)))
+
+    return ordered[idx]
+
+
+def benchmark_runtime_config(
+    model_dir: str,
+    load_mode: str,
+    generation_slots: int,
+    intra_op_threads: int,
+    inter_op_threads: int,
+    n_requests: int,
+    max_new_tokens: int,
+) -> Dict:
+    """
+    Function for measuring the throughput and latency of ``n_requests``
+    generations, run ``generation_slots`` at a time, the way the inference
+    executor runs them, with the given PyTorch thread pools.
+    """
+    from app.service.inference_runtime import (
+        configure_torch,
+        derive_runtime_config,
+    )
+
+    config = derive_runtime_config(
+        generation_slots=generation_slots,
+        intra_op_threads=intra_op_threads,
+        inter_op_threads=inter_op_threads,
+    )
+    configure_torch(config)
+
+    from app.service.llm_service import generate_batch
+    from app.service.model_registry import ModelKey, ModelRegistry
+    from benchmarks.tiny_model import TINY_MODEL_WORDS
+
+    registry = ModelRegistry(max_bytes=0)
+    loaded_model = registry.get(ModelKey(model_dir, load_mode, None))
+    prompts = [
+        " ".join(TINY_MODEL_WORDS[idx % 7 : idx % 7 + 8])
+        for idx in range(n_requests)
+    ]
+
+    def run(prompt: str) -> float:
+        start_time = time.perf_counter()
+        generate_batch(
+            model_obj=loaded_model.model,
+            tokenizer=loaded_model.tokenizer,
+            prompts=[prompt],
+            temperature=1.0,
+            max_lengths=[len(prompt.split()) + max_new_tokens],
+        )
+        return time.perf_counter() - start_time
+
+    # Warm-up
+    run(prompts[0])
+    with ThreadPoolExecutor(max_workers=generation_slots) as executor:
+        start_time = time.perf_counter()
+        latencies = list(executor.map(run, prompts))
+        elapsed_seconds = time.perf_counter() - start_time
+
+    return {
+        "generation_slots": generation_slots,
+        "intra_op_threads": intra_op_threads,
+        "inter_op_threads": inter_op_threads,
+        "total_threads": generation_slots * intra_op_threads,
+        "requests_per_second": n_requests / elapsed_seconds,
+        "tokens_per_second": n_requests * max_new_tokens / elapsed_seconds,
+        "latency_p50": statistics.median(latencies),
+        "latency_p95": _percentile(latencies, 95),
+    }
+
+
+def _run_in_subprocess(queue: multiprocessing.Queue, kwargs: Dict):
+    queue.put(benchmark_runtime_config(**kwargs))
+
+
+def run_sweep(
+    model_dir: str,
+    load_mode: str,
+    slots: List[int],
+    threads: List[int],
+    inter_op_threads: int,
+    n_requests: int,
+    max_new_tokens: int,
+) -> List[Dict]:
+    """
+    Function for benchmarking every combination of generation slots and
+    intra-op threads. Each combination runs in its own process, as the
+    thread pools of PyTorch cannot be resized once they are in use.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for generation_slots in slots:
+        for intra_op_threads in threads:
+            logger.info(
+                f">>> Benchmarking {generation_slots} slot(s) with "
+                f"{intra_op_threads} thread(s) each ..."
+            )
+            queue = context.Queue()
+            process = context.Process(
+                target=_run_in_subprocess,
+                args=(
+                    queue,
+                    dict(
+                        model_dir=model_dir,
+                        load_mode=load_mode,
+                        generation_slots=generation_slots,
+                        intra_op_threads=intra_op_threads,
+                        inter_op_threads=inter_op_threads,
+                        n_requests=n_requests,
+                        max_new_tokens=max_new_tokens,
+                    ),
+                ),
+            )
+            process.start()
+            results.append(queue.get())
+            process.join()
+
+    return results
+
+
+def _format_table(results: List[Dict], cpus: float) -> str:
+    """
+    Function for formatting the results of the sweep as a table, flagging
+    the combinations that use more threads than there are CPUs.
+    """
+    lines = [
+        f"{'slots':>5} {'threads':>7} {'req/s':>8} {'tok/s':>9} "
+        f"{'p50 (s)':>8} {'p95 (s)':>8}"
+    ]
+    for result in results:
+        oversubscribed = result["total_threads"] > cpus
+        lines.append(
+            f"{result['generation_slots']:>5} "
+            f"{result['intra_op_threads']:>7} "
+            f"{result['requests_per_second']:>8.2f} "
+            f"{result['tokens_per_second']:>9.1f} "
+            f"{result['latency_p50']:>8.3f} "
+            f"{result['latency_p95']:>8.3f}"
+            + ("  (oversubscribed)" if oversubscribed else "")
+        )
+
+    return "\n".join(lines)
+
+
+# ----------------------------- INPUT PARAMETERS ------------------------------
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(xx) for xx in value.split(",") if xx]
+
+
+def get_parser():
+    """
+    Function to get the input parameters to the script.
+    """
+    parser = argparse.ArgumentParser(
+        description="Sweep the generation slots and PyTorch threads, and "
+        "report the throughput and latency of each combination.",
+    )
+    parser.add_argument(
+        "--model-dir",
+        dest="model_dir",
+        type=str,
+        default=None,
+        help="""
+        Local model to load. By default, a small model is built in a
+        temporary directory.
+        [Default: '%(default)s']
+        """,
+    )
+    parser.add_argument(
+        "--load-mode",
+        dest="load_mode",
+        type=str,
+        default="fp32",
+        help="Load mode of the model. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--slots",
+        dest="slots",
+        type=_int_list,
+        default=None,
+        help="""
+        Comma-separated generation slots to try. By default, powers of two
+        up to the CPU quota.
+        """,
+    )
+    parser.add_argument(
+        "--threads",
+        dest="threads",
+        type=_int_list,
+        default=None,
+        help="""
+        Comma-separated intra-op threads to try. By default, powers of two
+        up to the CPU quota.
+        """,
+    )
+    parser.add_argument(
+        "--inter-op-threads",
+        dest="inter_op_threads",
+        type=int,
+        default=1,
+        help="Inter-op threads. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--n-requests",
+        dest="n_requests",
+        type=int,
+        default=32,
+        help="Generations per combination. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--max-new-tokens",
+        dest="max_new_tokens",
+        type=int,
+        default=32,
+        help="Tokens generated per request. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        type=str,
+        default=None,
+        help="Optional JSON file to save the results to.",
+    )
+
+    return parser.parse_args()
+
+
+def _powers_of_two(limit: float) -> List[int]:
+    values, value = [], 1
+    while value <= max(limit, 1):
+        values.append(value)
+        value *= 2
+
+    return values
+
+
+def main(params_dict: Dict):
+    from app.utils.system import cpu_quota
+
+    cpus = cpu_quota()
+    logger.info(f">>> CPU quota: {cpus:.2f} CPU(s)")
+    # Going one step past the quota, to show the cost of oversubscribing
+    slots = params_dict["slots"] or _powers_of_two(cpus * 2)
+    threads = params_dict["threads"] or _powers_of_two(cpus * 2)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_dir = params_dict["model_dir"]
+        if model_dir is None:
+            from benchmarks.tiny_model import build_tiny_model
+
+            # Large enough for the matrix multiplications to use threads
+            model_dir = build_tiny_model(
+                tmp_dir,
+                hidden_size=512,
+                num_hidden_layers=4,
+                num_attention_heads=8,
+                intermediate_size=1024,
+            )
+
+        results = run_sweep(
+            model_dir=model_dir,
+            load_mode=params_dict["load_mode"],
+            slots=slots,
+            threads=threads,
+            inter_op_threads=params_dict["inter_op_threads"],
+            n_requests=params_dict["n_requests"],
+            max_new_tokens=params_dict["max_new_tokens"],
+        )
+
+    logger.info(f">>> Results:\n{_format_table(results, cpus)}")
+    if params_dict["output"]:
+        with open(params_dict["output"], "w") as output_file:
+            output_file.write(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    # Input parameters
+    params_dict = vars(get_parser())
+    #
+    main(params_dict=params_dict)
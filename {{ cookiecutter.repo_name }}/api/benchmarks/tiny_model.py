@@ -0,0 +1,113 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import string
+from pathlib import Path
+from typing import List, Union
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "TINY_MODEL_WORDS",
+    "build_tiny_model",
+]
+
+SPECIAL_TOKENS = ["<pad>", "<unk>", "<s>", "</s>"]
+# Vocabulary of the tiny model, used as well for building the prompts
+TINY_MODEL_WORDS: List[str] = sorted(
+    set(
+        """
+        the a an and or of to in on for with from by at as is are was were
+        be been this that these those it its we you they he she model token
+        text prompt answer question data system user request response fast
+        slow cache batch stream time memory worker server query vector index
+        """.split()
+    )
+    | set(string.ascii_lowercase)
+)
+
+
+def build_tiny_model(
+    output_dir: Union[str, Path],
+    hidden_size: int = 64,
+    num_hidden_layers: int = 2,
+    num_attention_heads: int = 4,
+    intermediate_size: int = 128,
+    seed: int = 0,
+) -> str:
+    """
+    Function for saving a tiny, randomly initialized Llama-style model and
+    its fast tokenizer to ``output_dir``, so that it can be loaded with
+    ``from_pretrained`` without network access.
+
+    Returns
+    -----------
+    output_dir : str
+        Path to the directory of the model.
+    """
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import (
+        LlamaConfig,
+        LlamaForCausalLM,
+        PreTrainedTokenizerFast,
+    )
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # --- Tokenizer
+    vocab = {
+        token: idx
+        for idx, token in enumerate(SPECIAL_TOKENS + TINY_MODEL_WORDS)
+    }
+    tokenizer_obj = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer_obj.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer_obj,
+        pad_token="<pad>",
+        unk_token="<unk>",
+        bos_token="<s>",
+        eos_token="</s>",
+        model_input_names=["input_ids", "attention_mask"],
+    )
+    tokenizer.save_pretrained(output_dir)
+
+    # --- Model
+    config = LlamaConfig(
+        vocab_size=len(vocab),
+        hidden_size=hidden_size,
+        intermediate_size=intermediate_size,
+        num_hidden_layers=num_hidden_layers,
+        num_attention_heads=num_attention_heads,
+        num_key_value_heads=num_attention_heads,
+        max_position_embeddings=2048,
+        pad_token_id=vocab["<pad>"],
+        bos_token_id=vocab["<s>"],
+        eos_token_id=vocab["</s>"],
+    )
+    torch.manual_seed(seed)
+    LlamaForCausalLM(config).save_pretrained(
+        output_dir,
+        safe_serialization=True,
+    )
+
+    return str(output_dir)
@@ -0,0 +1,222 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import argparse
+import json
+import logging
+import tempfile
+import time
+from typing import Any, Dict
+
+__author__ = ["Victor Calderon"]
+__all__ = [
+    "benchmark_index",
+    "clustered_vectors",
+    "main",
+]
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s]: %(message)s",
+)
+
+# ------------------------------- FUNCTIONS -----------------------------------
+
+
+def clustered_vectors(
+    n: int,
+    dimension: int,
+    n_clusters: int = 100,
+    latent_dimension: int = 32,
+    seed: int = 0,
+) -> Any:
+    """
+    Function for building unit-length vectors grouped around random
+    centers. Like text embeddings, the vectors mostly vary along a few
+    directions, i.e. those of a ``latent_dimension`` subspace. Vectors
+    built with any ``seed`` share the same clusters.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    projection = rng.normal(size=(latent_dimension, dimension))
+    centers = rng.normal(size=(n_clusters, latent_dimension))
+
+    rng = np.random.default_rng(seed + 1)
+    latent = centers[rng.integers(n_clusters, size=n)]
+    latent += rng.normal(scale=0.5, size=(n, latent_dimension))
+    vectors = latent @ projection
+    vectors += rng.normal(scale=0.5, size=(n, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return vectors.astype(np.float32)
+
+
+def _percentile(values, fraction: float) -> float:
+    values = sorted(values)
+
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def benchmark_index(
+    index_type: str,
+    vectors: Any,
+    queries: Any,
+    k: int = 10,
+    add_batch_size: int = 5000,
+    nlist: int = 256,
+) -> Dict[str, float]:
+    """
+    Function for measuring how long an index takes to grow, to load and to
+    search, along with the recall of its results, compared with an exact
+    search of every vector.
+    """
+    import numpy as np
+
+    from app.service.vector_index import VectorIndex
+
+    # Exact results, and the latency of a brute-force search
+    brute_force_seconds = []
+    expected = []
+    for query in queries:
+        start_time = time.perf_counter()
+        scores = vectors @ query
+        top_k = np.argpartition(-scores, k)[:k]
+        brute_force_seconds.append(time.perf_counter() - start_time)
+        expected.append(set(top_k.tolist()))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vector_index = VectorIndex(
+            path=tmp_dir,
+            index_type=index_type,
+            nlist=nlist,
+        )
+        start_time = time.perf_counter()
+        for start in range(0, len(vectors), add_batch_size):
+            batch = vectors[start : start + add_batch_size]
+            vector_index.add(batch, [{"text": ""}] * len(batch))
+        add_seconds = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        vector_index = VectorIndex(path=tmp_dir, index_type=index_type)
+        load_seconds = time.perf_counter() - start_time
+
+        search_seconds = []
+        hits = 0
+        for query, expected_ids in zip(queries, expected):
+            start_time = time.perf_counter()
+            results = vector_index.search(query[None, :], k=k)[0]
+            search_seconds.append(time.perf_counter() - start_time)
+            hits += len(expected_ids & {xx[0] for xx in results})
+
+    return {
+        "index": type(vector_index._index).__name__,
+        "add_seconds": add_seconds,
+        "mmap_load_seconds": load_seconds,
+        "search_p50_ms": 1000 * _percentile(search_seconds, 0.5),
+        "search_p95_ms": 1000 * _percentile(search_seconds, 0.95),
+        "brute_force_p50_ms": 1000 * _percentile(brute_force_seconds, 0.5),
+        f"recall_at_{k}": hits / (k * len(queries)),
+    }
+
+
+def get_parser():
+    """
+    Function to get the input parameters to the script.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare the latency and recall of the vector indexes "
+        "with a brute-force search.",
+    )
+    parser.add_argument(
+        "--n-vectors",
+        dest="n_vectors",
+        type=int,
+        default=100000,
+        help="Vectors in the index. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--dimension",
+        dest="dimension",
+        type=int,
+        default=384,
+        help="Size of each vector. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--n-queries",
+        dest="n_queries",
+        type=int,
+        default=500,
+        help="Queries searched per index. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--k",
+        dest="k",
+        type=int,
+        default=10,
+        help="Results per query. [Default: '%(default)s']",
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        type=str,
+        default=None,
+        help="Optional JSON file to save the results to.",
+    )
+
+    return parser.parse_args()
+
+
+def main(params_dict: Dict):
+    vectors = clustered_vectors(
+        params_dict["n_vectors"],
+        params_dict["dimension"],
+    )
+    queries = clustered_vectors(
+        params_dict["n_queries"],
+        params_dict["dimension"],
+        seed=1,
+    )
+
+    results = {}
+    for index_type in ("flat", "ivf", "hnsw"):
+        logger.info(f">>> Benchmarking index `{index_type}` ...")
+        results[index_type] = benchmark_index(
+            index_type=index_type,
+            vectors=vectors,
+            queries=queries,
+            k=params_dict["k"],
+        )
+
+    report = json.dumps(results, indent=2)
+    logger.info(f">>> Results:\n{report}")
+    if params_dict["output"]:
+        with open(params_dict["output"], "w") as output_file:
+            output_file.write(report)
+
+
+if __name__ == "__main__":
+    # Input parameters
+    params_dict = vars(get_parser())
+    #
+    main(params_dict=params_dict)
@@ -0,0 +1,74 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import pytest
+
+
+class StandInTensor(object):
+    """
+    Minimal stand-in for a ``torch.Tensor``, exposing only what the model
+    registry needs to estimate its size.
+    """
+
+    def __init__(self, n_bytes: int):
+        self.n_bytes = n_bytes
+
+    def numel(self) -> int:
+        return self.n_bytes
+
+    def element_size(self) -> int:
+        return 1
+
+
+class StandInModel(object):
+    """
+    Tiny local stand-in for a HuggingFace causal language model.
+    """
+
+    def __init__(self, name: str, n_bytes: int):
+        self.name = name
+        self._weights = [StandInTensor(n_bytes)]
+
+    def parameters(self):
+        return iter(self._weights)
+
+    def buffers(self):
+        return iter([])
+
+
+class StandInLoader(object):
+    """
+    Loader that builds stand-in models and keeps track of every load.
+    """
+
+    def __init__(self, n_bytes: int = 100):
+        self.n_bytes = n_bytes
+        self.calls = []
+
+    def __call__(self, key):
+        self.calls.append(key)
+        return StandInModel(key.model_name, self.n_bytes), object()
+
+
+@pytest.fixture
+def stand_in_loader():
+    return StandInLoader()
@@ -0,0 +1,131 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+
+import pytest
+
+from app.utils.aws_utils import (
+    EnvSecretsBackend,
+    FileSecretsBackend,
+    SecretCache,
+)
+
+
+class CountingBackend(object):
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    def fetch(self, secret_name):
+        self.calls += 1
+        if self.fail:
+            raise TimeoutError("Secrets Manager is slow")
+        return {"HF_TOKEN": f"token-{self.calls}"}
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_secrets_are_fetched_once_within_their_ttl():
+    backend = CountingBackend()
+    clock = FakeClock()
+    cache = SecretCache(backend, ttl_seconds=60, clock=clock)
+
+    assert cache.get("hf")["HF_TOKEN"] == "token-1"
+    clock.now += 30
+    assert cache.get("hf")["HF_TOKEN"] == "token-1"
+    clock.now += 60
+    assert cache.get("hf")["HF_TOKEN"] == "token-2"
+    assert backend.calls == 2
+    cache.stop()
+
+
+def test_failed_refresh_keeps_serving_the_cached_value():
+    backend = CountingBackend()
+    cache = SecretCache(backend, ttl_seconds=60)
+
+    cache.get("hf")
+    backend.fail = True
+    with pytest.raises(TimeoutError):
+        cache.refresh("hf")
+
+    assert cache.get("hf")["HF_TOKEN"] == "token-1"
+    cache.stop()
+
+
+def test_expired_secret_is_served_when_the_backend_fails():
+    backend = CountingBackend()
+    clock = FakeClock()
+    cache = SecretCache(backend, ttl_seconds=60, clock=clock)
+
+    cache.get("hf")
+    backend.fail = True
+    clock.now += 120
+
+    assert cache.get("hf")["HF_TOKEN"] == "token-1"
+    assert backend.calls == 2
+    with pytest.raises(TimeoutError):
+        cache.get("never-fetched")
+    cache.stop()
+
+
+def test_backend_outages_are_retried_with_a_backoff():
+    backend = CountingBackend()
+    clock = FakeClock()
+    cache = SecretCache(backend, ttl_seconds=60, clock=clock, retry_seconds=10)
+
+    cache.get("hf")
+    backend.fail = True
+    clock.now += 120
+    for _ in range(100):
+        assert cache.get("hf")["HF_TOKEN"] == "token-1"
+    assert backend.calls == 2
+
+    clock.now += 10
+    backend.fail = False
+    assert cache.get("hf")["HF_TOKEN"] == "token-3"
+    assert backend.calls == 3
+    cache.stop()
+
+
+def test_env_backend_only_exposes_its_keys(monkeypatch):
+    monkeypatch.setenv("HF_TOKEN", "from-env")
+    monkeypatch.setenv("DATABASE_PASSWORD", "private")
+    backend = EnvSecretsBackend(keys="HF_TOKEN, OTHER_TOKEN")
+
+    assert backend.fetch("hf") == {"HF_TOKEN": "from-env"}
+
+
+def test_file_backend_reads_local_secrets(tmp_path):
+    secrets_path = tmp_path / "secrets.json"
+    secrets_path.write_text(json.dumps({"hf": {"HF_TOKEN": "local"}}))
+    backend = FileSecretsBackend(path=str(secrets_path))
+
+    assert backend.fetch("hf") == {"HF_TOKEN": "local"}
+    with pytest.raises(KeyError):
+        backend.fetch("missing")
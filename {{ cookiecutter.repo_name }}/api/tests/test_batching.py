@@ -0,0 +1,128 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import threading
+
+import pytest
+
+from app.service import batching
+from app.service.batching import BatchScheduler
+from app.service.model_registry import ModelKey, ModelRegistry
+
+
+class RecordingBatchFn(object):
+    """
+    Batch function that echoes the prompts and records every batch.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, batch):
+        with self.lock:
+            self.batches.append([xx.prompt for xx in batch])
+        return [f"echo: {xx.prompt}" for xx in batch]
+
+
+def test_concurrent_requests_are_batched_together():
+    batch_fn = RecordingBatchFn()
+    scheduler = BatchScheduler(batch_fn, max_batch_size=4, max_wait_ms=500)
+
+    futures = [scheduler.submit(f"p{idx}", 0.1, 100) for idx in range(4)]
+    results = [xx.result(timeout=5) for xx in futures]
+    scheduler.stop()
+
+    assert results == [f"echo: p{idx}" for idx in range(4)]
+    assert batch_fn.batches == [["p0", "p1", "p2", "p3"]]
+
+
+def test_incompatible_requests_run_in_separate_batches():
+    batch_fn = RecordingBatchFn()
+    scheduler = BatchScheduler(
+        batch_fn,
+        max_batch_size=8,
+        max_wait_ms=20,
+        max_length_bucket=64,
+    )
+
+    futures = [
+        scheduler.submit("a", 0.1, 10),
+        scheduler.submit("b", 0.7, 10),
+        scheduler.submit("c", 0.1, 50),
+        scheduler.submit("d", 0.1, 500),
+    ]
+    for future in futures:
+        future.result(timeout=5)
+    scheduler.stop()
+
+    assert sorted(batch_fn.batches) == [["a", "c"], ["b"], ["d"]]
+
+
+def test_batch_errors_are_returned_to_every_caller():
+    def failing_batch_fn(batch):
+        raise ValueError("generation failed")
+
+    scheduler = BatchScheduler(failing_batch_fn, max_wait_ms=1)
+    future = scheduler.submit("a", 0.1, 10)
+
+    with pytest.raises(ValueError, match="generation failed"):
+        future.result(timeout=5)
+    scheduler.stop()
+
+
+def test_missing_batch_outputs_fail_every_caller():
+    def short_batch_fn(batch):
+        return [f"echo: {xx.prompt}" for xx in batch[1:]]
+
+    scheduler = BatchScheduler(
+        short_batch_fn,
+        max_batch_size=2,
+        max_wait_ms=500,
+    )
+    futures = [scheduler.submit(f"p{idx}", 0.1, 10) for idx in range(2)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="1 outputs for 2 requests"):
+            future.result(timeout=5)
+    scheduler.stop()
+
+
+def test_evicted_models_stop_their_scheduler(stand_in_loader, monkeypatch):
+    monkeypatch.setattr(batching, "_schedulers", {})
+    registry = ModelRegistry(max_bytes=150, loader=stand_in_loader)
+    registry.add_eviction_listener(batching.remove_batch_scheduler)
+    key_a = ModelKey.for_model("model-a")
+
+    registry.get(key_a)
+    scheduler = batching.get_batch_scheduler(key_a, RecordingBatchFn())
+    assert scheduler.submit("a", 0.1, 10).result(timeout=5) == "echo: a"
+
+    registry.get(ModelKey.for_model("model-b"))
+    scheduler._thread.join(timeout=5)
+
+    assert key_a not in batching._schedulers
+    assert scheduler.stopped
+    assert not scheduler._thread.is_alive()
+    # A model loaded again gets a new scheduler
+    new_scheduler = batching.get_batch_scheduler(key_a, RecordingBatchFn())
+    assert new_scheduler is not scheduler
@@ -0,0 +1,146 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import threading
+
+from app.service import health_checks
+from app.service.inference_executor import InferenceExecutor
+from app.service.model_preloader import PreloadState
+from app.service.model_registry import ModelKey, ModelRegistry
+
+HEALTHY_MEMORY = {
+    "limit_bytes": 4 * 1024**3,
+    "usage_bytes": 1024**3,
+    "headroom_bytes": 3 * 1024**3,
+}
+
+
+def make_registry() -> ModelRegistry:
+    registry = ModelRegistry(
+        max_bytes=0,
+        loader=lambda key: ("model", "tokenizer"),
+        size_fn=lambda model_obj: 1,
+    )
+    registry.get(ModelKey("model-a", "bf16", None))
+
+    return registry
+
+
+def test_ready_worker():
+    executor = InferenceExecutor(max_workers=1, max_queue=4)
+    result = health_checks.check_readiness(
+        state=PreloadState(status="ready"),
+        executor=executor,
+        registry=make_registry(),
+        memory=HEALTHY_MEMORY,
+    )
+    executor.shutdown()
+
+    assert result["ready"]
+    assert result["checks"] == {"models": True, "queue": True, "memory": True}
+    assert result["loaded_models"] == ["model-a:bf16"]
+    assert result["max_queue_depth"] == 3
+
+
+def test_loading_worker_is_not_ready():
+    executor = InferenceExecutor(max_workers=1, max_queue=4)
+    result = health_checks.check_readiness(
+        state=PreloadState(status="loading"),
+        executor=executor,
+        registry=make_registry(),
+        memory=HEALTHY_MEMORY,
+    )
+    executor.shutdown()
+
+    assert not result["ready"]
+    assert result["checks"]["models"] is False
+
+
+def test_low_memory_worker_is_not_ready():
+    executor = InferenceExecutor(max_workers=1, max_queue=4)
+    result = health_checks.check_readiness(
+        state=PreloadState(status="ready"),
+        executor=executor,
+        registry=make_registry(),
+        memory={**HEALTHY_MEMORY, "headroom_bytes": 1024},
+    )
+    executor.shutdown()
+
+    assert not result["ready"]
+    assert result["checks"]["memory"] is False
+
+
+def test_overload_is_only_reported_without_load_awareness():
+    executor = InferenceExecutor(max_workers=1, max_queue=4)
+    low_memory = {**HEALTHY_MEMORY, "headroom_bytes": 1024}
+    results = [
+        health_checks.check_readiness(
+            state=PreloadState(status=status),
+            executor=executor,
+            registry=make_registry(),
+            memory=low_memory,
+            load_aware=False,
+        )
+        for status in ("ready", "loading")
+    ]
+    executor.shutdown()
+
+    assert results[0]["ready"]
+    assert results[0]["checks"]["memory"] is False
+    assert not results[1]["ready"]
+
+
+def test_overloaded_worker_is_not_ready():
+    executor = InferenceExecutor(max_workers=1, max_queue=4)
+    release = threading.Event()
+
+    async def scenario():
+        # One running generation, and four queued ones
+        running = [
+            asyncio.ensure_future(executor.run(release.wait, 5))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        result = health_checks.check_readiness(
+            state=PreloadState(status="ready"),
+            executor=executor,
+            registry=make_registry(),
+            memory=HEALTHY_MEMORY,
+        )
+        release.set()
+        await asyncio.gather(*running)
+        return result
+
+    result = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert not result["ready"]
+    assert result["checks"]["queue"] is False
+    assert result["queue_depth"] == 4
+
+
+def test_liveness():
+    result = health_checks.check_liveness()
+
+    assert result["alive"]
+    assert result["uptime_seconds"] >= 0
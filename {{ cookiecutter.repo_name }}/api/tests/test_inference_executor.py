@@ -0,0 +1,106 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import threading
+
+import pytest
+
+from app.api_exceptions import ApiException
+from app.service.inference_executor import InferenceExecutor
+
+
+def test_work_runs_off_the_event_loop():
+    executor = InferenceExecutor(max_workers=1, max_queue=0)
+    loop_thread = threading.get_ident()
+
+    worker_thread = asyncio.run(executor.run(threading.get_ident))
+    executor.shutdown()
+
+    assert worker_thread != loop_thread
+
+
+def test_saturated_executor_rejects_with_retry_after():
+    executor = InferenceExecutor(max_workers=1, max_queue=1, retry_after=7)
+    release = threading.Event()
+
+    async def scenario():
+        running = [
+            asyncio.ensure_future(executor.run(release.wait, 5))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(ApiException) as exc_info:
+            await executor.run(lambda: None)
+        release.set()
+        await asyncio.gather(*running)
+        return exc_info.value
+
+    exc = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert exc.status_code == 429
+    assert exc.headers == {"Retry-After": "7"}
+    assert executor.in_flight == 0
+
+
+def test_background_work_leaves_reserved_workers_free():
+    executor = InferenceExecutor(
+        max_workers=2,
+        max_queue=0,
+        reserved_workers=1,
+    )
+    release = threading.Event()
+
+    async def scenario():
+        job = executor.submit(release.wait, 5, background=True)
+        with pytest.raises(ApiException):
+            executor.submit(lambda: None, background=True)
+        interactive = await executor.run(lambda: "served")
+        release.set()
+        await job
+        return interactive
+
+    assert asyncio.run(scenario()) == "served"
+    executor.shutdown()
+    assert executor.in_flight == 0
+
+
+def test_background_work_does_not_get_interactive_requests_rejected():
+    executor = InferenceExecutor(
+        max_workers=1,
+        max_queue=0,
+        reserved_workers=1,
+    )
+    release = threading.Event()
+
+    async def scenario():
+        # Idle executors still run background work
+        job = executor.submit(release.wait, 5, background=True)
+        assert not executor.saturated
+        interactive = executor.submit(lambda: "served")
+        release.set()
+        await job
+        return await interactive
+
+    assert asyncio.run(scenario()) == "served"
+    executor.shutdown()
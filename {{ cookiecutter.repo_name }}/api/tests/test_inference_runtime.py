@@ -0,0 +1,95 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import pytest
+
+from app.service import inference_runtime
+from app.service.inference_runtime import derive_runtime_config
+from app.utils.system import cpu_quota
+
+
+def test_threads_are_split_between_workers_and_slots():
+    config = derive_runtime_config(
+        quota=8.0,
+        server_workers=2,
+        generation_slots=2,
+    )
+
+    assert config.cpus == 4.0
+    assert config.intra_op_threads == 2
+    assert config.inter_op_threads == 1
+
+
+def test_fractional_quotas_still_get_a_thread():
+    config = derive_runtime_config(quota=0.5, server_workers=1)
+
+    assert config.cpus == 1.0
+    assert config.intra_op_threads == 1
+
+
+def test_explicit_settings_take_precedence():
+    config = derive_runtime_config(
+        quota=16.0,
+        cpus=3.0,
+        generation_slots=1,
+        intra_op_threads=6,
+        inter_op_threads=2,
+    )
+
+    assert config.cpus == 3.0
+    assert config.intra_op_threads == 6
+    assert config.inter_op_threads == 2
+
+
+def test_cpu_quota_is_positive():
+    assert cpu_quota() > 0
+
+
+@pytest.fixture
+def cpu_sets(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        inference_runtime,
+        "INFERENCE_CPU_LOCK_DIR",
+        str(tmp_path),
+    )
+    monkeypatch.setattr(
+        inference_runtime,
+        "available_cpus",
+        lambda: list(range(4)),
+    )
+    monkeypatch.setattr(inference_runtime, "_cpu_set_lock", None)
+    yield
+    if inference_runtime._cpu_set_lock is not None:
+        inference_runtime._cpu_set_lock.close()
+
+
+def test_workers_claim_distinct_cpu_sets(cpu_sets):
+    first = inference_runtime._claim_cpu_set(2)
+    first_lock = inference_runtime._cpu_set_lock
+    # Another worker, holding its own lock file
+    second = inference_runtime._claim_cpu_set(2)
+    third = inference_runtime._claim_cpu_set(2)
+    first_lock.close()
+
+    assert first == [0, 1]
+    assert second == [2, 3]
+    assert third is None
@@ -0,0 +1,212 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import threading
+
+import pytest
+
+from app.api_exceptions import ApiException
+from app.service.inference_executor import InferenceExecutor
+from app.service.job_queue import JobQueue, MemoryJobStore, SQLiteJobStore
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def echo(payload):
+    if payload.get("fail"):
+        raise RuntimeError("generation failed")
+    return {"response": payload["prompt"]}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteJobStore(path=str(tmp_path / "jobs.sqlite3"))
+    return MemoryJobStore()
+
+
+def make_queue(store, clock, **kwargs):
+    return JobQueue(store=store, handlers={"llm": echo}, clock=clock, **kwargs)
+
+
+def test_jobs_run_by_priority_then_age(store):
+    clock = FakeClock()
+    queue = make_queue(store, clock, tenant_max_running=10)
+    order = []
+    for prompt, priority in [("a", 0), ("b", 5), ("c", 0), ("d", 5)]:
+        clock.now += 1
+        order.append(
+            queue.submit("llm", {"prompt": prompt}, "t", priority).job_id
+        )
+
+    claimed = [store.claim(10, clock()).job_id for _ in range(4)]
+
+    assert claimed == [order[1], order[3], order[0], order[2]]
+    assert store.claim(10, clock()) is None
+
+
+def test_tenants_are_limited_to_their_running_jobs(store):
+    clock = FakeClock()
+    queue = make_queue(store, clock, tenant_max_running=1)
+    queue.submit("llm", {"prompt": "a"}, "heavy", priority=5)
+    queue.submit("llm", {"prompt": "b"}, "heavy", priority=5)
+    interactive = queue.submit("llm", {"prompt": "c"}, "light")
+
+    first = store.claim(1, clock())
+    second = store.claim(1, clock())
+
+    assert first.tenant == "heavy"
+    assert second.job_id == interactive.job_id
+    assert store.claim(1, clock()) is None
+
+
+def test_finished_jobs_expire(store):
+    clock = FakeClock()
+    queue = make_queue(store, clock, result_ttl_seconds=60)
+    job = queue.submit("llm", {"prompt": "hello"}, "t")
+
+    assert asyncio.run(queue.run_once())
+    finished = queue.get(job.job_id)
+    assert finished.status == "succeeded"
+    assert finished.result == {"response": "hello"}
+
+    clock.now += 61
+    assert queue.get(job.job_id) is None
+    assert asyncio.run(queue.purge()) == 1
+
+
+def test_failed_jobs_report_their_error(store):
+    clock = FakeClock()
+    queue = make_queue(store, clock)
+    job = queue.submit("llm", {"prompt": "x", "fail": True}, "t")
+
+    asyncio.run(queue.run_once())
+
+    failed = queue.get(job.job_id)
+    assert failed.status == "failed"
+    assert failed.error == "generation failed"
+
+
+def test_saturated_executor_requeues_the_job(store):
+    clock = FakeClock()
+
+    async def saturated(payload):
+        raise ApiException(
+            message="Inference capacity exceeded, retry later.",
+            status_code=429,
+            headers={"Retry-After": "0"},
+        )
+
+    queue = JobQueue(store=store, handlers={"llm": saturated}, clock=clock)
+    job = queue.submit("llm", {"prompt": "x"}, "t")
+
+    assert asyncio.run(queue.run_once())
+    assert queue.get(job.job_id).status == "queued"
+
+
+def test_lost_jobs_time_out(store):
+    clock = FakeClock()
+    queue = make_queue(store, clock, running_timeout_seconds=30)
+    job = queue.submit("llm", {"prompt": "x"}, "t")
+    store.claim(1, clock())
+
+    clock.now += 31
+    asyncio.run(queue.purge())
+
+    assert queue.get(job.job_id).error == "Job timed out"
+    # The tenant gets its slot back
+    queue.submit("llm", {"prompt": "y"}, "t")
+    assert store.claim(1, clock()) is not None
+
+
+def test_tenants_are_limited_to_their_queued_jobs(store):
+    queue = make_queue(store, FakeClock(), tenant_max_queued=1)
+    queue.submit("llm", {"prompt": "a"}, "t")
+
+    with pytest.raises(ApiException) as error:
+        queue.submit("llm", {"prompt": "b"}, "t")
+
+    assert error.value.status_code == 429
+    queue.submit("llm", {"prompt": "c"}, "other")
+
+
+def test_jobs_wait_for_running_interactive_calls(store):
+    clock = FakeClock()
+    executor = InferenceExecutor(
+        max_workers=1,
+        max_queue=0,
+        retry_after=0,
+        reserved_workers=1,
+    )
+    release = threading.Event()
+
+    async def generate(payload):
+        return await executor.run(
+            lambda: {"response": payload["prompt"]},
+            background=True,
+        )
+
+    queue = JobQueue(
+        store=store,
+        handlers={"llm": generate},
+        clock=clock,
+        poll_interval=0,
+        executor=executor,
+    )
+
+    async def scenario():
+        interactive = executor.submit(lambda: release.wait(5) and "served")
+        job = queue.submit("llm", {"prompt": "x"}, "t")
+        assert await queue.run_once()
+        assert queue.get(job.job_id).status == "queued"
+
+        release.set()
+        assert await interactive == "served"
+        assert await queue.run_once()
+        return queue.get(job.job_id)
+
+    job = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert job.status == "succeeded"
+    assert job.result == {"response": "x"}
+
+
+def test_job_workers_are_checked_against_the_executor(store):
+    executor = InferenceExecutor(max_workers=2, reserved_workers=1)
+
+    for workers, fits in [(1, True), (2, False)]:
+        queue = make_queue(
+            store,
+            FakeClock(),
+            workers=workers,
+            executor=executor,
+        )
+        assert queue.check_workers() == fits
+    executor.shutdown()
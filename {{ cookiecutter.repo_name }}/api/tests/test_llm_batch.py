@@ -0,0 +1,193 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import threading
+
+from app.models.genai.llm_prompt import LLMBatchRequest
+from app.service.inference_executor import InferenceExecutor
+from app.service.llm_service import (
+    LLMService,
+    generate_chunked,
+    length_sorted_chunks,
+)
+from app.service.model_registry import ModelRegistry
+
+
+class StandInTokenizer(object):
+    """
+    Tokenizer that splits prompts on whitespace.
+    """
+
+    def __call__(self, prompts, return_tensors=None, padding=False):
+        return {"input_ids": [xx.split() for xx in prompts]}
+
+
+class RecordingGenerateFn(object):
+    """
+    Generation function that echoes the prompts, records every chunk and
+    fails on the prompts that contain ``fail``.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def __call__(self, prompts, **kwargs):
+        self.chunks.append(list(prompts))
+        if any("fail" in xx for xx in prompts):
+            raise RuntimeError("generation failed")
+        return [f"echo: {xx}" for xx in prompts]
+
+
+def test_length_sorted_chunks_group_similar_lengths():
+    chunks = length_sorted_chunks([5, 1, 4, 2, 3], chunk_size=2)
+
+    assert chunks == [[1, 3], [4, 2], [0]]
+
+
+def test_results_are_returned_in_order():
+    generate_fn = RecordingGenerateFn()
+    prompts = ["a b c d", "a", "a b c", "a b"]
+
+    results = generate_chunked(
+        model_obj=None,
+        tokenizer=StandInTokenizer(),
+        prompts=prompts,
+        temperature=0.1,
+        max_length=10,
+        chunk_size=2,
+        generate_fn=generate_fn,
+    )
+
+    assert generate_fn.chunks == [["a", "a b"], ["a b c", "a b c d"]]
+    assert results == [
+        {"index": idx, "response": f"echo: {xx}"}
+        for idx, xx in enumerate(prompts)
+    ]
+
+
+def test_failures_are_reported_per_prompt():
+    generate_fn = RecordingGenerateFn()
+    prompts = ["ok one", "fail", "ok two", "far too many tokens here"]
+
+    results = generate_chunked(
+        model_obj=None,
+        tokenizer=StandInTokenizer(),
+        prompts=prompts,
+        temperature=0.1,
+        max_length=3,
+        chunk_size=8,
+        generate_fn=generate_fn,
+    )
+
+    assert results[0] == {"index": 0, "response": "echo: ok one"}
+    assert results[1] == {"index": 1, "error": "generation failed"}
+    assert results[2] == {"index": 2, "response": "echo: ok two"}
+    assert "more than the `max_length`" in results[3]["error"]
+    # The failed chunk gets retried one prompt at a time
+    assert generate_fn.chunks[1:] == [["fail"], ["ok one"], ["ok two"]]
+
+
+def test_ainvoke_batch_counts_failures(stand_in_loader, monkeypatch):
+    from app.service import llm_service
+
+    monkeypatch.setattr(
+        llm_service,
+        "count_tokens",
+        lambda tokenizer, prompts: [len(xx) for xx in prompts],
+    )
+    monkeypatch.setattr(llm_service, "generate_batch", RecordingGenerateFn())
+    registry = ModelRegistry(max_bytes=0, loader=stand_in_loader)
+    executor = InferenceExecutor(max_workers=1)
+    request = LLMBatchRequest(
+        prompts=["ok", "fail", "ok"],
+        model_name="model-a",
+        max_length=10,
+    )
+
+    response = asyncio.run(
+        LLMService.ainvoke_batch(
+            request=request,
+            executor=executor,
+            registry=registry,
+        )
+    )
+    executor.shutdown()
+
+    assert [xx["index"] for xx in response["results"]] == [0, 1, 2]
+    assert response["succeeded"] == 2
+    assert response["failed"] == 1
+    assert len(stand_in_loader.calls) == 1
+
+
+def test_interactive_calls_run_between_chunks(stand_in_loader, monkeypatch):
+    from app.service import llm_service
+
+    order = []
+    first_chunk_started = threading.Event()
+    release = threading.Event()
+
+    def generate_fn(prompts, **kwargs):
+        if not order:
+            first_chunk_started.set()
+            release.wait(5)
+        order.append(list(prompts))
+        return [f"echo: {xx}" for xx in prompts]
+
+    monkeypatch.setattr(
+        llm_service,
+        "count_tokens",
+        lambda tokenizer, prompts: [len(xx) for xx in prompts],
+    )
+    monkeypatch.setattr(llm_service, "generate_batch", generate_fn)
+    registry = ModelRegistry(max_bytes=0, loader=stand_in_loader)
+    executor = InferenceExecutor(
+        max_workers=1,
+        max_queue=0,
+        reserved_workers=1,
+    )
+    request = LLMBatchRequest(
+        prompts=["a", "bb"],
+        model_name="model-a",
+        max_length=10,
+        chunk_size=1,
+    )
+
+    async def scenario():
+        batch = asyncio.ensure_future(
+            LLMService.ainvoke_batch(
+                request=request,
+                executor=executor,
+                registry=registry,
+            )
+        )
+        await asyncio.to_thread(first_chunk_started.wait, 5)
+        interactive = executor.submit(lambda: order.append("interactive"))
+        release.set()
+        await interactive
+        return await batch
+
+    response = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert order == [["a"], "interactive", ["bb"]]
+    assert response["succeeded"] == 2
@@ -0,0 +1,63 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from benchmarks.load_test import (
+    RequestResult,
+    compare_reports,
+    percentile,
+    summarize,
+)
+
+
+def test_percentiles_use_the_nearest_rank():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 95) == 5.0
+    assert percentile(values, 0) == 1.0
+    assert percentile([], 50) is None
+
+
+def test_summary_only_times_successful_requests():
+    results = [
+        RequestResult(status_code=200, latency=1.0, ttft=0.1),
+        RequestResult(status_code=200, latency=3.0, ttft=None),
+        RequestResult(status_code=429, latency=0.01, ttft=None),
+    ]
+
+    summary = summarize(results, elapsed=2.0, rss_bytes=None)
+
+    assert summary["n_errors"] == 1
+    assert summary["throughput_rps"] == 1.0
+    assert summary["latency_p50"] == 1.0
+    assert summary["latency_p99"] == 3.0
+    assert summary["ttft_p99"] == 0.1
+
+
+def test_regressions_depend_on_the_direction_of_the_metric():
+    baseline = {"summary": {"latency_p95": 1.0, "throughput_rps": 10.0}}
+    report = {"summary": {"latency_p95": 1.2, "throughput_rps": 12.0}}
+
+    comparison = compare_reports(report, baseline, tolerance=0.1)
+
+    assert comparison["latency_p95"]["regression"]
+    assert not comparison["throughput_rps"]["regression"]
@@ -0,0 +1,65 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import io
+import json
+import logging
+import queue
+
+import structlog
+
+from app.utils import logging as app_logging
+
+
+def test_structlog_and_stdlib_share_the_json_pipeline(monkeypatch):
+    monkeypatch.setattr(app_logging, "JSON_LOGS", True)
+    stream = io.StringIO()
+    root_handlers = logging.root.handlers
+    app_logging.setup_logging(stream=stream)
+    try:
+        app_logging.get_logger("app.test").info("loaded", model_name="a")
+        logging.getLogger("uvicorn.test").warning("port %s in use", 8000)
+    finally:
+        app_logging.shutdown_logging()
+        logging.root.handlers = root_handlers
+        structlog.reset_defaults()
+
+    entries = [json.loads(xx) for xx in stream.getvalue().splitlines()]
+
+    assert entries[0]["event"] == "loaded"
+    assert entries[0]["model_name"] == "a"
+    assert entries[0]["logger"] == "app.test"
+    assert entries[0]["level"] == "info"
+    assert entries[1]["event"] == "port 8000 in use"
+    assert entries[1]["level"] == "warning"
+    assert all("timestamp" in xx for xx in entries)
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    handler = app_logging.NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    logger = app_logging.QueueLogger(name="app.test", handler=handler)
+
+    for _ in range(3):
+        logger.info({"event": "hello"}, extra={})
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 2
@@ -0,0 +1,63 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from app.utils.metrics import MetricsRegistry
+
+
+def test_render_counters_gauges_and_histograms():
+    registry = MetricsRegistry()
+    tokens = registry.counter(
+        "tokens_total",
+        "Tokens",
+        labelnames=("model_name",),
+    )
+    tokens.inc(3, model_name="a")
+    tokens.inc(2, model_name="a")
+    registry.gauge("queue_depth", "Queue depth").set_function(lambda: 7)
+    latency = registry.histogram(
+        "latency_seconds",
+        "Latency",
+        buckets=(0.1, 1.0),
+    )
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE tokens_total counter" in lines
+    assert 'tokens_total{model_name="a"} 5' in lines
+    assert "queue_depth 7" in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in lines
+    assert "latency_seconds_count 2" in lines
+
+
+def test_histogram_timer_and_label_escaping():
+    registry = MetricsRegistry()
+    stages = registry.histogram("stage_seconds", labelnames=("stage",))
+
+    with stages.time(stage='de"code'):
+        pass
+
+    assert ('de"code',) in stages.snapshot()
+    assert 'stage="de\\"code"' in registry.render()
@@ -0,0 +1,83 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import os
+
+import pytest
+
+from app.service.mmap_weights import has_safetensors, load_mmap_state_dict
+
+torch = pytest.importorskip("torch")
+safetensors_torch = pytest.importorskip("safetensors.torch")
+
+
+def make_weights():
+    return {
+        "embed.weight": torch.arange(12, dtype=torch.float32).reshape(3, 4),
+        "lm_head.bias": torch.tensor([1.5, -2.0], dtype=torch.bfloat16),
+        "position_ids": torch.arange(5, dtype=torch.int64),
+        "empty": torch.zeros(0, dtype=torch.float32),
+    }
+
+
+def test_single_file_is_memory_mapped(tmp_path):
+    weights = make_weights()
+    safetensors_torch.save_file(
+        weights, os.path.join(tmp_path, "model.safetensors")
+    )
+
+    assert has_safetensors(str(tmp_path))
+    state_dict = load_mmap_state_dict(str(tmp_path))
+
+    assert set(state_dict) == set(weights)
+    for name, tensor in weights.items():
+        assert state_dict[name].dtype == tensor.dtype
+        assert torch.equal(state_dict[name], tensor)
+
+
+def test_sharded_files_are_merged(tmp_path):
+    weights = make_weights()
+    shards = {
+        "model-00001-of-00002.safetensors": ["embed.weight", "empty"],
+        "model-00002-of-00002.safetensors": ["lm_head.bias", "position_ids"],
+    }
+    weight_map = {}
+    for filename, names in shards.items():
+        safetensors_torch.save_file(
+            {name: weights[name] for name in names},
+            os.path.join(tmp_path, filename),
+        )
+        weight_map.update({name: filename for name in names})
+    with open(
+        os.path.join(tmp_path, "model.safetensors.index.json"), "w"
+    ) as index_file:
+        json.dump({"weight_map": weight_map}, index_file)
+
+    state_dict = load_mmap_state_dict(str(tmp_path))
+
+    assert set(state_dict) == set(weights)
+    assert torch.equal(state_dict["embed.weight"], weights["embed.weight"])
+
+
+def test_missing_safetensors(tmp_path):
+    assert not has_safetensors(str(tmp_path))
@@ -0,0 +1,133 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+
+import huggingface_hub
+import pytest
+
+from app.service import model_artifacts
+
+MODEL_NAME = "org/model-a"
+FILES = {
+    "config.json": b'{"model_type": "gpt2"}',
+    "model.safetensors": b"weights" * 100,
+}
+
+
+class StandInHfApi(object):
+    """
+    Hub API that resolves every revision to a commit named after it.
+    """
+
+    def __init__(self, token=None):
+        self.token = token
+
+    def model_info(self, model_name, revision=None):
+        return type("ModelInfo", (), {"sha": f"commit-{revision}"})()
+
+
+def stand_in_snapshot_download(model_name, revision, local_dir, **kwargs):
+    os.makedirs(os.path.join(local_dir, ".cache"), exist_ok=True)
+    for filename, content in FILES.items():
+        with open(os.path.join(local_dir, filename), "wb") as out:
+            out.write(content)
+
+    return local_dir
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    monkeypatch.setattr(huggingface_hub, "HfApi", StandInHfApi)
+    monkeypatch.setattr(
+        huggingface_hub, "snapshot_download", stand_in_snapshot_download
+    )
+    monkeypatch.setattr(model_artifacts, "_verified", {})
+
+
+def test_fetch_and_resolve(tmp_path, hub):
+    root = str(tmp_path)
+    version_dir = model_artifacts.fetch_model(MODEL_NAME, root=root)
+
+    assert version_dir.endswith(os.path.join("versions", "commit-main"))
+    assert sorted(os.listdir(version_dir)) == sorted(
+        [*FILES, model_artifacts.MANIFEST_NAME]
+    )
+    assert model_artifacts.resolve_artifact(MODEL_NAME, root=root) == (
+        version_dir
+    )
+    assert (
+        model_artifacts.resolve_artifact(
+            MODEL_NAME, revision="commit-main", root=root
+        )
+        == version_dir
+    )
+    assert model_artifacts.resolve_artifact("org/other", root=root) is None
+
+
+def test_tampered_files_are_rejected(tmp_path, hub):
+    root = str(tmp_path)
+    version_dir = model_artifacts.fetch_model(MODEL_NAME, root=root)
+    with open(os.path.join(version_dir, "model.safetensors"), "r+b") as out:
+        out.write(b"W")
+
+    # Same size, so only the digest catches it
+    model_artifacts.verify_artifact(version_dir, mode="size")
+    with pytest.raises(model_artifacts.ArtifactIntegrityError):
+        model_artifacts.resolve_artifact(
+            MODEL_NAME,
+            root=root,
+            verify="sha256",
+        )
+
+    os.remove(os.path.join(version_dir, "config.json"))
+    with pytest.raises(model_artifacts.ArtifactIntegrityError):
+        model_artifacts.verify_artifact(version_dir, mode="size")
+
+
+def test_list_and_prune(tmp_path, hub):
+    root = str(tmp_path)
+    model_artifacts.fetch_model(MODEL_NAME, revision="v1", root=root)
+    model_artifacts.fetch_model(MODEL_NAME, revision="v2", root=root)
+    # `v1` now points at the same commit as `v2`
+    model_artifacts._write_ref(
+        os.path.join(root, "org--model-a"), "v1", "commit-v2"
+    )
+    model_artifacts.fetch_model(MODEL_NAME, revision="v3", root=root)
+
+    artifacts = model_artifacts.list_artifacts(root)
+    assert [(xx.commit, xx.refs) for xx in artifacts] == [
+        ("commit-v1", []),
+        ("commit-v2", ["v1", "v2"]),
+        ("commit-v3", ["v3"]),
+    ]
+    assert artifacts[0].size_bytes == sum(len(xx) for xx in FILES.values())
+
+    pruned = model_artifacts.prune_artifacts(root, keep=0, dry_run=True)
+    assert [xx.commit for xx in pruned] == ["commit-v1"]
+    assert len(model_artifacts.list_artifacts(root)) == 3
+
+    model_artifacts.prune_artifacts(root, keep=0)
+    assert [xx.commit for xx in model_artifacts.list_artifacts(root)] == [
+        "commit-v2",
+        "commit-v3",
+    ]
@@ -0,0 +1,104 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from app.service import model_preloader
+from app.service.model_preloader import PreloadState, preload_models
+from app.service.model_registry import ModelKey, ModelRegistry
+
+
+def test_preloading_marks_state_as_ready(stand_in_loader, monkeypatch):
+    warmed_up = []
+    monkeypatch.setattr(
+        model_preloader,
+        "warm_up_model",
+        lambda loaded_model: warmed_up.append(loaded_model.key),
+    )
+    registry = ModelRegistry(max_bytes=0, loader=stand_in_loader)
+    state = PreloadState()
+
+    preload_models(["a", "b"], registry=registry, state=state)
+
+    assert state.ready
+    assert sorted(state.models) == ["a", "b"]
+    assert warmed_up == [ModelKey("a"), ModelKey("b")]
+    assert ModelKey("a") in registry
+
+
+def test_failed_preloading_is_never_ready(monkeypatch):
+    def failing_loader(key):
+        raise OSError(f"Cannot load {key.model_name}")
+
+    registry = ModelRegistry(max_bytes=0, loader=failing_loader)
+    state = PreloadState()
+
+    preload_models(
+        ["missing-model"],
+        registry=registry,
+        state=state,
+        max_attempts=2,
+        retry_seconds=0,
+    )
+
+    assert not state.ready
+    assert state.status == "failed"
+    assert state.attempts == 2
+    assert "missing-model" in state.error
+
+
+def test_failed_preloading_recovers_on_retry(stand_in_loader, monkeypatch):
+    monkeypatch.setattr(
+        model_preloader,
+        "warm_up_model",
+        lambda loaded_model: None,
+    )
+    outage = ["hub down", "hub still down"]
+
+    def flaky_loader(key):
+        if key.model_name == "b" and outage:
+            raise OSError(outage.pop(0))
+        return stand_in_loader(key)
+
+    registry = ModelRegistry(max_bytes=0, loader=flaky_loader)
+    state = PreloadState()
+
+    preload_models(["a", "b"], registry=registry, state=state, retry_seconds=0)
+
+    assert state.ready
+    assert state.error is None
+    assert state.attempts == 3
+    assert sorted(state.models) == ["a", "b"]
+    # Models that were ready are not loaded again
+    assert [xx.model_name for xx in stand_in_loader.calls] == ["a", "b"]
+
+
+def test_cancelled_preloading_stops_retrying():
+    def failing_loader(key):
+        raise OSError(f"Cannot load {key.model_name}")
+
+    registry = ModelRegistry(max_bytes=0, loader=failing_loader)
+    state = PreloadState()
+    state.cancel()
+
+    preload_models(["missing-model"], registry=registry, state=state)
+
+    assert state.status == "failed"
+    assert state.attempts == 1
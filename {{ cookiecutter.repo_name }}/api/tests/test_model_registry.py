@@ -0,0 +1,132 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import threading
+
+import pytest
+
+from app.service.model_registry import (
+    ModelKey,
+    ModelRegistry,
+    parse_load_modes,
+)
+
+
+def test_repeated_lookups_load_once(stand_in_loader):
+    registry = ModelRegistry(max_bytes=0, loader=stand_in_loader)
+    key = ModelKey(model_name="tiny-model")
+
+    first = registry.get(key)
+    second = registry.get(key)
+
+    assert first is second
+    assert len(stand_in_loader.calls) == 1
+    assert registry.stats()["hits"] == 1
+    assert registry.stats()["misses"] == 1
+
+
+def test_load_mode_and_revision_are_part_of_the_key(stand_in_loader):
+    registry = ModelRegistry(max_bytes=0, loader=stand_in_loader)
+
+    registry.get(ModelKey("tiny-model", "fp32", None))
+    registry.get(ModelKey("tiny-model", "bf16", None))
+    registry.get(ModelKey("tiny-model", "fp32", "v2"))
+
+    assert len(registry) == 3
+    assert registry.stats()["misses"] == 3
+    assert sorted(xx["load_mode"] for xx in registry.stats()["models"]) == [
+        "bf16",
+        "fp32",
+        "fp32",
+    ]
+
+
+def test_least_recently_used_model_is_evicted(stand_in_loader):
+    registry = ModelRegistry(max_bytes=250, loader=stand_in_loader)
+    key_a, key_b, key_c = (ModelKey(xx) for xx in ("a", "b", "c"))
+
+    registry.get(key_a)
+    registry.get(key_b)
+    # Touching `a` makes `b` the least recently used model
+    registry.get(key_a)
+    registry.get(key_c)
+
+    assert registry.keys() == [key_a, key_c]
+    assert registry.stats()["evictions"] == 1
+    assert registry.total_bytes == 200
+
+
+def test_model_over_budget_is_still_served(stand_in_loader):
+    registry = ModelRegistry(max_bytes=50, loader=stand_in_loader)
+
+    entry = registry.get(ModelKey("big-model"))
+
+    assert entry.size_bytes == 100
+    assert len(registry) == 1
+
+
+def test_concurrent_misses_share_a_single_load(stand_in_loader):
+    release = threading.Event()
+
+    def slow_loader(key):
+        release.wait(timeout=5)
+        return stand_in_loader(key)
+
+    registry = ModelRegistry(max_bytes=0, loader=slow_loader)
+    key = ModelKey("tiny-model")
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get(key)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(stand_in_loader.calls) == 1
+    assert all(xx is results[0] for xx in results)
+    assert registry.stats()["misses"] == 1
+    assert registry.stats()["hits"] == 3
+
+
+def test_failed_loads_do_not_leave_locks_behind():
+    def loader(key):
+        raise OSError(f"Unknown model `{key.model_name}`")
+
+    registry = ModelRegistry(max_bytes=0, loader=loader)
+
+    for name in ("unknown-a", "unknown-b"):
+        with pytest.raises(OSError):
+            registry.get(ModelKey(name))
+
+    assert registry._load_locks == {}
+    assert len(registry) == 0
+
+
+def test_bad_load_mode_entries_are_skipped():
+    load_modes = parse_load_modes(
+        "model_a=bf16, org/model=b=int8,no-mode,=fp32,model_c=fp8,"
+    )
+
+    assert load_modes == {"model_a": "bf16", "org/model=b": "int8"}
@@ -0,0 +1,98 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from app.service.model_registry import ModelKey
+from app.service.prefix_cache import PrefixCache
+
+MODEL_KEY = ModelKey("model-a", "fp32", None)
+SYSTEM_PROMPT = list(range(100, 108))
+
+
+def make_cache(**kwargs) -> PrefixCache:
+    params = dict(
+        max_bytes=0,
+        block_tokens=4,
+        min_tokens=4,
+        min_hits=2,
+        size_fn=lambda past_key_values: 10,
+    )
+    params.update(kwargs)
+
+    return PrefixCache(**params)
+
+
+def test_prefix_is_cached_once_seen_often_enough():
+    prefix_cache = make_cache()
+
+    # First occurrence only gets counted
+    assert prefix_cache.lookup(MODEL_KEY, SYSTEM_PROMPT + [1, 2]) == (None, 0)
+    # Second occurrence, with different user text, is worth caching
+    cached_prefix, n_cacheable = prefix_cache.lookup(
+        MODEL_KEY,
+        SYSTEM_PROMPT + [3],
+    )
+    assert cached_prefix is None
+    assert n_cacheable == len(SYSTEM_PROMPT)
+
+    prefix_cache.put(MODEL_KEY, SYSTEM_PROMPT, past_key_values="state")
+    cached_prefix, _ = prefix_cache.lookup(MODEL_KEY, SYSTEM_PROMPT + [4, 5])
+
+    assert cached_prefix.past_key_values == "state"
+    assert cached_prefix.n_tokens == len(SYSTEM_PROMPT)
+    stats = prefix_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["lookups"] == 3
+    assert stats["saved_prefill_tokens"] == len(SYSTEM_PROMPT)
+
+
+def test_prefix_needs_a_token_left_to_generate_from():
+    prefix_cache = make_cache(min_hits=1)
+    prefix_cache.put(MODEL_KEY, SYSTEM_PROMPT, past_key_values="state")
+
+    cached_prefix, n_cacheable = prefix_cache.lookup(MODEL_KEY, SYSTEM_PROMPT)
+
+    # Only the first block can be reused when the prompt is the prefix
+    assert cached_prefix is None
+    assert n_cacheable == 4
+
+
+def test_prefixes_are_cached_per_model():
+    prefix_cache = make_cache()
+    prefix_cache.put(MODEL_KEY, SYSTEM_PROMPT, past_key_values="state")
+
+    other_key = ModelKey("model-b", "fp32", None)
+    cached_prefix, _ = prefix_cache.lookup(other_key, SYSTEM_PROMPT + [1])
+
+    assert cached_prefix is None
+
+
+def test_least_recently_used_prefixes_are_evicted():
+    prefix_cache = make_cache(max_bytes=20)
+    prefixes = [[idx] * 4 for idx in range(3)]
+    for prefix in prefixes:
+        prefix_cache.put(MODEL_KEY, prefix, past_key_values=prefix)
+
+    assert len(prefix_cache) == 2
+    assert prefix_cache.total_bytes == 20
+    assert prefix_cache.stats()["evictions"] == 1
+    assert prefix_cache.lookup(MODEL_KEY, prefixes[0] + [9])[0] is None
+    assert prefix_cache.lookup(MODEL_KEY, prefixes[2] + [9])[0] is not None
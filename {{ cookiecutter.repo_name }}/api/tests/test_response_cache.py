@@ -0,0 +1,108 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import pytest
+
+from app.models.genai.llm_prompt import LLMRequest
+from app.service.response_cache import (
+    MemoryCacheBackend,
+    SQLiteCacheBackend,
+    request_cache_key,
+)
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_backend(request, tmp_path):
+    def _make_backend(**kwargs):
+        if request.param == "memory":
+            return MemoryCacheBackend(**kwargs)
+        return SQLiteCacheBackend(
+            path=str(tmp_path / "cache.sqlite3"),
+            **kwargs,
+        )
+
+    return _make_backend
+
+
+def test_entries_expire_after_their_ttl(make_backend):
+    clock = FakeClock()
+    backend = make_backend(max_bytes=1024, ttl_seconds=10, clock=clock)
+
+    backend.set("key", b"value")
+    clock.now += 5
+    assert backend.get("key") == b"value"
+    clock.now += 10
+    assert backend.get("key") is None
+
+
+def test_least_recently_used_entries_are_evicted(make_backend):
+    clock = FakeClock()
+    # Each entry takes 2 bytes, so only two of them fit
+    backend = make_backend(max_bytes=4, ttl_seconds=60, clock=clock)
+
+    backend.set("a", b"1")
+    clock.now += 1
+    backend.set("b", b"2")
+    clock.now += 1
+    assert backend.get("a") == b"1"
+    clock.now += 1
+    backend.set("c", b"3")
+
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1"
+    assert backend.get("c") == b"3"
+
+
+def test_cache_key_ignores_the_bypass_flag():
+    request = LLMRequest(prompt="Hi", model_name="tiny-model")
+    bypass_request = LLMRequest(
+        prompt="Hi",
+        model_name="tiny-model",
+        cache_bypass=True,
+    )
+    other_request = LLMRequest(
+        prompt="Hi",
+        model_name="tiny-model",
+        temperature=0.7,
+    )
+
+    assert request_cache_key(request) == request_cache_key(bypass_request)
+    assert request_cache_key(request) != request_cache_key(other_request)
+
+
+def test_cache_key_includes_the_assistant_model():
+    request = LLMRequest(prompt="Hi", model_name="tiny-model")
+    assisted_request = LLMRequest(
+        prompt="Hi",
+        model_name="tiny-model",
+        assistant_model_name="tinier-model",
+    )
+
+    assert request_cache_key(request) != request_cache_key(assisted_request)
@@ -0,0 +1,94 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+
+from app.service.single_flight import SingleFlight
+
+
+def test_identical_calls_share_one_computation():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"response": "shared"}
+
+    async def scenario():
+        return await asyncio.gather(
+            *(single_flight.run("key", compute) for _ in range(5))
+        )
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(xx == {"response": "shared"} for xx in results)
+    assert single_flight.stats() == {
+        "leaders": 1,
+        "followers": 4,
+        "in_flight": 0,
+    }
+
+
+def test_cancelled_caller_does_not_break_the_others():
+    single_flight = SingleFlight()
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def compute():
+            await gate.wait()
+            return "done"
+
+        leader = asyncio.ensure_future(single_flight.run("key", compute))
+        follower = asyncio.ensure_future(single_flight.run("key", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        gate.set()
+        return await follower, leader.cancelled()
+
+    result, leader_cancelled = asyncio.run(scenario())
+
+    assert result == "done"
+    assert leader_cancelled
+
+
+def test_errors_are_shared_and_not_cached():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def failing_compute():
+        calls.append(1)
+        raise RuntimeError("generation failed")
+
+    async def scenario():
+        results = []
+        for _ in range(2):
+            try:
+                await single_flight.run("key", failing_compute)
+            except RuntimeError as e:
+                results.append(str(e))
+        return results
+
+    assert asyncio.run(scenario()) == ["generation failed"] * 2
+    assert len(calls) == 2
@@ -0,0 +1,99 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import pytest
+
+from app.models.genai.llm_prompt import LLMRequest
+from app.service.model_registry import ModelRegistry
+from app.service.speculative import SpeculativeStats, generate_with_assistant
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    from benchmarks.tiny_model import build_tiny_model
+
+    model_dir = build_tiny_model(tmp_path_factory.mktemp("tiny_model"))
+    model_obj = transformers.AutoModelForCausalLM.from_pretrained(model_dir)
+    tokenizer = transformers.AutoTokenizer.from_pretrained(model_dir)
+
+    return model_obj, tokenizer
+
+
+def test_acceptance_counts_one_token_per_verification():
+    stats = SpeculativeStats(new_tokens=10, draft_tokens=12, verify_steps=4)
+
+    assert stats.accepted_tokens == 6
+    assert stats.acceptance_rate == 0.5
+    assert SpeculativeStats(1, 0, 1).acceptance_rate == 0.0
+
+
+def test_assisted_generation_matches_plain_generation(tiny_model):
+    model_obj, tokenizer = tiny_model
+    input_msgs = tokenizer("the model answer", return_tensors="pt")
+    generate_kwargs = dict(
+        max_new_tokens=12,
+        min_new_tokens=12,
+        do_sample=False,
+        pad_token_id=tokenizer.pad_token_id,
+    )
+
+    with torch.no_grad():
+        expected = model_obj.generate(**input_msgs, **generate_kwargs)
+        # A model always agrees with itself
+        output, stats = generate_with_assistant(
+            model_obj=model_obj,
+            tokenizer=tokenizer,
+            assistant_model=model_obj,
+            assistant_tokenizer=tokenizer,
+            input_msgs=input_msgs,
+            **generate_kwargs,
+        )
+
+    assert torch.equal(output, expected)
+    assert stats.new_tokens == 12
+    assert stats.draft_tokens > 0
+
+
+def test_assistant_is_loaded_from_the_registry(tiny_model):
+    from app.service.llm_service import LLMService
+
+    loads = []
+
+    def loader(key):
+        loads.append(key.model_name)
+        return tiny_model
+
+    registry = ModelRegistry(max_bytes=0, loader=loader)
+    request = LLMRequest(
+        prompt="the model answer",
+        model_name="model-a",
+        assistant_model_name="model-b",
+        max_length=12,
+    )
+
+    response = LLMService(request=request, registry=registry).invoke()
+
+    assert loads == ["model-a", "model-b"]
+    assert response["response"].startswith("the model answer")
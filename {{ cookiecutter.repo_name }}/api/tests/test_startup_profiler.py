@@ -0,0 +1,64 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from app.utils.startup_profiler import (
+    HEAVY_MODULES,
+    ImportTime,
+    StartupProfiler,
+    measure_import_times,
+)
+
+
+def test_app_import_does_not_import_heavy_modules():
+    import_times = measure_import_times("app.main")
+    imported = {xx.module for xx in import_times}
+
+    assert "app.main" in imported
+    assert "app.service.llm_service" in imported
+    assert not imported.intersection(HEAVY_MODULES)
+
+
+def test_report():
+    profiler = StartupProfiler(enabled=True)
+    with profiler.step("setup_logging"):
+        pass
+    profiler.mark("ready")
+    import_times = [
+        ImportTime("torch._C", 0.5, 0.5, 2),
+        ImportTime("torch", 0.1, 0.6, 1),
+        ImportTime("app.service", 0.01, 0.61, 1),
+        ImportTime("app.main", 0.02, 0.7, 0),
+    ]
+
+    report = profiler.report(import_times=import_times)
+
+    assert set(report["steps"]) == {"setup_logging"}
+    assert report["marks"]["ready"] >= 0
+    assert report["import_seconds"] == 0.7
+    assert list(report["top_modules"]) == [
+        "torch._C",
+        "torch",
+        "app.main",
+        "app.service",
+    ]
+    assert report["app_modules"] == {"app.service": 0.61, "app.main": 0.7}
+    assert report["heavy_modules"] == ["torch"]
@@ -0,0 +1,177 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import threading
+
+import pytest
+
+from app.api_exceptions import ApiException
+from app.models.genai.llm_prompt import LLMRequest
+from app.service import llm_service
+from app.service.inference_executor import InferenceExecutor
+from app.service.llm_service import LLMService
+from app.service.model_registry import ModelRegistry
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    from benchmarks.tiny_model import build_tiny_model
+
+    model_dir = build_tiny_model(tmp_path_factory.mktemp("tiny_model"))
+    model_obj = transformers.AutoModelForCausalLM.from_pretrained(model_dir)
+    tokenizer = transformers.AutoTokenizer.from_pretrained(model_dir)
+
+    return model_obj, tokenizer
+
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(max_workers=1, max_queue=0)
+    yield executor
+    executor.shutdown()
+
+
+def test_streamed_tokens_arrive_in_order(tiny_model, executor):
+    registry = ModelRegistry(max_bytes=0, loader=lambda key: tiny_model)
+    request = LLMRequest(
+        prompt="the model answer",
+        model_name="tiny",
+        max_length=16,
+    )
+
+    async def scenario():
+        stream = LLMService.astream(
+            request=request,
+            executor=executor,
+            registry=registry,
+        )
+        return [xx async for xx in stream]
+
+    tokens = asyncio.run(scenario())
+    response = LLMService(request=request, registry=registry).invoke()
+
+    assert len(tokens) > 1
+    assert response["response"].endswith("".join(tokens).strip())
+
+
+def test_cancellation_stops_the_generation(tiny_model):
+    from app.service.streaming import (
+        CallbackTextStreamer,
+        CancellationCriteria,
+    )
+
+    model_obj, tokenizer = tiny_model
+    stop_event = threading.Event()
+    texts = []
+
+    def on_text(text):
+        texts.append(text)
+        stop_event.set()
+
+    input_msgs = tokenizer("the model answer", return_tensors="pt")
+    output = model_obj.generate(
+        **input_msgs,
+        max_new_tokens=20,
+        min_new_tokens=20,
+        do_sample=False,
+        pad_token_id=tokenizer.pad_token_id,
+        streamer=CallbackTextStreamer(tokenizer, on_text=on_text),
+        stopping_criteria=transformers.StoppingCriteriaList(
+            [CancellationCriteria(stop_event)]
+        ),
+    )
+
+    assert texts
+    assert output.shape[1] - input_msgs["input_ids"].shape[1] < 20
+
+
+def test_client_disconnect_stops_the_generation(monkeypatch, executor):
+    monkeypatch.setattr(llm_service, "STREAM_DISCONNECT_POLL_SECONDS", 0.01)
+    stopped = threading.Event()
+
+    def stream(self, on_text, stop_event):
+        on_text("first")
+        if stop_event.wait(5):
+            stopped.set()
+        raise RuntimeError("generation cancelled")
+
+    monkeypatch.setattr(LLMService, "__init__", lambda self, **kw: None)
+    monkeypatch.setattr(LLMService, "stream", stream)
+
+    async def is_disconnected():
+        return True
+
+    async def scenario():
+        tokens = LLMService.astream(
+            request=LLMRequest(prompt="hi", model_name="tiny"),
+            is_disconnected=is_disconnected,
+            executor=executor,
+        )
+        texts = [xx async for xx in tokens]
+        # Letting the generation finish, while the loop is still running
+        await asyncio.to_thread(stopped.wait, 5)
+        await asyncio.sleep(0.05)
+        return texts
+
+    assert asyncio.run(scenario()) == ["first"]
+    assert stopped.is_set()
+
+
+def test_saturated_executor_rejects_streams_before_responding(
+    monkeypatch,
+    executor,
+):
+    from app.routers.genai import stream_llm_call
+
+    monkeypatch.setattr(
+        llm_service,
+        "get_inference_executor",
+        lambda: executor,
+    )
+    release = threading.Event()
+
+    class StandInRequest(object):
+        async def is_disconnected(self):
+            return False
+
+    async def scenario():
+        running = executor.submit(release.wait, 5)
+        try:
+            with pytest.raises(ApiException) as exc_info:
+                await stream_llm_call(
+                    request=LLMRequest(prompt="hi", model_name="tiny"),
+                    http_request=StandInRequest(),
+                    stream_format="sse",
+                )
+        finally:
+            release.set()
+            await running
+        return exc_info.value
+
+    exc = asyncio.run(scenario())
+
+    assert exc.status_code == 429
+    assert exc.headers["Retry-After"] == str(executor.retry_after)
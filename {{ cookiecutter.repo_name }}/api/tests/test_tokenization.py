@@ -0,0 +1,145 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import threading
+from collections import OrderedDict
+
+import pytest
+
+from app.service import model_artifacts, tokenization
+from app.service.model_registry import ModelKey, ModelRegistry
+
+
+class StandInTokenizer(object):
+    """
+    Tokenizer that splits prompts on whitespace.
+    """
+
+    def __call__(self, prompts, return_tensors=None, padding=False):
+        return {"input_ids": [xx.split() for xx in prompts]}
+
+
+def test_count_tokens_of_every_prompt():
+    counts = tokenization.count_tokens(
+        StandInTokenizer(),
+        ["one", "one two three", ""],
+    )
+
+    assert counts == [1, 3, 0]
+
+
+def test_get_tokenizer_reuses_loaded_models(stand_in_loader):
+    registry = ModelRegistry(max_bytes=0, loader=stand_in_loader)
+    loaded_model = registry.get(ModelKey.for_model("model-a"))
+
+    tokenizer = tokenization.get_tokenizer("model-a", registry=registry)
+
+    assert tokenizer is loaded_model.tokenizer
+    assert len(stand_in_loader.calls) == 1
+
+
+def test_get_tokenizer_loads_only_the_tokenizer(stand_in_loader, monkeypatch):
+    registry = ModelRegistry(max_bytes=0, loader=stand_in_loader)
+    loads = []
+
+    def load_tokenizer(model_name, **kwargs):
+        loads.append(model_name)
+        return StandInTokenizer()
+
+    monkeypatch.setattr(tokenization, "load_tokenizer", load_tokenizer)
+    monkeypatch.setattr(tokenization, "_tokenizers", OrderedDict())
+
+    first = tokenization.get_tokenizer("model-b", registry=registry)
+    second = tokenization.get_tokenizer("model-b", registry=registry)
+
+    assert first is second
+    assert loads == ["model-b"]
+    assert stand_in_loader.calls == []
+    assert len(registry) == 0
+
+
+def test_get_tokenizer_keeps_the_most_recent_tokenizers(
+    stand_in_loader,
+    monkeypatch,
+):
+    registry = ModelRegistry(max_bytes=0, loader=stand_in_loader)
+    loads = []
+
+    def load_tokenizer(model_name, **kwargs):
+        loads.append(model_name)
+        return StandInTokenizer()
+
+    monkeypatch.setattr(tokenization, "load_tokenizer", load_tokenizer)
+    monkeypatch.setattr(tokenization, "_tokenizers", OrderedDict())
+    monkeypatch.setattr(tokenization, "TOKENIZER_CACHE_SIZE", 2)
+
+    for model_name in ["model-a", "model-b", "model-a", "model-c"]:
+        tokenization.get_tokenizer(model_name, registry=registry)
+    tokenization.get_tokenizer("model-a", registry=registry)
+    tokenization.get_tokenizer("model-b", registry=registry)
+
+    assert loads == ["model-a", "model-b", "model-c", "model-b"]
+
+
+def test_slow_tokenizer_loads_do_not_hold_up_the_others(
+    stand_in_loader,
+    monkeypatch,
+):
+    registry = ModelRegistry(max_bytes=0, loader=stand_in_loader)
+    started, release = threading.Event(), threading.Event()
+
+    def load_tokenizer(model_name, **kwargs):
+        if model_name == "slow-model":
+            started.set()
+            release.wait(5)
+        return StandInTokenizer()
+
+    monkeypatch.setattr(tokenization, "load_tokenizer", load_tokenizer)
+    monkeypatch.setattr(tokenization, "_tokenizers", OrderedDict())
+    slow = threading.Thread(
+        target=tokenization.get_tokenizer,
+        args=("slow-model", registry),
+    )
+    slow.start()
+    started.wait(5)
+
+    assert tokenization.get_tokenizer("model-a", registry=registry)
+    assert slow.is_alive()
+    release.set()
+    slow.join()
+
+
+def test_offline_tokenizers_are_never_downloaded(
+    stand_in_loader,
+    monkeypatch,
+):
+    registry = ModelRegistry(max_bytes=0, loader=stand_in_loader)
+    monkeypatch.setattr(tokenization, "_tokenizers", OrderedDict())
+    monkeypatch.setattr(model_artifacts, "MODEL_OFFLINE", True)
+    monkeypatch.setattr(
+        model_artifacts,
+        "resolve_artifact",
+        lambda model_name, revision=None: None,
+    )
+
+    with pytest.raises(FileNotFoundError):
+        tokenization.get_tokenizer("model-a", registry=registry)
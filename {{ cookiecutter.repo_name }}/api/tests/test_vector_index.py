@@ -0,0 +1,177 @@
+# MIT License
+#
+# Copyright 2025, Victor Calderon
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import pytest
+
+from app.service.model_registry import ModelRegistry
+from app.service.vector_index import VectorIndex
+
+faiss = pytest.importorskip("faiss")
+np = pytest.importorskip("numpy")
+
+
+def random_vectors(n: int, dimension: int = 16, seed: int = 0):
+    vectors = np.random.default_rng(seed).normal(size=(n, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return vectors.astype(np.float32)
+
+
+def documents(ids):
+    return [{"text": f"doc-{xx}", "metadata": {"n": xx}} for xx in ids]
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+def test_vectors_are_added_incrementally(tmp_path, index_type):
+    vector_index = VectorIndex(path=str(tmp_path), index_type=index_type)
+    vectors = random_vectors(20)
+
+    assert vector_index.add(vectors[:10], documents(range(10))) == list(
+        range(10)
+    )
+    assert vector_index.add(vectors[10:], documents(range(10, 20))) == list(
+        range(10, 20)
+    )
+
+    idx, score, document = vector_index.search(vectors[15:16], k=3)[0][0]
+    assert idx == 15
+    assert score == pytest.approx(1.0, abs=1e-5)
+    assert document == {"text": "doc-15", "metadata": {"n": 15}}
+
+
+def test_index_is_memory_mapped_when_reloaded(tmp_path):
+    vectors = random_vectors(10)
+    VectorIndex(path=str(tmp_path)).add(vectors, documents(range(10)))
+
+    reloaded = VectorIndex(path=str(tmp_path))
+
+    assert reloaded._mmapped
+    assert reloaded.ntotal == 10
+    assert reloaded.search(vectors[3:4], k=1)[0][0][0] == 3
+
+    # Memory-mapped indexes are read-only, so adding loads a private copy
+    assert reloaded.add(random_vectors(2, seed=1), documents([10, 11])) == [
+        10,
+        11,
+    ]
+    assert not reloaded._mmapped
+    assert VectorIndex(path=str(tmp_path)).ntotal == 12
+
+
+def test_workers_see_vectors_added_by_others(tmp_path):
+    vectors = random_vectors(10)
+    first = VectorIndex(path=str(tmp_path))
+    second = VectorIndex(path=str(tmp_path))
+
+    first.add(vectors[:5], documents(range(5)))
+    second.add(vectors[5:], documents(range(5, 10)))
+
+    assert first.search(vectors[8:9], k=1)[0][0][0] == 8
+    assert first.ntotal == 10
+
+
+def test_ivf_index_is_trained_once_it_has_enough_vectors(tmp_path):
+    vector_index = VectorIndex(
+        path=str(tmp_path),
+        index_type="ivf",
+        nlist=4,
+        nprobe=4,
+    )
+    vectors = random_vectors(4 * 39 + 20)
+
+    vector_index.add(vectors[:100], documents(range(100)))
+    assert isinstance(vector_index._index, faiss.IndexFlat)
+
+    vector_index.add(vectors[100:], documents(range(100, len(vectors))))
+    assert isinstance(vector_index._index, faiss.IndexIVF)
+
+    # Vectors keep their IDs, as every list gets searched
+    results = vector_index.search(vectors[[5, 150]], k=1)
+    assert [xx[0][0] for xx in results] == [5, 150]
+
+
+def test_documents_without_saved_vectors_are_dropped(tmp_path):
+    vector_index = VectorIndex(path=str(tmp_path))
+    vector_index.add(random_vectors(3), documents(range(3)))
+    vector_index._conn.executemany(
+        "INSERT INTO documents VALUES (?, ?, ?)",
+        [(3, "orphan", "{}")],
+    )
+    vector_index._conn.commit()
+
+    reloaded = VectorIndex(path=str(tmp_path))
+
+    assert reloaded._conn.execute(
+        "SELECT COUNT(*) FROM documents"
+    ).fetchone() == (3,)
+
+
+def test_mismatched_dimensions_are_rejected(tmp_path):
+    vector_index = VectorIndex(path=str(tmp_path))
+    vector_index.add(random_vectors(2), documents(range(2)))
+
+    with pytest.raises(ValueError):
+        vector_index.add(random_vectors(2, dimension=8), documents(range(2)))
+
+
+def test_texts_are_encoded_into_unit_vectors(tmp_path):
+    transformers = pytest.importorskip("transformers")
+    from benchmarks.tiny_model import build_tiny_model
+
+    from app.service.embeddings import encode_texts
+
+    model_dir = build_tiny_model(tmp_path)
+    model_pair = (
+        transformers.AutoModel.from_pretrained(model_dir),
+        transformers.AutoTokenizer.from_pretrained(model_dir),
+    )
+    registry = ModelRegistry(max_bytes=0, loader=lambda key: model_pair)
+    texts = ["the model", "the model answer and more words", "the model"]
+
+    embeddings = encode_texts(texts, model_name="tiny", registry=registry)
+
+    assert embeddings.shape == (3, model_pair[0].config.hidden_size)
+    assert np.linalg.norm(embeddings, axis=1) == pytest.approx(1.0)
+    # Padding the shorter texts does not change their embedding
+    assert embeddings[0] == pytest.approx(embeddings[2], abs=1e-5)
+    alone = encode_texts(["the model"], model_name="tiny", registry=registry)
+    assert alone[0] == pytest.approx(embeddings[0], abs=1e-5)
+
+
+def test_encoders_share_the_model_loader(tmp_path):
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from benchmarks.tiny_model import build_tiny_model
+
+    from app.service.embeddings import _load_hf_encoder
+    from app.service.model_registry import ModelKey
+
+    model_dir = str(build_tiny_model(tmp_path))
+    model_obj, tokenizer = _load_hf_encoder(ModelKey(model_dir, "int8"))
+
+    # Base model, without the language modeling head, quantized
+    assert not hasattr(model_obj, "lm_head")
+    assert any(
+        isinstance(xx, torch.ao.nn.quantized.dynamic.Linear)
+        for xx in model_obj.modules()
+    )
+    assert tokenizer("the model")["input_ids"]
@@ -100,6 +100,42 @@ variable "huggingface_secret_name" {
   description = "Name of AWS secret that contains the HF credentials"
 }
 
+variable "preload_models" {
+  type        = list(string)
+  description = "Models to load and warm up before the task accepts traffic"
+  default     = []
+}
+
+variable "server_workers" {
+  type        = number
+  description = "Number of API worker processes per task"
+  default     = 1
+}
+
+variable "inference_generation_slots" {
+  type        = number
+  description = "Number of generations that run at the same time in each worker"
+  default     = 1
+}
+
+variable "model_mmap_weights" {
+  type        = bool
+  description = "Whether workers share memory-mapped model weights"
+  default     = true
+}
+
+variable "drain_timeout_seconds" {
+  type        = number
+  description = "Seconds that in-flight requests get to finish when a task is drained"
+  default     = 90
+}
+
+variable "model_offline" {
+  type        = bool
+  description = "Whether models may only be loaded from the ones baked into the image"
+  default     = false
+}
+
 /* ----------------------------- Route 53 ------------------------------------- */
 variable "certificate_arn" {
   type        = string
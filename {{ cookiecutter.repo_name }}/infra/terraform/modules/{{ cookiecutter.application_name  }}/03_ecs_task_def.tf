@@ -168,6 +168,23 @@ resource "aws_ecs_task_definition" "ecs_task_definition" {
                         protocol      = "tcp"
                     }
                 ]
+                # ECS restarts containers that fail this check, so it uses
+                # the liveness probe. A task that is loading its models is
+                # kept out of the load balancer by the model readiness probe
+                # of the target group, and an overloaded one answers `429`.
+                healthCheck = {
+                    command = [
+                        "CMD-SHELL",
+                        "python -c \"import urllib.request; urllib.request.urlopen('http://localhost:8000/health/live', timeout=5)\" || exit 1"
+                    ]
+                    interval    = 30
+                    timeout     = 10
+                    retries     = 3
+                    startPeriod = 60
+                }
+                # Time between SIGTERM and SIGKILL, so in-flight requests
+                # can finish. Fargate allows at most 120 seconds.
+                stopTimeout = min(var.drain_timeout_seconds + 10, 120)
                 "environment" : [
                     {
                         "name": "HF_CREDENTIALS_SECRET_NAME",
@@ -180,6 +197,36 @@ resource "aws_ecs_task_definition" "ecs_task_definition" {
                     {
                       "name" : "ENV",
                       "value" : "${var.env_name}"
+                    },
+                    {
+                      "name" : "PRELOAD_MODELS",
+                      "value" : "${join(",", var.preload_models)}"
+                    },
+                    {
+                      "name" : "SERVER_WORKERS",
+                      "value" : "${var.server_workers}"
+                    },
+                    # The task CPU units, split between its workers. Fargate
+                    # does not always expose its CPU quota to the container.
+                    {
+                      "name" : "INFERENCE_CPUS",
+                      "value" : "${var.cpu / 1024 / var.server_workers}"
+                    },
+                    {
+                      "name" : "INFERENCE_GENERATION_SLOTS",
+                      "value" : "${var.inference_generation_slots}"
+                    },
+                    {
+                      "name" : "MODEL_MMAP_WEIGHTS",
+                      "value" : "${var.model_mmap_weights ? "1" : "0"}"
+                    },
+                    {
+                      "name" : "SHUTDOWN_GRACE_SECONDS",
+                      "value" : "${var.drain_timeout_seconds}"
+                    },
+                    {
+                      "name" : "MODEL_OFFLINE",
+                      "value" : "${var.model_offline ? "1" : "0"}"
                     }
                 ]
             }
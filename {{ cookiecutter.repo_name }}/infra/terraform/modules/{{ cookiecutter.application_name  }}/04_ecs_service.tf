@@ -12,6 +12,16 @@ resource "aws_ecs_service" "ecs_api_service" {
   health_check_grace_period_seconds = 1000
   launch_type                       = "FARGATE"
   platform_version                  = "1.3.0"
+
+  # New tasks must pass the model readiness probe before old ones get drained,
+  # and a deployment whose tasks never become ready is rolled back.
+  deployment_minimum_healthy_percent = 100
+  deployment_maximum_percent         = 200
+  deployment_circuit_breaker {
+    enable   = true
+    rollback = true
+  }
+
   network_configuration {
     subnets          = var.public_subnets
     security_groups  = [aws_security_group.application_svc_sg.id]
@@ -19,13 +19,22 @@ resource "aws_lb_target_group" "application_tg" {
   vpc_id      = var.default_vpc
   target_type = "ip"
 
+  # Requests to a deregistered task, e.g. one being replaced or scaled in,
+  # get this long to finish before the task is stopped.
+  deregistration_delay = var.drain_timeout_seconds
+
+  # Targets only become healthy once every preloaded model has been loaded
+  # and warmed up, so traffic is never routed to a cold task. The check does
+  # not depend on the load of the task, since ECS replaces the tasks that
+  # fail it, which would cut capacity during a spike. Overloaded tasks
+  # reject new requests with a `429` instead.
   health_check {
-    path                = "/api/health"
+    path                = "/health/models"
     port                = 8000
-    interval            = 300
-    timeout             = 100
-    healthy_threshold   = 5
-    unhealthy_threshold = 5
+    interval            = 10
+    timeout             = 5
+    healthy_threshold   = 2
+    unhealthy_threshold = 3
     matcher             = "200"
   }
 }